@@ -0,0 +1 @@
+"""Benchmarks for the Dynalite library - run all with python -m benchmarks, or one with python -m benchmarks.<name>."""
@@ -0,0 +1,91 @@
+"""Run the benchmarks and print one JSON document with the results and the environment.
+
+Run with: python -m benchmarks [name ...] [--output results.json] [--append history.ndjson]
+The history file gets one line per run, so results can be tracked across releases.
+"""
+import argparse
+import datetime
+import importlib
+import json
+import platform
+import subprocess
+import sys
+import time
+
+BENCHMARKS = [
+    "codec",
+    "receive",
+    "event_alloc",
+    "dispatch",
+    "configure",
+    "serialize",
+    "command_latency",
+    "metrics_overhead",
+    "task_storm",
+    "fast_path",
+    "threaded",
+    "event_loops",
+    "transport_latency",
+]
+SCHEMA_VERSION = 1
+
+
+def gitCommit():
+    """Return the commit of the working tree, or None outside a git checkout."""
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def runAll(names):
+    """Run the named benchmarks and return the results document."""
+    results = {}
+    seconds = {}
+    for name in names:
+        module = importlib.import_module("benchmarks." + name)
+        start = time.perf_counter()
+        results[name] = module.run()
+        seconds[name] = round(time.perf_counter() - start, 2)
+        print("%s done in %.1fs" % (name, seconds[name]), file=sys.stderr)
+    return {
+        "schema": SCHEMA_VERSION,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "commit": gitCommit(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "seconds": seconds,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    """Parse the command line and run the benchmarks."""
+    parser = argparse.ArgumentParser(description="Dynalite library benchmarks")
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default all): %s" % ", ".join(BENCHMARKS))
+    parser.add_argument("--output", help="write the results document to a file")
+    parser.add_argument("--append", help="append the results as one line to a history file")
+    args = parser.parse_args(argv)
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error("unknown benchmark %s" % name)
+    document = runAll(args.names or BENCHMARKS)
+    text = json.dumps(document, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as outputFile:
+            outputFile.write(text + "\n")
+    if args.append:
+        with open(args.append, "a") as historyFile:
+            historyFile.write(json.dumps(document, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    main()
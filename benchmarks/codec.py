@@ -0,0 +1,47 @@
+"""Measure DynetPacket encode and decode throughput.
+
+Run with: python -m benchmarks.codec
+"""
+import json
+import time
+
+from dynalite_lib.dynet import DynetPacket
+from .event_alloc import sampleFrames
+
+FRAMES = 50000
+
+
+def encode(frames):
+    """Build a packet from the fields of every frame."""
+    for frame in frames:
+        DynetPacket().toMsg(
+            sync=frame[0],
+            area=frame[1],
+            command=frame[3],
+            data=[frame[2], frame[4], frame[5]],
+            join=frame[6],
+        )
+
+
+def decode(frames):
+    """Parse every frame into a packet."""
+    for frame in frames:
+        DynetPacket(msg=frame)
+
+
+def run(count=FRAMES):
+    """Return the measurements as a dict."""
+    frames = sampleFrames(count)
+    result = {"frames": count}
+    for name, func in [("encode", encode), ("decode", decode)]:
+        func(frames[:100])  # warm up
+        start = time.perf_counter()
+        func(frames)
+        seconds = time.perf_counter() - start
+        result["%s_frames_per_second" % name] = round(count / seconds)
+        result["%s_us_per_frame" % name] = round(seconds / count * 1e6, 3)
+    return result
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,116 @@
+"""Measure command latency from DynetControl to the gateway socket through a loopback gateway.
+
+Single commands are sent one at a time, so they show the cost of the write path. Bursts queue
+many commands at once, so they show the queueing in the Dynet write pacer as well.
+
+Run with: python -m benchmarks.command_latency
+"""
+import asyncio
+import json
+import time
+
+from dynalite_lib.const import CONF_ACTIVE_OFF
+from dynalite_lib.dynet import Dynet, DynetControl
+
+COMMANDS = 1000
+BURST = 50
+
+
+def percentiles(times):
+    """Return latency percentiles in microseconds."""
+    times = sorted(times)
+
+    def at(fraction):
+        return round(times[min(int(len(times) * fraction), len(times) - 1)] * 1e6, 1)
+
+    return {
+        "commands": len(times),
+        "p50_us": at(0.5),
+        "p90_us": at(0.9),
+        "p99_us": at(0.99),
+        "max_us": round(times[-1] * 1e6, 1),
+    }
+
+
+class Gateway(asyncio.Protocol):
+    """Class for a loopback gateway that timestamps every frame it receives."""
+
+    def __init__(self, arrivals):
+        """Initialize the gateway."""
+        self.arrivals = arrivals
+        self.buffer = 0
+        self.waiter = None
+
+    def data_received(self, data):
+        """Timestamp whole frames and wake the waiter."""
+        now = time.perf_counter()
+        self.buffer += len(data)
+        while self.buffer >= 8:
+            self.buffer -= 8
+            self.arrivals.append(now)
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+
+    async def received(self, count):
+        """Wait until count frames arrived."""
+        while len(self.arrivals) < count:
+            self.waiter = asyncio.get_event_loop().create_future()
+            await self.waiter
+
+
+async def measure(loop, count=COMMANDS, burst=1, messageDelay=0):
+    """Return the latency percentiles of count commands sent burst at a time."""
+    arrivals = []
+    gateways = []
+
+    def factory():
+        gateways.append(Gateway(arrivals))
+        return gateways[-1]
+
+    server = await loop.create_server(factory, "127.0.0.1", 0)
+    connected = asyncio.Event()
+
+    async def onConnect(dynet=None, transport=None):
+        connected.set()
+
+    dynet = Dynet(
+        host="127.0.0.1",
+        port=server.sockets[0].getsockname()[1],
+        loop=loop,
+        broadcaster=lambda event: None,
+        onConnect=onConnect,
+        messageDelay=messageDelay,
+    )
+    control = DynetControl(dynet, loop, CONF_ACTIVE_OFF)
+    dynet.connect()
+    await asyncio.wait_for(connected.wait(), 5)
+    sent = []
+    try:
+        while len(sent) < count:
+            for _ in range(min(burst, count - len(sent))):
+                sent.append(time.perf_counter())
+                control.setChannel(1 + len(sent) % 50, 1 + len(sent) % 8, 0.5, fade=0)
+            await asyncio.wait_for(gateways[0].received(len(sent)), 30)
+    finally:
+        dynet.close()
+        await asyncio.sleep(0.01)
+        server.close()
+        await server.wait_closed()
+    return percentiles([arrival - start for start, arrival in zip(sent, arrivals)])
+
+
+def run(count=COMMANDS):
+    """Return the measurements as a dict."""
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(measure(loop, 50))  # warm up
+        return {
+            "single": loop.run_until_complete(measure(loop, count)),
+            "burst_%d" % BURST: loop.run_until_complete(measure(loop, count, burst=BURST)),
+        }
+    finally:
+        loop.close()
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
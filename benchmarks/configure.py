@@ -0,0 +1,42 @@
+"""Measure the time and memory Dynalite._configure takes for large configs.
+
+Run with: python -m benchmarks.configure
+"""
+import asyncio
+import json
+import time
+import tracemalloc
+
+from .dispatch import configured, largeConfig
+
+SIZES = [(10, 8), (100, 16), (250, 40)]  # areas, channels per area
+
+
+def run(sizes=SIZES):
+    """Return the measurements as a dict."""
+    result = {}
+    loop = asyncio.new_event_loop()
+    try:
+        for areas, channels in sizes:
+            config = largeConfig(areas, channels)
+            start = time.perf_counter()
+            loop.run_until_complete(configured(loop, config))
+            seconds = time.perf_counter() - start
+            tracemalloc.start()
+            dynalite = loop.run_until_complete(configured(loop, config))
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result["%d_areas_%d_channels" % (areas, channels)] = {
+                "configure_ms": round(seconds * 1000, 2),
+                "retained_kib": round(current / 1024, 1),
+                "peak_kib": round(peak / 1024, 1),
+                "bytes_per_channel": round(current / (areas * channels)),
+            }
+            del dynalite
+    finally:
+        loop.close()
+    return result
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,113 @@
+"""Measure the cost per event of Dynalite._processTraffic and the broadcast to N listeners.
+
+Every event is a preset selection or a channel level report for a configured area, the way
+inbound traffic reaches Dynalite. Listeners are inline and subscribe to every event.
+
+Run with: python -m benchmarks.dispatch
+"""
+import asyncio
+import json
+import time
+
+from dynalite_lib.const import CONF_ACTIVE_OFF
+from dynalite_lib.dynalite import Dynalite
+from dynalite_lib.dynet import DynetControl
+from dynalite_lib.event import DynetEvent
+
+EVENTS = 10000
+AREAS = 50
+CHANNELS = 8
+LISTENERS = [0, 1, 10, 100]
+
+
+def largeConfig(areas=AREAS, channels=CHANNELS, presets=4):
+    """Return a config with areas that each have channels and presets."""
+    return {
+        "active": CONF_ACTIVE_OFF,
+        "area": {
+            str(area): {
+                "name": "Area %d" % area,
+                "channel": {str(channel): {"name": "Channel %d" % channel} for channel in range(1, channels + 1)},
+                "preset": {str(preset): {"name": "Preset %d" % preset} for preset in range(1, presets + 1)},
+            }
+            for area in range(1, areas + 1)
+        },
+    }
+
+
+async def configured(loop, config):
+    """Return a configured Dynalite whose Dynet is never connected."""
+    dynalite = Dynalite(config=config, loop=loop)
+    dynalite._dynet = dynalite._newDynet("localhost", 12345)
+    dynalite.control = DynetControl(
+        dynalite._dynet, loop, CONF_ACTIVE_OFF, areaDefinition=dynalite.devices["area"]
+    )
+    await dynalite._configure()
+    await asyncio.sleep(0)
+    return dynalite
+
+
+def sampleEvents(count, areas=AREAS, channels=CHANNELS):
+    """Return alternating preset and channel report events."""
+    events = []
+    for index in range(count):
+        area = 1 + index % areas
+        if index % 2:
+            events.append(DynetEvent(eventType="PRESET", data={"area": area, "preset": 1 + index % 4}))
+        else:
+            events.append(
+                DynetEvent(
+                    eventType="CHANNEL",
+                    data={
+                        "area": area,
+                        "channel": 1 + index % channels,
+                        "action": "report",
+                        "target_level": index % 255 + 1,
+                        "actual_level": index % 255 + 1,
+                    },
+                )
+            )
+    return events
+
+
+async def _measure(loop, events, listeners):
+    """Return the cost per event with a number of listeners."""
+    dynalite = await configured(loop, largeConfig())
+    delivered = [0]
+
+    def listener(event, dynalite):
+        delivered[0] += 1
+
+    for _ in range(listeners):
+        dynalite.addListener(listenerFunction=listener).monitorEvent("*")
+    start = time.perf_counter()
+    for event in events:
+        await dynalite._processTraffic(event)
+    while len(asyncio.all_tasks(loop)) > 1:  # the broadcast tasks
+        await asyncio.sleep(0)
+    seconds = time.perf_counter() - start
+    return {
+        "us_per_event": round(seconds / len(events) * 1e6, 3),
+        # selecting a preset also broadcasts the previous preset turning off
+        "deliveries": delivered[0],
+    }
+
+
+def run(count=EVENTS):
+    """Return the measurements as a dict."""
+    events = sampleEvents(count)
+    result = {"events": count}
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(_measure(loop, events[:200], 1))  # warm up
+        for listeners in LISTENERS:
+            result["%d_listeners" % listeners] = loop.run_until_complete(
+                _measure(loop, events, listeners)
+            )
+    finally:
+        loop.close()
+    return result
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
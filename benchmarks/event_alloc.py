@@ -0,0 +1,85 @@
+"""Measure memory and time per decoded frame from raw bytes to DynetEvent.
+
+Run with: python -m benchmarks.event_alloc
+"""
+import json
+import time
+import tracemalloc
+
+from dynalite_lib.dynet import DynetPacket
+from dynalite_lib.inbound import DynetInbound
+
+FRAMES = 20000
+
+
+def _frame(area, command, data0, data1, data2):
+    """Build a valid logical frame."""
+    msg = [28, area, data0, command, data1, data2, 255]
+    msg.append(-sum(msg) & 0xFF)
+    return msg
+
+
+def sampleFrames(count=FRAMES):
+    """Return a mix of channel reports, channel commands and presets."""
+    frames = []
+    for index in range(count):
+        area = 1 + index % 50
+        kind = index % 4
+        if kind == 0:
+            frames.append(_frame(area, 96, index % 8, 10, 20))  # report channel level
+        elif kind == 1:
+            frames.append(_frame(area, 128 + index % 4, 100, 255, 50))  # set channel
+        elif kind == 2:
+            frames.append(_frame(area, index % 4, 50, 0, 0))  # preset
+        else:
+            frames.append(_frame(area, 98, 2, 0, 0))  # report preset
+    return frames
+
+
+def decode(frames):
+    """Decode frames into events the way the inbound pipeline does."""
+    inbound = DynetInbound()
+    events = []
+    for frame in frames:
+        packet = DynetPacket(msg=frame)
+        events.append(getattr(inbound, packet.opcodeType.lower())(packet))
+    return events
+
+
+def run(count=FRAMES):
+    """Return the measurements as a dict."""
+    frames = sampleFrames(count)
+    decode(frames[:100])  # warm up
+
+    start = time.perf_counter()
+    decode(frames)
+    decodeSeconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    events = decode(frames)
+    after = tracemalloc.take_snapshot()
+    retained = after.compare_to(before, "filename")
+    retainedBytes = sum(stat.size_diff for stat in retained)
+    retainedBlocks = sum(stat.count_diff for stat in retained)
+
+    accessStart = tracemalloc.get_traced_memory()[0]
+    for event in events:
+        event.data  # pylint: disable=pointless-statement
+        event.msg  # pylint: disable=pointless-statement
+    accessed = tracemalloc.get_traced_memory()[0] - accessStart
+    tracemalloc.stop()
+
+    return {
+        "frames": count,
+        "decode_us_per_frame": round(decodeSeconds / count * 1e6, 3),
+        "retained_bytes_per_event": round(retainedBytes / count, 1),
+        "retained_blocks_per_event": round(retainedBlocks / count, 2),
+        "bytes_per_event_after_data_and_msg_access": round(
+            (retainedBytes + accessed) / count, 1
+        ),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
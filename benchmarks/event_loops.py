@@ -0,0 +1,124 @@
+"""Compare the asyncio and uvloop event loops on receive throughput and command latency.
+
+Both run against the bus simulator over a local TCP socket. Receive throughput is the rate at
+which frames put on the simulated bus come out of the Dynet broadcaster, with the bus sending
+socket-sized bursts and the next burst when the last one was handled. Round trip latency is
+from a preset request to the event of the answer, one request at a time. The write path latency
+is command_latency against a loopback gateway. uvloop is skipped when it is not installed.
+
+Run with: python -m benchmarks.event_loops
+"""
+import asyncio
+import json
+import time
+
+from dynalite_lib.const import CONF_ACTIVE_ON
+from dynalite_lib.dynet import Dynet, DynetControl
+from dynalite_lib.eventloop import LOOP_ASYNCIO, LOOP_UVLOOP, newEventLoop, uvloopAvailable
+from dynalite_lib.simulator import DynetSimulator
+from .command_latency import measure, percentiles
+from .event_alloc import sampleFrames
+from .receive import CHUNK
+
+FRAMES = 20000
+REQUESTS = 1000
+
+
+async def _connected(loop, broadcaster):
+    """Return a started simulator and a Dynet and DynetControl connected to it."""
+    simulator = DynetSimulator(areas=50, port=0, baudrate=None, loop=loop, seed=1)
+    await simulator.start()
+    dynet = Dynet(
+        host="127.0.0.1",
+        port=simulator.port,
+        loop=loop,
+        active=CONF_ACTIVE_ON,
+        broadcaster=broadcaster,
+        messageDelay=0,
+    )
+    dynet.connect()
+    while dynet._transport is None or not simulator.clients:
+        await asyncio.sleep(0.001)
+    return simulator, dynet, DynetControl(dynet, loop, CONF_ACTIVE_ON)
+
+
+async def _close(simulator, dynet):
+    """Close the Dynet and the simulator."""
+    dynet.close()
+    await asyncio.sleep(0.01)
+    await simulator.close()
+
+
+async def _receive(loop, frames):
+    """Return frames per second from the simulated bus to the broadcaster."""
+    done = loop.create_future()
+    events = [0]
+
+    def broadcast(event):
+        events[0] += 1
+        if events[0] == len(frames) and not done.done():
+            done.set_result(None)
+
+    simulator, dynet, _ = await _connected(loop, broadcast)
+    burst = CHUNK // 8
+    start = time.perf_counter()
+    for offset in range(0, len(frames), burst):
+        for frame in frames[offset : offset + burst]:
+            simulator.send(bytes(frame))
+        while events[0] < min(offset + burst, len(frames)):
+            await asyncio.sleep(0)
+    await asyncio.wait_for(done, 60)
+    seconds = time.perf_counter() - start
+    await _close(simulator, dynet)
+    return round(len(frames) / seconds)
+
+
+async def _roundTrip(loop, count):
+    """Return the latency percentiles of preset requests answered by the simulator."""
+    waiter = [None]
+
+    def broadcast(event):
+        if waiter[0] is not None and not waiter[0].done():
+            waiter[0].set_result(None)
+
+    simulator, dynet, control = await _connected(loop, broadcast)
+    times = []
+    for index in range(count):
+        waiter[0] = loop.create_future()
+        start = time.perf_counter()
+        control.requestAreaPresetNow(1 + index % 50)
+        await asyncio.wait_for(waiter[0], 5)
+        times.append(time.perf_counter() - start)
+    await _close(simulator, dynet)
+    return percentiles(times)
+
+
+def _runOn(kind, frames, requests):
+    """Return the measurements on one kind of loop."""
+    loop = newEventLoop(kind == LOOP_UVLOOP)
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(_receive(loop, frames[:1000]))  # warm up
+        return {
+            "receive_frames_per_second": loop.run_until_complete(_receive(loop, frames)),
+            "round_trip": loop.run_until_complete(_roundTrip(loop, requests)),
+            "write_path": loop.run_until_complete(measure(loop, requests)),
+        }
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+def run(count=FRAMES, requests=REQUESTS):
+    """Return the measurements as a dict."""
+    frames = sampleFrames(count)
+    result = {"frames": count, LOOP_ASYNCIO: _runOn(LOOP_ASYNCIO, frames, requests)}
+    if uvloopAvailable():
+        result[LOOP_UVLOOP] = _runOn(LOOP_UVLOOP, frames, requests)
+    else:
+        result[LOOP_UVLOOP] = None  # not installed
+    return result
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
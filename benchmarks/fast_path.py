@@ -0,0 +1,97 @@
+"""Compare the per-command and per-event cost of the task based and the direct paths.
+
+Commands go from DynetControl to the Dynet queue of a connected Dynet whose transport only
+counts the bytes. Events go through Dynalite processing and the broadcast to one inline listener.
+
+Run with: python -m benchmarks.fast_path
+"""
+import asyncio
+import json
+import time
+
+from dynalite_lib.const import CONF_ACTIVE_ON
+from dynalite_lib.dynet import Dynet, DynetControl
+from .dispatch import configured, largeConfig, sampleEvents
+
+COMMANDS = 20000
+
+
+class CountingTransport(object):
+    """Class for a transport that counts what is written."""
+
+    def __init__(self):
+        """Initialize the counter."""
+        self.frames = 0
+
+    def write(self, data):
+        """Count a frame."""
+        self.frames += 1
+
+    def get_extra_info(self, name, default=None):
+        """Return no socket."""
+        return default
+
+
+async def _drain(loop):
+    """Wait until only the running task is left."""
+    while len(asyncio.all_tasks(loop)) > 1:
+        await asyncio.sleep(0)
+
+
+async def _commands(loop, count, direct):
+    """Return microseconds per setChannel from the call to the frame on the transport."""
+    dynet = Dynet(host="localhost", port=12345, loop=loop, broadcaster=lambda event: None, messageDelay=0, active=CONF_ACTIVE_ON)
+    transport = CountingTransport()
+    dynet._transport = transport
+    control = DynetControl(dynet, loop, CONF_ACTIVE_ON)
+    start = time.perf_counter()
+    for index in range(count):
+        if direct:
+            control.setChannelNow(1 + index % 50, 1 + index % 8, 0.5, 0)
+        else:
+            control.setChannel(1 + index % 50, 1 + index % 8, 0.5, 0)
+    while transport.frames < count:  # messageDelay 0 still paces through call_later
+        await asyncio.sleep(0)
+    await _drain(loop)
+    return round((time.perf_counter() - start) / count * 1e6, 3)
+
+
+async def _events(loop, events, fastPath):
+    """Return microseconds per event from processing to the listener."""
+    config = largeConfig()
+    config["fast_path"] = fastPath
+    dynalite = await configured(loop, config)
+    received = [0]
+
+    def listener(event, dynalite):
+        received[0] += 1
+
+    dynalite.addListener(listenerFunction=listener, mode="inline").monitorEvent("*")
+    start = time.perf_counter()
+    for event in events:
+        if fastPath:
+            dynalite.processTrafficNow(event)
+        else:
+            dynalite.processTraffic(event)
+    await _drain(loop)
+    return round((time.perf_counter() - start) / len(events) * 1e6, 3)
+
+
+def run(count=COMMANDS):
+    """Return the measurements as a dict."""
+    events = sampleEvents(count)
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(_commands(loop, 500, False))  # warm up
+        result = {"commands": count}
+        for name, direct in [("task", False), ("direct", True)]:
+            result["command_%s_us" % name] = loop.run_until_complete(_commands(loop, count, direct))
+        for name, fastPath in [("task", False), ("direct", True)]:
+            result["event_%s_us" % name] = loop.run_until_complete(_events(loop, events, fastPath))
+    finally:
+        loop.close()
+    return result
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,80 @@
+"""Measure what metrics cost on the receive and dispatch hot paths, disabled and enabled.
+
+Run with: python -m benchmarks.metrics_overhead
+"""
+import asyncio
+import json
+import time
+
+from dynalite_lib.dynet import Dynet
+from dynalite_lib.metrics import MetricsRegistry
+from .dispatch import configured, largeConfig, sampleEvents
+from .event_alloc import sampleFrames
+from .receive import cleanStream, CHUNK
+
+FRAMES = 20000
+ROUNDS = 5
+
+
+async def _receive(loop, stream, count, metrics):
+    """Return seconds to receive a stream into a Dynet."""
+    done = loop.create_future()
+    events = [0]
+
+    def broadcast(event):
+        events[0] += 1
+        if events[0] == count:
+            done.set_result(None)
+
+    dynet = Dynet(host="localhost", port=12345, loop=loop, broadcaster=broadcast, metrics=metrics)
+    start = time.perf_counter()
+    for offset in range(0, len(stream), CHUNK):
+        await dynet._receive(stream[offset : offset + CHUNK])
+        while len(dynet._inBuffer) >= 8:
+            await asyncio.sleep(0)
+    await done
+    return time.perf_counter() - start
+
+
+async def _dispatch(loop, events, metrics):
+    """Return seconds for _processTraffic and the broadcast of every event to one listener."""
+    config = largeConfig()
+    config["metrics"] = metrics
+    dynalite = await configured(loop, config)
+    dynalite.addListener(listenerFunction=lambda event, dynalite: None).monitorEvent("*")
+    start = time.perf_counter()
+    for event in events:
+        await dynalite._processTraffic(event)
+    while len(asyncio.all_tasks(loop)) > 1:
+        await asyncio.sleep(0)
+    return time.perf_counter() - start
+
+
+def run(count=FRAMES, rounds=ROUNDS):
+    """Return the best of several rounds per path, with metrics off and on, as a dict."""
+    stream = cleanStream(sampleFrames(count))
+    events = sampleEvents(count)
+    result = {"frames": count}
+    loop = asyncio.new_event_loop()
+    try:
+        for name, measure in [
+            ("receive", lambda metrics: _receive(loop, stream, count, MetricsRegistry() if metrics else None)),
+            ("dispatch", lambda metrics: _dispatch(loop, events, metrics)),
+        ]:
+            best = {}
+            for _ in range(rounds):  # alternate so drift hits both equally
+                for metrics in [False, True]:
+                    seconds = loop.run_until_complete(measure(metrics))
+                    best[metrics] = min(best.get(metrics, seconds), seconds)
+            result[name] = {
+                "disabled_us_per_item": round(best[False] / count * 1e6, 3),
+                "enabled_us_per_item": round(best[True] / count * 1e6, 3),
+                "enabled_overhead_percent": round((best[True] / best[False] - 1) * 100, 1),
+            }
+    finally:
+        loop.close()
+    return result
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,79 @@
+"""Measure Dynet._receive frames per second from raw bytes to broadcast events.
+
+The stream arrives in socket-sized reads, each handled before the next arrives. The clean stream
+is back-to-back valid frames. The noisy stream puts line noise between frames, so the receiver
+has to resynchronise byte by byte.
+
+Run with: python -m benchmarks.receive
+"""
+import asyncio
+import json
+import random
+import time
+
+from dynalite_lib.const import SyncType
+from dynalite_lib.dynet import Dynet
+from .event_alloc import sampleFrames
+
+FRAMES = 20000
+CHUNK = 1024  # bytes per read from the gateway socket
+NOISE_BYTES = [value for value in range(256) if not SyncType.has_value(value)]
+
+
+def cleanStream(frames):
+    """Return the frames as one byte string."""
+    return b"".join(bytes(frame) for frame in frames)
+
+
+def noisyStream(frames, rng):
+    """Return the frames with up to 3 noise bytes before each - the frames still decode."""
+    stream = bytearray()
+    for frame in frames:
+        for _ in range(rng.randint(0, 3)):
+            stream.append(rng.choice(NOISE_BYTES))
+        stream.extend(frame)
+    return bytes(stream)
+
+
+async def _feed(loop, stream, expected):
+    """Return seconds for a Dynet to receive a stream and broadcast the expected events."""
+    done = loop.create_future()
+    events = [0]
+
+    def broadcast(event):
+        events[0] += 1
+        if events[0] == expected and not done.done():
+            done.set_result(None)
+
+    dynet = Dynet(host="localhost", port=12345, loop=loop, broadcaster=broadcast)
+    start = time.perf_counter()
+    for offset in range(0, len(stream), CHUNK):
+        await dynet._receive(stream[offset : offset + CHUNK])
+        while len(dynet._inBuffer) >= 8:
+            await asyncio.sleep(0)
+    await done
+    return time.perf_counter() - start
+
+
+def run(count=FRAMES):
+    """Return the measurements as a dict."""
+    frames = sampleFrames(count)
+    streams = {
+        "clean": cleanStream(frames),
+        "noisy": noisyStream(frames, random.Random(1)),
+    }
+    result = {"frames": count}
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(_feed(loop, streams["clean"][:800], 100))  # warm up
+        for name, stream in streams.items():
+            seconds = loop.run_until_complete(_feed(loop, stream, count))
+            result["%s_bytes" % name] = len(stream)
+            result["%s_frames_per_second" % name] = round(count / seconds)
+    finally:
+        loop.close()
+    return result
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,48 @@
+"""Compare per-event JSON encoding with the batch NDJSON and binary encoders.
+
+Run with: python -m benchmarks.serialize
+"""
+import json
+import time
+
+from dynalite_lib.serialize import (
+    NdjsonEncoder,
+    encodeEventsBinary,
+    availableBackend,
+    BACKEND_JSON,
+)
+from .event_alloc import sampleFrames, decode
+
+EVENTS = 20000
+
+
+def _timeIt(func):
+    """Return seconds taken by func."""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run(count=EVENTS):
+    """Return the measurements as a dict."""
+    events = decode(sampleFrames(count))
+    for event in events:  # compare encoding only, not lazy field building
+        event.data  # pylint: disable=pointless-statement
+        event.msg  # pylint: disable=pointless-statement
+    result = {"events": count}
+    result["toJson_us_per_event"] = round(
+        _timeIt(lambda: [event.toJson() for event in events]) / count * 1e6, 3
+    )
+    for backend in sorted({BACKEND_JSON, availableBackend()}):
+        encoder = NdjsonEncoder(backend)
+        result["ndjson_%s_us_per_event" % backend] = round(
+            _timeIt(lambda: encoder.encodeEvents(events)) / count * 1e6, 3
+        )
+    result["binary_us_per_event"] = round(
+        _timeIt(lambda: encodeEventsBinary(events)) / count * 1e6, 3
+    )
+    return result
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
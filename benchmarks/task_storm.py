@@ -0,0 +1,63 @@
+"""Compare an event storm with unbounded library tasks and with a task limit.
+
+Every event is broadcast to a task mode listener, so without a limit each event becomes two
+tasks at once - the broadcast and the listener call.
+
+Run with: python -m benchmarks.task_storm
+"""
+import asyncio
+import json
+import time
+import tracemalloc
+
+from dynalite_lib.dynalite import Dynalite
+from dynalite_lib.event import DynetEvent
+
+EVENTS = 20000
+LIMITS = [None, 100]
+
+
+async def _storm(loop, count, limit):
+    """Return time, peak memory and task counters for a storm of count events."""
+    dynalite = Dynalite(config={"task_limit": limit, "task_queue": count * 2}, loop=loop)
+    received = [0]
+    done = loop.create_future()
+
+    def listener(event, dynalite):
+        received[0] += 1
+        if received[0] == count:
+            done.set_result(None)
+
+    dynalite.addListener(listenerFunction=listener, mode="task").monitorEvent("*")
+    events = [DynetEvent(eventType="PRESET", data={"area": 1 + index % 50, "preset": 1}) for index in range(count)]
+    tracemalloc.start()
+    start = time.perf_counter()
+    for event in events:
+        dynalite.broadcast(event)
+    await done
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    stats = dynalite.taskStats()
+    return {
+        "seconds": round(seconds, 3),
+        "peak_kib": round(peak / 1024),
+        "peak_tasks": stats["peak"],
+        "tasks_started": stats["started"],
+    }
+
+
+def run(count=EVENTS):
+    """Return the measurements as a dict."""
+    result = {"events": count}
+    loop = asyncio.new_event_loop()
+    try:
+        for limit in LIMITS:
+            result["limit_%s" % limit] = loop.run_until_complete(_storm(loop, count, limit))
+    finally:
+        loop.close()
+    return result
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
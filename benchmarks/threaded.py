@@ -0,0 +1,102 @@
+"""Compare commands and state reads from other threads through ThreadedDynalite and through
+run_coroutine_threadsafe against a loop thread.
+
+Every thread sends setChannel commands to the Dynet queue, which is never connected, or reads an
+area preset. The ad-hoc path wraps every call in a coroutine and schedules it from the calling thread.
+
+Run with: python -m benchmarks.threaded
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from dynalite_lib.threaded import ThreadedDynalite
+from .dispatch import largeConfig
+
+COMMANDS = 20000
+THREADS = [1, 4]
+
+
+async def _setChannel(dynalite, area, channel):
+    """Send a command the way an ad-hoc wrapper does."""
+    dynalite.control.setChannel(area, channel, 0.5, 0)
+
+
+async def _getAreaPreset(dynalite, area):
+    """Read state the way an ad-hoc wrapper does."""
+    return dynalite.getAreaPreset(area)
+
+
+def _inThreads(threads, count, work):
+    """Return microseconds per call of work(index) spread over threads."""
+    perThread = count // threads
+    workers = [
+        threading.Thread(target=lambda: [work(index) for index in range(perThread)])
+        for _ in range(threads)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return round((time.perf_counter() - start) / (perThread * threads) * 1e6, 3)
+
+
+def _measure(client, threads, count):
+    """Return the costs of each path with a number of calling threads."""
+    dynalite = client.dynalite
+    loop = client.loop
+    result = {}
+    result["command_adhoc_wait_us"] = _inThreads(
+        threads,
+        count,
+        lambda index: asyncio.run_coroutine_threadsafe(
+            _setChannel(dynalite, 1 + index % 50, 1 + index % 8), loop
+        ).result(),
+    )
+    result["command_adhoc_us"] = _inThreads(
+        threads,
+        count,
+        lambda index: asyncio.run_coroutine_threadsafe(
+            _setChannel(dynalite, 1 + index % 50, 1 + index % 8), loop
+        ),
+    )
+    client.call(lambda: None)  # wait for the queued calls
+    wakeups = client.wakeups
+    result["command_facade_us"] = _inThreads(
+        threads, count, lambda index: client.setChannel(1 + index % 50, 1 + index % 8, 0.5, 0)
+    )
+    client.call(lambda: None)
+    result["command_facade_wakeups"] = client.wakeups - wakeups
+    result["read_adhoc_us"] = _inThreads(
+        threads,
+        count,
+        lambda index: asyncio.run_coroutine_threadsafe(
+            _getAreaPreset(dynalite, 1 + index % 50), loop
+        ).result(),
+    )
+    result["read_facade_us"] = _inThreads(
+        threads, count, lambda index: client.getAreaPreset(1 + index % 50)
+    )
+    return result
+
+
+def run(count=COMMANDS):
+    """Return the measurements as a dict."""
+    logging.getLogger("dynalite_lib").setLevel(logging.ERROR)  # the Dynet is never connected
+    client = ThreadedDynalite(config=largeConfig())
+    client.start()
+    try:
+        _measure(client, 1, 1000)  # warm up
+        result = {"commands": count}
+        for threads in THREADS:
+            result["threads_%d" % threads] = _measure(client, threads, count)
+    finally:
+        client.stop()
+    return result
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,152 @@
+"""Compare the round-trip latency of Dynet over a serial port and over a TCP gateway.
+
+A pseudo-terminal stands in for the USB-RS485 adapter and a loopback socket for the gateway, so
+this measures the library and kernel path only - neither emulates the line speed, only the
+Dynet pacing for the baud rate is applied.
+Each round trip is a frame from the far end, decoded by Dynet, answered through Dynet.write.
+
+Run with: python -m benchmarks.transport_latency
+"""
+import asyncio
+import json
+import os
+import statistics
+import time
+import tty
+
+from dynalite_lib.const import TRANSPORT_SERIAL, TRANSPORT_TCP, DEFAULT_BAUDRATE
+from dynalite_lib.dynet import Dynet, DynetPacket
+
+ROUND_TRIPS = 500
+FRAME = bytes([28, 1, 0, 0, 0, 0, 255, 228])
+
+
+class Peer(object):
+    """Class for the far end of the link - the adapter or the gateway."""
+
+    def __init__(self, loop):
+        """Initialize the peer."""
+        self.loop = loop
+        self.received = None
+        self.buffer = b""
+
+    def feed(self, data):
+        """Collect bytes and wake the waiter on a whole frame."""
+        self.buffer += data
+        if len(self.buffer) >= 8 and self.received is not None and not self.received.done():
+            self.buffer = self.buffer[8:]
+            self.received.set_result(None)
+
+    async def roundTrip(self, send):
+        """Return seconds between sending a frame and getting the answer."""
+        self.received = self.loop.create_future()
+        start = time.perf_counter()
+        send(FRAME)
+        await self.received
+        return time.perf_counter() - start
+
+
+async def _measure(loop, transport, peer, send, count, **kwargs):
+    """Connect a Dynet, echo every frame back, and time count round trips."""
+    connected = asyncio.Event()
+
+    async def onConnect(dynet=None, transport=None):
+        connected.set()
+
+    dynet = Dynet(
+        transport=transport,
+        loop=loop,
+        broadcaster=lambda event: None,
+        onConnect=onConnect,
+        messageDelay=0,
+        **kwargs
+    )
+    dynet.frameHandler = lambda frame: dynet.write(DynetPacket(msg=list(frame)))
+    dynet.connect()
+    await asyncio.wait_for(connected.wait(), 5)
+    await asyncio.sleep(0.01)  # let the far end accept
+    times = [await peer.roundTrip(send) for _ in range(count)]
+    dynet.close()
+    await asyncio.sleep(0.01)
+    return _summary(times)
+
+
+def _summary(times):
+    """Return latency percentiles in microseconds."""
+    times = sorted(times)
+    return {
+        "round_trips": len(times),
+        "median_us": round(statistics.median(times) * 1e6, 1),
+        "p99_us": round(times[int(len(times) * 0.99) - 1] * 1e6, 1),
+        "max_us": round(times[-1] * 1e6, 1),
+    }
+
+
+async def serial(loop, count, baudrate=DEFAULT_BAUDRATE):
+    """Measure round trips through a pseudo-terminal - Dynet paces writes to the baud rate."""
+    master, slave = os.openpty()
+    tty.setraw(master)
+    os.set_blocking(master, False)
+    peer = Peer(loop)
+    loop.add_reader(master, lambda: peer.feed(os.read(master, 4096)))
+    try:
+        return await _measure(
+            loop,
+            TRANSPORT_SERIAL,
+            peer,
+            lambda data: os.write(master, data),
+            count,
+            device=os.ttyname(slave),
+            baudrate=baudrate,
+        )
+    finally:
+        loop.remove_reader(master)
+        os.close(master)
+        os.close(slave)
+
+
+async def tcp(loop, count):
+    """Measure round trips through a loopback gateway."""
+    peer = Peer(loop)
+    writers = []
+
+    async def gateway(reader, writer):
+        writers.append(writer)
+        while True:
+            data = await reader.read(4096)
+            if not data:
+                break
+            peer.feed(data)
+
+    server = await asyncio.start_server(gateway, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        return await _measure(
+            loop,
+            TRANSPORT_TCP,
+            peer,
+            lambda data: writers[0].write(data),
+            count,
+            host="127.0.0.1",
+            port=port,
+        )
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def run(count=ROUND_TRIPS):
+    """Return the measurements as a dict."""
+    loop = asyncio.new_event_loop()
+    try:
+        return {
+            "serial_9600": loop.run_until_complete(serial(loop, count)),
+            "serial_230400": loop.run_until_complete(serial(loop, count, 230400)),
+            "tcp": loop.run_until_complete(tcp(loop, count)),
+        }
+    finally:
+        loop.close()
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -4,3 +4,7 @@ from .dynet import Dynet
 from .dynet import DynetPacket
 from .const import *
 from .inbound import DynetInbound
+from .sharedstate import SharedStateReader, SharedStateWriter
+from .serialize import NdjsonEncoder, encodeEventsBinary, decodeEventsBinary
+from .threaded import ThreadedDynalite
+from .eventloop import newEventLoop
@@ -0,0 +1,167 @@
+"""
+@ Author      : Troy Kelly
+@ Date        : 19 Oct 2026
+@ Description : Philips Dynalite Library - Binary capture of bus traffic and time-accurate replay
+
+@ Notes:        A capture file is a header followed by fixed-width records: wall clock timestamp,
+                direction and the 8 raw bytes of the frame. The recorder rotates files like
+                logging.handlers.RotatingFileHandler (capture, capture.1, capture.2, ...).
+                The replayer feeds the inbound frames of a capture into a Dynet receive pipeline at
+                real time, scaled or maximum speed.
+"""
+
+import asyncio
+import os
+import struct
+import time
+
+CAPTURE_MAGIC = b"DYNC"
+CAPTURE_VERSION = 1
+CAPTURE_HEADER = struct.Struct("<4sHH")  # magic, version, record size
+# timestamp, direction, frame
+CAPTURE_RECORD = struct.Struct("<dB8s")
+DIRECTION_IN = 0
+DIRECTION_OUT = 1
+DEFAULT_CAPTURE_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_CAPTURE_BACKUPS = 3
+
+
+class CaptureError(Exception):
+    """Class for capture file errors."""
+
+    def __init__(self, message):
+        """Initialize the error."""
+        self.message = message
+
+
+class CaptureRecorder(object):
+    """Class to append timestamped raw frames to a rotating capture file."""
+
+    def __init__(self, path, maxBytes=DEFAULT_CAPTURE_MAX_BYTES, backupCount=DEFAULT_CAPTURE_BACKUPS):
+        """Initialize the recorder and open the capture file - 0 maxBytes never rotates."""
+        self.path = path
+        self.maxBytes = maxBytes
+        self.backupCount = backupCount
+        self.frames = 0
+        self.rotations = 0
+        self._file = None
+        self._open()
+
+    def _open(self):
+        """Open the capture file for appending, writing the header to a new file."""
+        self._file = open(self.path, "ab")
+        self._size = self._file.tell()
+        if self._size == 0:
+            self._file.write(
+                CAPTURE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, CAPTURE_RECORD.size)
+            )
+            self._size = CAPTURE_HEADER.size
+
+    def record(self, frame, direction=DIRECTION_IN, timestamp=None):
+        """Append one frame."""
+        if self._file is None:
+            return
+        if self.maxBytes and self._size + CAPTURE_RECORD.size > self.maxBytes:
+            self.rotate()
+        self._file.write(
+            CAPTURE_RECORD.pack(
+                time.time() if timestamp is None else timestamp, direction, bytes(frame)
+            )
+        )
+        self._size += CAPTURE_RECORD.size
+        self.frames += 1
+
+    def rotate(self):
+        """Move the capture file to .1, shifting older backups, and start a new one."""
+        self._file.close()
+        if self.backupCount > 0:
+            for index in range(self.backupCount - 1, 0, -1):
+                source = "%s.%d" % (self.path, index)
+                if os.path.exists(source):
+                    os.replace(source, "%s.%d" % (self.path, index + 1))
+            os.replace(self.path, self.path + ".1")
+        else:
+            os.remove(self.path)
+        self.rotations += 1
+        self._open()
+
+    def flush(self):
+        """Write buffered records to disk."""
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        """Close the capture file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def readCapture(path):
+    """Yield (timestamp, direction, frame) for every record of a capture file."""
+    with open(path, "rb") as captureFile:
+        header = captureFile.read(CAPTURE_HEADER.size)
+        if len(header) < CAPTURE_HEADER.size:
+            raise CaptureError("%s is not a capture file" % path)
+        magic, version, recordSize = CAPTURE_HEADER.unpack(header)
+        if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION or recordSize != CAPTURE_RECORD.size:
+            raise CaptureError("%s is not a version %d capture file" % (path, CAPTURE_VERSION))
+        while True:
+            chunk = captureFile.read(recordSize * 1024)
+            if not chunk:
+                return
+            whole = len(chunk) - len(chunk) % recordSize  # a torn last record is skipped
+            for record in CAPTURE_RECORD.iter_unpack(chunk[:whole]):
+                yield record
+
+
+def _receiver(target):
+    """Return the Dynet whose receive pipeline a replay feeds - a Dynet, DynetGateways or a started Dynalite."""
+    dynet = getattr(target, "_dynet", target)
+    if hasattr(dynet, "dynets"):  # several gateways share one broadcaster
+        dynet = dynet.dynets[0]
+    return dynet
+
+
+class CaptureReplayer(object):
+    """Class to feed captured inbound frames into a Dynet at real time, scaled or maximum speed."""
+
+    def __init__(self, records, loop=None, speed=1.0):
+        """Initialize with capture records - speed 2 is twice real time, 0 is as fast as possible."""
+        self._records = records
+        self._loop = loop if loop else asyncio.get_event_loop()
+        self.speed = speed
+        self.frames = 0
+        self.maxLag = 0.0
+
+    @classmethod
+    def fromFile(cls, path, loop=None, speed=1.0):
+        """Create a replayer for a capture file."""
+        return cls(readCapture(path), loop=loop, speed=speed)
+
+    async def replay(self, target):
+        """Feed every inbound frame to the target and return the replay counters."""
+        dynet = _receiver(target)
+        started = self._loop.time()
+        first = None
+        for timestamp, direction, frame in self._records:
+            if direction != DIRECTION_IN:
+                continue
+            if self.speed:
+                if first is None:
+                    first = timestamp
+                due = started + (timestamp - first) / self.speed
+                wait = due - self._loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                else:
+                    self.maxLag = max(self.maxLag, -wait)
+            await dynet._receive(frame)
+            self.frames += 1
+            if not self.speed and self.frames % 256 == 0:
+                await asyncio.sleep(0)  # let the events of the frames run
+        return {
+            "frames": self.frames,
+            "duration": self._loop.time() - started,
+            "max_lag": self.maxLag,
+        }
@@ -0,0 +1,61 @@
+"""
+@ Author      : Troy Kelly
+@ Date        : 19 Oct 2026
+@ Description : Philips Dynalite Library - Versioned feed of state changes
+
+@ Notes:        Every change of an area preset or channel level gets the next sequence number and is
+                kept in a bounded log, so a consumer that knows the last sequence it has seen can
+                ask for just what changed since then instead of the whole state.
+"""
+
+from collections import deque
+
+from .const import CONF_AREA, CONF_CHANNEL, CONF_LEVEL, CONF_PRESET
+
+DEFAULT_CHANGE_LOG_SIZE = 1024
+CONF_SEQUENCE = "seq"
+CONF_SNAPSHOT = "snapshot"
+CONF_CHANGES = "changes"
+
+
+class ChangeFeed(object):
+    """Class to number state changes and keep a bounded log of the recent ones."""
+
+    def __init__(self, maxlen=DEFAULT_CHANGE_LOG_SIZE):
+        """Initialize the feed."""
+        self.sequence = 0
+        self._log = deque(maxlen=maxlen)
+        self._latest = {}
+
+    def record(self, area, channel, value):
+        """Record a new preset (channel None) or channel level, return its sequence or None if unchanged."""
+        key = (area, channel)
+        if key in self._latest and self._latest[key] == value:
+            return None
+        self._latest[key] = value
+        self.sequence += 1
+        self._log.append((self.sequence, key, value))
+        return self.sequence
+
+    def changes_since(self, seq):
+        """Return the changes after seq, or a request to fetch a snapshot if they are no longer all known."""
+        if seq == self.sequence:
+            return {CONF_SEQUENCE: self.sequence, CONF_SNAPSHOT: False, CONF_CHANGES: []}
+        oldest = self._log[0][0] if self._log else self.sequence + 1
+        if seq > self.sequence or seq < oldest - 1:
+            return {CONF_SEQUENCE: self.sequence, CONF_SNAPSHOT: True}
+        latest = {}
+        for entrySeq, key, value in reversed(self._log):
+            if entrySeq <= seq:
+                break
+            if key not in latest:
+                latest[key] = (entrySeq, value)
+        changes = []
+        for (area, channel), (_, value) in sorted(
+            latest.items(), key=lambda item: item[1][0]
+        ):
+            if channel is None:
+                changes.append({CONF_AREA: area, CONF_PRESET: value})
+            else:
+                changes.append({CONF_AREA: area, CONF_CHANNEL: channel, CONF_LEVEL: value})
+        return {CONF_SEQUENCE: self.sequence, CONF_SNAPSHOT: False, CONF_CHANGES: changes}
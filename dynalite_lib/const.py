@@ -18,22 +18,64 @@ CONF_ALL = "ALL"
 CONF_AREA = "area"
 CONF_CHANNEL = "channel"
 CONF_AUTO_DISCOVER = "autodiscover"
+CONF_BAUDRATE = "baudrate"
+CONF_CAPTURE = "capture"
+CONF_CAPTURE_MAX_BYTES = "capture_max_bytes"
+CONF_METRICS = "metrics"
+CONF_METRICS_HOST = "metrics_host"
+CONF_METRICS_PORT = "metrics_port"
+CONF_PROFILE = "profile"
+CONF_TRACE_RATE = "trace_rate"
+CONF_TRACE_SAMPLE = "trace_sample"
+CONF_TASK_LIMIT = "task_limit"
+CONF_TASK_QUEUE = "task_queue"
+CONF_FAST_PATH = "fast_path"
+CONF_UVLOOP = "uvloop"
+CONF_CHANGE_LOG = "change_log"
+CONF_CONFIRMED = "confirmed"
+CONF_CONNECT_TIMEOUT = "connect_timeout"
+CONF_COVERAGE = "coverage"
+CONF_DEBOUNCE = "debounce"
+CONF_DEBOUNCE_EDGE = "edge"
+CONF_DEBOUNCE_INTERVAL = "interval"
 CONF_DEFAULT = "default"
+CONF_DEVICE = "device"
 CONF_DIR_IN = "IN"
+CONF_DURATION = "duration"
 CONF_FADE = "fade"
+CONF_FAILOVER = "failover"
+CONF_GATEWAYS = "gateways"
 CONF_HOST = "host"
 CONF_JOIN = "join"
+CONF_KEEPALIVE = "keepalive"
 CONF_LEVEL = "level"
+CONF_LISTENER_THREADS = "listener_threads"
+CONF_LIVENESS = "liveness"
+CONF_LIVENESS_TIMEOUT = "liveness_timeout"
 CONF_LOGLEVEL = "log_level"
 CONF_LOGFORMATTER = "log_formatter"
+CONF_MESSAGE_DELAY = "message_delay"
 CONF_NAME = "name"
 CONF_NODEFAULT = "nodefault"
+CONF_NODELAY = "nodelay"
 CONF_PORT = "port"
+CONF_POLLED = "polled"
 CONF_POLLTIMER = "polltimer"
 CONF_PRESET = "preset"
+CONF_RECEIVE_BUFFER = "receive_buffer"
+CONF_RECONNECT_CAP = "reconnect_cap"
+CONF_REPLAY = "replay"
+CONF_REPLAY_MAX_AGE = "replay_max_age"
+CONF_RESYNC = "resync"
+CONF_RESYNC_BUDGET = "resync_budget"
+CONF_SEND_BUFFER = "send_buffer"
+CONF_SHARED_STATE = "shared_state"
+CONF_SLOW_LISTENER = "slow_listener"
 CONF_STATE = "state"
 CONF_STATE_ON = "ON"
 CONF_STATE_OFF = "OFF"
+CONF_TOTAL = "total"
+CONF_TRANSPORT = "transport"
 CONF_TRGT_LEVEL = "target_level"
 
 EVENT_CHANNEL = "CHANNEL"
@@ -44,6 +86,39 @@ EVENT_NEWPRESET = "NEWPRESET"
 EVENT_NEWCHANNEL = "NEWCHANNEL"
 EVENT_PRESET = "PRESET"
 EVENT_REQPRESET = "REQPRESET"
+EVENT_RESYNC = "RESYNC"
+
+# how Dynet reaches the bus: a RS485-IP gateway over TCP or UDP, or a local RS485 adapter
+TRANSPORT_TCP = "tcp"
+TRANSPORT_UDP = "udp"
+TRANSPORT_SERIAL = "serial"
+DEFAULT_BAUDRATE = 9600
+# seconds of silence on the bus before the connection is probed with a REQUEST_PRESET - opt-in
+DEFAULT_LIVENESS = None
+
+# what is done with queued commands when a connection is re-established - any combination
+REPLAY_EXPIRE = "expire"  # drop commands queued longer than replay_max_age
+REPLAY_LATEST = "latest"  # keep only the last command for each area preset or channel
+REPLAY_DROP_POLLS = "drop_polls"  # drop preset and level requests
+
+# how a listener callback is run: directly from the broadcast, in its own task on the loop, or in a thread pool
+LISTENER_INLINE = "inline"
+LISTENER_TASK = "task"
+LISTENER_THREAD = "thread"
+DEFAULT_LISTENER_THREADS = 4
+# events queued for a thread listener before the oldest are dropped
+DEFAULT_LISTENER_MAX_PENDING = 1000
+# listener calls slower than this (seconds) are logged
+DEFAULT_SLOW_LISTENER = 0.1
+
+# what an event stream does with a new event when its buffer is full
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_COALESCE = "coalesce"
+OVERFLOW_BLOCK = "block"
+
+# which edge of a debounce window emits the first event of a burst
+DEBOUNCE_LEADING = "leading"
+DEBOUNCE_TRAILING = "trailing"
 
 # if a request for channel level didn't get acknowledge, when to retry (subsequent retries will be 2x, 4x, 8x, etc.)
 INITIAL_RETRY_DELAY = 1
@@ -0,0 +1,74 @@
+"""
+@ Author      : Troy Kelly
+@ Date        : 19 Oct 2026
+@ Description : Philips Dynalite Library - Per-entity debouncing of events
+
+@ Notes:        Within a window of interval seconds an entity emits at most one event on the leading
+                edge (if enabled) and the last event of the window on the trailing edge, so the final
+                state is always delivered. Events replaced within the window are counted as suppressed.
+"""
+
+DEFAULT_DEBOUNCE_INTERVAL = 0.25
+
+
+class Debouncer(object):
+    """Class to rate limit events per key while always emitting the latest one."""
+
+    def __init__(self, loop, emit, interval=DEFAULT_DEBOUNCE_INTERVAL, leading=True):
+        """Initialize the debouncer."""
+        self._loop = loop
+        self._emit = emit
+        self.interval = interval
+        self.leading = leading
+        self._windows = {}  # key -> [timer, pending event or None]
+        self.emitted = 0
+        self.suppressed = 0
+        self.suppressedByKey = {}
+
+    def push(self, key, event):
+        """Emit or hold an event for key."""
+        window = self._windows.get(key)
+        if window is None:
+            window = [self._loop.call_later(self.interval, self._expire, key), None]
+            self._windows[key] = window
+            if self.leading:
+                self._send(event)
+                return
+        elif window[1] is not None:
+            self.suppressed += 1
+            self.suppressedByKey[key] = self.suppressedByKey.get(key, 0) + 1
+        window[1] = event
+
+    def _send(self, event):
+        """Emit an event."""
+        self.emitted += 1
+        self._emit(event)
+
+    def _expire(self, key):
+        """Close the window of key, emitting the held event and opening a new window if there was one."""
+        window = self._windows.pop(key, None)
+        if window is None or window[1] is None:
+            return
+        self._windows[key] = [
+            self._loop.call_later(self.interval, self._expire, key),
+            None,
+        ]
+        self._send(window[1])
+
+    def flush(self):
+        """Emit all held events now and close all windows."""
+        windows = self._windows
+        self._windows = {}
+        for window in windows.values():
+            window[0].cancel()
+            if window[1] is not None:
+                self._send(window[1])
+
+    def stats(self):
+        """Return the counters of the debouncer."""
+        return {
+            "emitted": self.emitted,
+            "suppressed": self.suppressed,
+            "pending": sum(1 for window in self._windows.values() if window[1] is not None),
+            "suppressed_by_entity": dict(self.suppressedByKey),
+        }
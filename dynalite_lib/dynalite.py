@@ -8,7 +8,17 @@
 
 import asyncio
 import logging
-from .dynet import Dynet, DynetControl
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .dynet import (
+    Dynet,
+    DynetControl,
+    DEFAULT_MESSAGE_DELAY,
+    DEFAULT_KEEPALIVE,
+    DEFAULT_LIVENESS_TIMEOUT,
+)
+from .reconnect import DEFAULT_REPLAY_MAX_AGE, DEFAULT_RECONNECT_CAP
 from .event import DynetEvent
 
 from .const import (
@@ -42,6 +52,23 @@ from .const import (
     EVENT_NEWCHANNEL,
     EVENT_PRESET,
     EVENT_CHANNEL,
+    EVENT_RESYNC,
+    CONF_RESYNC,
+    CONF_RESYNC_BUDGET,
+    CONF_CAPTURE,
+    CONF_CAPTURE_MAX_BYTES,
+    CONF_METRICS,
+    CONF_METRICS_HOST,
+    CONF_METRICS_PORT,
+    CONF_PROFILE,
+    CONF_TRACE_RATE,
+    CONF_TRACE_SAMPLE,
+    CONF_TASK_LIMIT,
+    CONF_TASK_QUEUE,
+    CONF_FAST_PATH,
+    CONF_UVLOOP,
+    CONF_POLLED,
+    CONF_COVERAGE,
     STARTUP_RETRY_DELAY,
     INITIAL_RETRY_DELAY,
     MAXIMUM_RETRY_DELAY,
@@ -49,7 +76,55 @@ from .const import (
     CONF_ACTIVE,
     CONF_ACTIVE_ON,
     CONF_ACTIVE_INIT,
+    CONF_SHARED_STATE,
+    CONF_CHANGE_LOG,
+    CONF_TRANSPORT,
+    CONF_DEVICE,
+    CONF_BAUDRATE,
+    CONF_MESSAGE_DELAY,
+    CONF_NODELAY,
+    CONF_KEEPALIVE,
+    CONF_SEND_BUFFER,
+    CONF_RECEIVE_BUFFER,
+    CONF_LIVENESS,
+    CONF_LIVENESS_TIMEOUT,
+    CONF_FAILOVER,
+    CONF_REPLAY,
+    CONF_REPLAY_MAX_AGE,
+    CONF_RECONNECT_CAP,
+    CONF_CONNECT_TIMEOUT,
+    TRANSPORT_TCP,
+    DEFAULT_BAUDRATE,
+    DEFAULT_LIVENESS,
+    LISTENER_INLINE,
+    LISTENER_TASK,
+    LISTENER_THREAD,
+    CONF_LISTENER_THREADS,
+    CONF_SLOW_LISTENER,
+    CONF_GATEWAYS,
+    DEFAULT_LISTENER_THREADS,
+    DEFAULT_LISTENER_MAX_PENDING,
+    DEFAULT_SLOW_LISTENER,
+    OVERFLOW_DROP_OLDEST,
+    CONF_DEBOUNCE,
+    CONF_DEBOUNCE_EDGE,
+    CONF_DEBOUNCE_INTERVAL,
+    DEBOUNCE_LEADING,
+    DEBOUNCE_TRAILING,
 )
+from .subscription import SubscriptionIndex, subscriptionKey, WILDCARD
+from .stream import EventStream, DEFAULT_STREAM_SIZE
+from .debounce import Debouncer, DEFAULT_DEBOUNCE_INTERVAL
+from .gateway import DynetGateways, parseGateways
+from .sharedstate import SharedStateWriter, SharedStateError
+from .changefeed import ChangeFeed, DEFAULT_CHANGE_LOG_SIZE, CONF_SEQUENCE
+from .resync import StalenessTracker, ResyncPass, DEFAULT_RESYNC_BUDGET
+from .capture import CaptureRecorder, DEFAULT_CAPTURE_MAX_BYTES
+from .metrics import MetricsRegistry, MetricsServer, DEFAULT_METRICS_HOST
+from .profiling import PipelineProfiler, STAGE_PROCESS, STAGE_DISPATCH
+from .trace import DEFAULT_TRACE_SAMPLE
+from .tasks import TaskTracker, DEFAULT_TASK_QUEUE
+from .eventloop import loopName, uvloopAvailable, LOOP_UVLOOP
 
 
 class BroadcasterError(Exception):
@@ -99,6 +174,112 @@ class DynaliteConfig(object):
         )
         self.host = config[CONF_HOST] if CONF_HOST in config else "localhost"
         self.port = config[CONF_PORT] if CONF_PORT in config else 12345
+        self.transport = (
+            config[CONF_TRANSPORT] if CONF_TRANSPORT in config else TRANSPORT_TCP
+        )  # "udp" for a datagram gateway, "serial" for a local RS485 adapter
+        self.device = (
+            config[CONF_DEVICE] if CONF_DEVICE in config else None
+        )  # tty of the RS485 adapter, e.g. /dev/ttyUSB0
+        self.baudrate = (
+            config[CONF_BAUDRATE] if CONF_BAUDRATE in config else DEFAULT_BAUDRATE
+        )
+        self.message_delay = (
+            config[CONF_MESSAGE_DELAY]
+            if CONF_MESSAGE_DELAY in config
+            else DEFAULT_MESSAGE_DELAY
+        )  # milliseconds between two frames sent to the bus
+        self.nodelay = config[CONF_NODELAY] if CONF_NODELAY in config else True
+        self.keepalive = (
+            config[CONF_KEEPALIVE] if CONF_KEEPALIVE in config else DEFAULT_KEEPALIVE
+        )  # seconds idle before TCP keepalive probes, 0 to disable
+        self.send_buffer = config[CONF_SEND_BUFFER] if CONF_SEND_BUFFER in config else None
+        self.receive_buffer = (
+            config[CONF_RECEIVE_BUFFER] if CONF_RECEIVE_BUFFER in config else None
+        )
+        self.liveness = (
+            config[CONF_LIVENESS] if CONF_LIVENESS in config else DEFAULT_LIVENESS
+        )  # seconds of bus silence before a probe, None or 0 to disable
+        self.liveness_timeout = (
+            config[CONF_LIVENESS_TIMEOUT]
+            if CONF_LIVENESS_TIMEOUT in config
+            else DEFAULT_LIVENESS_TIMEOUT
+        )  # seconds to wait for an answer to the probe before reconnecting
+        self.failover = (
+            [(gateway[CONF_HOST], gateway[CONF_PORT]) for gateway in config[CONF_FAILOVER]]
+            if CONF_FAILOVER in config
+            else []
+        )  # other addresses of the gateway, tried in turn when it cannot be reached
+        self.replay = (
+            config[CONF_REPLAY] if CONF_REPLAY in config else []
+        )  # what to do with queued commands on reconnect, e.g. ["expire", "latest", "drop_polls"]
+        self.replay_max_age = (
+            config[CONF_REPLAY_MAX_AGE]
+            if CONF_REPLAY_MAX_AGE in config
+            else DEFAULT_REPLAY_MAX_AGE
+        )
+        self.reconnect_cap = (
+            config[CONF_RECONNECT_CAP]
+            if CONF_RECONNECT_CAP in config
+            else DEFAULT_RECONNECT_CAP
+        )  # longest wait in seconds between reconnect attempts
+        self.connect_timeout = (
+            config[CONF_CONNECT_TIMEOUT] if CONF_CONNECT_TIMEOUT in config else 30
+        )
+        self.resync = (
+            config[CONF_RESYNC] if CONF_RESYNC in config else True
+        )  # re-poll entities not confirmed since a disconnect once reconnected
+        self.resync_budget = (
+            config[CONF_RESYNC_BUDGET]
+            if CONF_RESYNC_BUDGET in config
+            else DEFAULT_RESYNC_BUDGET
+        )  # most polls one resync pass may send
+        self.capture = (
+            config[CONF_CAPTURE] if CONF_CAPTURE in config else None
+        )  # path of a binary capture of all bus traffic, if any
+        self.capture_max_bytes = (
+            config[CONF_CAPTURE_MAX_BYTES]
+            if CONF_CAPTURE_MAX_BYTES in config
+            else DEFAULT_CAPTURE_MAX_BYTES
+        )  # size at which the capture file is rotated
+        self.metrics = (
+            config[CONF_METRICS] if CONF_METRICS in config else False
+        )  # keep counters, gauges and latency histograms in Dynalite.metrics
+        self.metrics_host = (
+            config[CONF_METRICS_HOST] if CONF_METRICS_HOST in config else DEFAULT_METRICS_HOST
+        )
+        self.metrics_port = (
+            config[CONF_METRICS_PORT] if CONF_METRICS_PORT in config else None
+        )  # serve the metrics over HTTP at /metrics on this port, if any
+        self.profile = (
+            config[CONF_PROFILE] if CONF_PROFILE in config else None
+        )  # time one inbound frame in this many per pipeline stage, e.g. 100
+        self.trace_sample = (
+            config[CONF_TRACE_SAMPLE] if CONF_TRACE_SAMPLE in config else DEFAULT_TRACE_SAMPLE
+        )  # trace one frame in this many when dynalite_lib.frames logs at debug
+        self.trace_rate = (
+            config[CONF_TRACE_RATE] if CONF_TRACE_RATE in config else None
+        )  # most frames traced a second
+        self.task_limit = (
+            config[CONF_TASK_LIMIT] if CONF_TASK_LIMIT in config else None
+        )  # most library tasks in flight - more work waits in a ring instead of becoming tasks
+        self.task_queue = (
+            config[CONF_TASK_QUEUE] if CONF_TASK_QUEUE in config else DEFAULT_TASK_QUEUE
+        )  # size of that ring
+        self.fast_path = (
+            config[CONF_FAST_PATH] if CONF_FAST_PATH in config else False
+        )  # handle inbound events, broadcasts and commands directly instead of in tasks
+        self.uvloop = (
+            config[CONF_UVLOOP] if CONF_UVLOOP in config else False
+        )  # run on uvloop when installed - applies to loops the library creates
+        self.gateways = (
+            parseGateways(config[CONF_GATEWAYS]) if CONF_GATEWAYS in config else []
+        )  # (host, port, areas) of each gateway when areas are split over several buses
+        if (
+            self.gateways
+            and CONF_HOST in config
+            and all(areas is not None for _, _, areas in self.gateways)
+        ):
+            self.gateways.append((self.host, self.port, None))  # default for other areas
         self.default = config[CONF_DEFAULT] if CONF_DEFAULT in config else {}
         self.area = config[CONF_AREA] if CONF_AREA in config else {}
         self.preset = config[CONF_PRESET] if CONF_PRESET in config else {}
@@ -109,54 +290,210 @@ class DynaliteConfig(object):
             config[CONF_POLLTIMER] if CONF_POLLTIMER in config else 1
         )  # default poll 1 sec
         self.active = config[CONF_ACTIVE] if CONF_ACTIVE in config else False
+        self.shared_state = (
+            config[CONF_SHARED_STATE] if CONF_SHARED_STATE in config else None
+        )  # path of the memory-mapped state table, if any
+        self.change_log = (
+            config[CONF_CHANGE_LOG]
+            if CONF_CHANGE_LOG in config
+            else DEFAULT_CHANGE_LOG_SIZE
+        )  # number of recent state changes kept for changes_since
+        self.debounce = (
+            config[CONF_DEBOUNCE] if CONF_DEBOUNCE in config else None
+        )  # per channel rate limit of CHANNEL events, e.g. {"interval": 0.25, "edge": "leading"}
+        self.listener_threads = (
+            config[CONF_LISTENER_THREADS]
+            if CONF_LISTENER_THREADS in config
+            else DEFAULT_LISTENER_THREADS
+        )  # size of the thread pool shared by listeners in thread mode
+        self.slow_listener = (
+            config[CONF_SLOW_LISTENER]
+            if CONF_SLOW_LISTENER in config
+            else DEFAULT_SLOW_LISTENER
+        )  # seconds after which a listener call is reported as slow
 
 
 class Broadcaster(object):
     """Class to broadcast event to listeners."""
 
-    def __init__(self, listenerFunction=None, loop=None, logger=None):
+    def __init__(
+        self,
+        listenerFunction=None,
+        loop=None,
+        logger=None,
+        mode=None,
+        index=None,
+        executor=None,
+        maxPending=DEFAULT_LISTENER_MAX_PENDING,
+        slowThreshold=DEFAULT_SLOW_LISTENER,
+        metrics=None,
+        tasks=None,
+    ):
         """Initialize the broadcaster."""
         if listenerFunction is None:
             raise BroadcasterError("A broadcaster bust have a listener Function")
+        if mode is None:
+            mode = LISTENER_TASK if loop else LISTENER_INLINE
+        if mode not in [LISTENER_INLINE, LISTENER_TASK, LISTENER_THREAD]:
+            raise BroadcasterError("Unknown listener mode %s" % mode)
+        if mode in [LISTENER_TASK, LISTENER_THREAD] and not loop:
+            raise BroadcasterError("A %s listener must have a loop" % mode)
+        if mode == LISTENER_THREAD and executor is None:
+            raise BroadcasterError("A thread listener must have an executor")
         self._listenerFunction = listenerFunction
-        self._monitoredEvents = []
+        self._subscriptions = set()
         self._loop = loop
+        self._index = index
+        self._executor = executor
+        self._tasks = tasks if tasks is not None or loop is None else TaskTracker(loop)
+        self._pending = deque()
+        self._running = False
+        self.mode = mode
         self.logger = logger
+        self.maxPending = maxPending
+        self.slowThreshold = slowThreshold
+        self.calls = 0
+        self.slowCalls = 0
+        self.dropped = 0
+        self.totalTime = 0.0
+        self.maxTime = 0.0
+        self._latency = None
+        self._dropped = None
+        if metrics is not None:
+            self._latency = metrics.histogram(
+                "listener_seconds", "Time spent in listener calls by mode", mode=mode
+            )
+            self._dropped = metrics.counter(
+                "listener_dropped", "Events dropped by full thread listener queues"
+            )
 
-    def monitorEvent(self, eventType=None):
-        """Set broadcaster to monitor an event or all."""
+    def monitorEvent(self, eventType=None, area=None, channel=None):
+        """Set broadcaster to monitor an event or all, optionally only for an area or channel."""
         if eventType is None:
             raise BroadcasterError("Must supply an event type to monitor")
-        eventType = eventType.upper()
-        if eventType not in self._monitoredEvents:
-            self._monitoredEvents.append(eventType.upper())
-
-    def unmonitorEvent(self, eventType=None):
+        if channel not in [None, WILDCARD] and area in [None, WILDCARD]:
+            raise BroadcasterError("Must supply an area to monitor a channel")
+        key = subscriptionKey(eventType, area, channel)
+        if key not in self._subscriptions:
+            self._subscriptions.add(key)
+            if self._index is not None:
+                self._index.add(self, *key)
+
+    def unmonitorEvent(self, eventType=None, area=None, channel=None):
         """Stop monitoring an event."""
         if eventType is None:
             raise BroadcasterError("Must supply an event type to un-monitor")
-        eventType = eventType.upper()
-        if eventType in self._monitoredEvents:
-            self._monitoredEvents.remove(eventType.upper())
+        key = subscriptionKey(eventType, area, channel)
+        if key in self._subscriptions:
+            self._subscriptions.remove(key)
+            if self._index is not None:
+                self._index.remove(self, *key)
+
+    def unmonitorAll(self):
+        """Stop monitoring all events."""
+        for key in list(self._subscriptions):
+            self.unmonitorEvent(*key)
+
+    def monitors(self, event):
+        """Return whether an event matches one of the monitored events."""
+        area = event.get(CONF_AREA)
+        channel = event.get(CONF_CHANNEL)
+        for eventType in (event.eventType, WILDCARD):
+            if (
+                (eventType, None, None) in self._subscriptions
+                or (eventType, area, None) in self._subscriptions
+                or (eventType, area, channel) in self._subscriptions
+            ):
+                return True
+        return False
 
     def update(self, event=None, dynalite=None):
         """Update listener with an event if relevant."""
         if event is None:
             return
-        if (
-            event.eventType not in self._monitoredEvents
-            and "*" not in self._monitoredEvents
-        ):
+        if not self.monitors(event):
             return
-        if self._loop:
-            self._loop.create_task(self._callUpdater(event=event, dynalite=dynalite))
+        self.deliver(event=event, dynalite=dynalite)
+
+    def deliver(self, event, dynalite=None):
+        """Pass an event that is known to be relevant to the listener."""
+        if self.mode == LISTENER_INLINE:
+            self._call(event, dynalite)
+        elif self.mode == LISTENER_TASK:
+            self._tasks.spawn(self._callUpdater(event=event, dynalite=dynalite))
         else:
+            if len(self._pending) >= self.maxPending:
+                self._pending.popleft()
+                self.dropped += 1
+                if self._dropped is not None:
+                    self._dropped.inc()
+            self._pending.append((event, dynalite))
+            if not self._running:
+                self._submit()
+
+    def _submit(self):
+        """Run everything pending in the executor, in order, one batch at a time."""
+        batch = list(self._pending)
+        self._pending.clear()
+        self._running = True
+        future = self._loop.run_in_executor(self._executor, self._callBatch, batch)
+        future.add_done_callback(self._batchDone)
+
+    def _batchDone(self, future):
+        """Start the next batch, if events arrived while the last one ran."""
+        self._running = False
+        if self._latency is not None and not future.cancelled() and future.exception() is None:
+            for elapsed in future.result():  # observed here to keep metrics on the loop thread
+                self._latency.observe(elapsed)
+        if self._pending:
+            self._submit()
+
+    def _callBatch(self, batch):
+        """Call the listener for a batch of events and return the call times - runs in the executor."""
+        return [self._call(event, dynalite) for event, dynalite in batch]
+
+    def _call(self, event, dynalite):
+        """Call the listener, timing it and logging failures and slow calls - return the call time."""
+        start = time.perf_counter()
+        try:
             self._listenerFunction(event=event, dynalite=dynalite)
+        except Exception:  # pylint: disable=broad-except
+            if self.logger:
+                self.logger.exception("Listener failed on event %s", event.eventType)
+        elapsed = time.perf_counter() - start
+        self.calls += 1
+        self.totalTime += elapsed
+        if elapsed > self.maxTime:
+            self.maxTime = elapsed
+        if self.slowThreshold is not None and elapsed > self.slowThreshold:
+            self.slowCalls += 1
+            if self.logger:
+                self.logger.warning(
+                    "Slow listener %s took %.3f seconds on %s event",
+                    getattr(self._listenerFunction, "__name__", self._listenerFunction),
+                    elapsed,
+                    event.eventType,
+                )
+        if self._latency is not None and self.mode != LISTENER_THREAD:
+            self._latency.observe(elapsed)
+        return elapsed
+
+    def stats(self):
+        """Return the call counters and timings of the listener."""
+        return {
+            "mode": self.mode,
+            "calls": self.calls,
+            "slow_calls": self.slowCalls,
+            "dropped": self.dropped,
+            "pending": len(self._pending),
+            "total_time": self.totalTime,
+            "max_time": self.maxTime,
+        }
 
     @asyncio.coroutine
     def _callUpdater(self, event=None, dynalite=None):
         """Call listener callback function."""
-        self._listenerFunction(event=event, dynalite=dynalite)
+        self._call(event, dynalite)
 
 
 class DynalitePreset(object):
@@ -183,7 +520,7 @@ class DynalitePreset(object):
         self.area = area
         self.broadcastFunction = broadcastFunction
         self._control = dynetControl
-        if self.broadcastFunction:
+        if self.area.wantsEvent(EVENT_NEWPRESET):
             broadcastData = {
                 CONF_AREA: self.area.value,
                 CONF_PRESET: self.value,
@@ -199,7 +536,8 @@ class DynalitePreset(object):
         self.active = True
         if self.area:
             self.area.activePreset = self.value
-        if sendMQTT and self.broadcastFunction:
+            self.area.stateChanged()
+        if sendMQTT and self.area.wantsEvent(EVENT_PRESET):
             broadcastData = {
                 CONF_AREA: self.area.value,
                 CONF_PRESET: self.value,
@@ -225,7 +563,7 @@ class DynalitePreset(object):
     def turnOff(self, sendDynet=True, sendMQTT=True):
         """Turn the preset off."""
         self.active = False
-        if sendMQTT and self.broadcastFunction:
+        if sendMQTT and self.area.wantsEvent(EVENT_PRESET):
             broadcastData = {
                 CONF_AREA: self.area.value,
                 CONF_PRESET: self.value,
@@ -271,7 +609,7 @@ class DynaliteChannel(object):
         self.area = area
         self.broadcastFunction = broadcastFunction
         self._control = dynetControl
-        if self.broadcastFunction:
+        if self.area.wantsEvent(EVENT_NEWCHANNEL):
             broadcastData = {
                 CONF_AREA: self.area.value,
                 CONF_CHANNEL: self.value,
@@ -304,7 +642,7 @@ class DynaliteChannel(object):
             self.requestChannelLevel()
         else:
             self.setLevel(brightness)
-            if self.broadcastFunction or True:
+            if self.area.wantsEvent(EVENT_CHANNEL):
                 broadcastData = {
                     CONF_AREA: self.area.value,
                     CONF_CHANNEL: self.value,
@@ -338,6 +676,7 @@ class DynaliteChannel(object):
     def setLevel(self, level):
         """Set current channel level."""
         self.level = level
+        self.area.stateChanged(self)
 
 
 class RequestCounter:
@@ -402,6 +741,8 @@ class DynaliteArea(object):
         logger=None,
         broadcastFunction=None,
         dynetControl=None,
+        stateFunction=None,
+        wantsFunction=None,
     ):
         """Initialize the area."""
         if not value:
@@ -435,6 +776,8 @@ class DynaliteArea(object):
                 self.offPreset = offPreset
 
         self.broadcastFunction = broadcastFunction
+        self.stateFunction = stateFunction
+        self.wantsFunction = wantsFunction
         self._dynetControl = dynetControl
         
         if self._dynetControl.active == CONF_ACTIVE_ON:
@@ -507,6 +850,17 @@ class DynaliteArea(object):
         else:
             self.channel = {}
 
+    def wantsEvent(self, eventType):
+        """Return whether an event of this type would reach anyone, so it is worth building."""
+        if not self.broadcastFunction:
+            return False
+        return self.wantsFunction is None or self.wantsFunction(eventType)
+
+    def stateChanged(self, channel=None):
+        """Report a change of the active preset, or of a channel level."""
+        if self.stateFunction:
+            self.stateFunction(area=self, channel=channel)
+
     def presetOn(self, preset, sendDynet=True, sendMQTT=True, autodiscover=False):
         """Turn a selected preset on and everyone else off."""
         if hasattr(self, "onPreset"):
@@ -614,42 +968,181 @@ class Dynalite(object):
         logging.basicConfig(
             level=self._config.log_level, format=self._config.log_formatter
         )
+        if self._config.uvloop and uvloopAvailable() and loopName(self.loop) != LOOP_UVLOOP:
+            self.logger.warning(
+                "uvloop is configured but Dynalite was given an %s loop - create it with newEventLoop",
+                loopName(self.loop),
+            )
 
         self._configured = False
         self._autodiscover = False
+        self.tasks = TaskTracker(
+            self.loop,
+            limit=self._config.task_limit,
+            queueSize=self._config.task_queue,
+            logger=self.logger,
+        )
         self._listeners = []
+        self._stateListeners = []
+        self._subscriptions = SubscriptionIndex()
+        self._readPauses = 0
+        self._heldEvents = deque()  # events held while a blocking stream is full
+        self._executor = None
+        self._debouncer = None
+        if self._config.debounce:
+            debounce = self._config.debounce
+            edge = (
+                debounce[CONF_DEBOUNCE_EDGE]
+                if CONF_DEBOUNCE_EDGE in debounce
+                else DEBOUNCE_LEADING
+            )
+            if edge not in [DEBOUNCE_LEADING, DEBOUNCE_TRAILING]:
+                raise BroadcasterError("Unknown debounce edge %s" % edge)
+            self._debouncer = Debouncer(
+                self.loop,
+                self._dispatch,
+                interval=(
+                    debounce[CONF_DEBOUNCE_INTERVAL]
+                    if CONF_DEBOUNCE_INTERVAL in debounce
+                    else DEFAULT_DEBOUNCE_INTERVAL
+                ),
+                leading=(edge == DEBOUNCE_LEADING),
+            )
 
         self.devices = {CONF_AREA: {}}
 
         self._dynet = None
         self.control = None
+        self._sharedState = (
+            SharedStateWriter(self._config.shared_state)
+            if self._config.shared_state
+            else None
+        )
+        self._sharedStateSkipped = set()  # entities the table has no room for, warned about once
+        self._changes = ChangeFeed(self._config.change_log)
+        self.recorder = (
+            CaptureRecorder(self._config.capture, self._config.capture_max_bytes)
+            if self._config.capture
+            else None
+        )
+        self._staleness = StalenessTracker()
+        self._lostAt = {}  # loop time each Dynet went down
+        self._resyncs = {}  # running resync pass of each Dynet
+        self.lastResync = None
+        self.metrics = MetricsRegistry() if self._config.metrics else None
+        self.metricsServer = None
+        self.profiler = (
+            PipelineProfiler(self._config.profile) if self._config.profile else None
+        )
+        if self.metrics is not None:
+            self._eventsProcessed = {}
+            self._processTime = self.metrics.histogram(
+                "process_seconds", "Time to process an inbound event"
+            )
+            self.metrics.gauge(
+                "request_timers",
+                "Preset and channel requests waiting to be retried",
+                function=self._pendingRequests,
+            )
+            self.metrics.gauge(
+                "listeners", "Registered listeners", function=lambda: len(self._listeners)
+            )
+            self.metrics.gauge(
+                "tasks_in_flight", "Library tasks running", function=lambda: self.tasks.inFlight
+            )
+            self.metrics.gauge(
+                "tasks_queued", "Work waiting for a task slot", function=self.tasks.queued
+            )
 
     def start(self):
         """Queue request to start the class."""
-        self.loop.create_task(self._start())
+        self.tasks.track(self._start())
 
     @asyncio.coroutine
     def _start(self):
         """Start the class."""
-        self._dynet = Dynet(
-            host=self._config.host,
-            port=self._config.port,
+        if self.metrics is not None and self._config.metrics_port is not None:
+            self.metricsServer = MetricsServer(
+                self.metrics, self._config.metrics_host, self._config.metrics_port, loop=self.loop
+            )
+            self.tasks.track(self.metricsServer.start())
+        if self._config.gateways:
+            self._dynet = DynetGateways(
+                [
+                    (self._newDynet(host, port, areas=areas), areas)
+                    for host, port, areas in self._config.gateways
+                ],
+                logger=self.logger,
+            )
+        else:
+            self._dynet = self._newDynet(
+                self._config.host,
+                self._config.port,
+                transport=self._config.transport,
+                device=self._config.device,
+                failover=self._config.failover,
+            )
+        if self._readPauses:
+            self._dynet.pauseReading()
+        self.control = DynetControl(
+            self._dynet,
+            self.loop,
+            self._config.active,
+            areaDefinition=self.devices[CONF_AREA],
+            metrics=self.metrics,
+            tasks=self.tasks,
+            direct=self._config.fast_path,
+        )
+        self.connect()  # connect asynchronously. not needed to register devices
+        if not self._configured:
+            self.tasks.track(self._configure())
+
+    def _newDynet(
+        self, host, port, transport=TRANSPORT_TCP, device=None, areas=None, failover=None
+    ):
+        """Create the Dynet for a gateway or serial adapter."""
+        if not areas:  # the default gateway serves the configured areas no other gateway has
+            claimed = set()
+            for _, _, gatewayAreas in self._config.gateways:
+                claimed.update(gatewayAreas or [])
+            areas = [int(area) for area in self._config.area if int(area) not in claimed]
+        return Dynet(
+            host=host,
+            port=port,
+            transport=transport,
+            device=device,
+            baudrate=self._config.baudrate,
+            messageDelay=self._config.message_delay,
+            nodelay=self._config.nodelay,
+            keepalive=self._config.keepalive,
+            sendBuffer=self._config.send_buffer,
+            receiveBuffer=self._config.receive_buffer,
+            liveness=self._config.liveness,
+            livenessTimeout=self._config.liveness_timeout,
+            probeArea=min(areas) if areas else None,  # a configured area that answers preset requests
+            failover=failover,
+            replay=self._config.replay,
+            replayMaxAge=self._config.replay_max_age,
+            reconnectCap=self._config.reconnect_cap,
+            connectTimeout=self._config.connect_timeout,
+            recorder=self.recorder,
+            metrics=self.metrics,
+            profiler=self.profiler,
+            traceSample=self._config.trace_sample,
+            traceRate=self._config.trace_rate,
+            tasks=self.tasks,
             active=self._config.active,
             loop=self.loop,
-            broadcaster=self.processTraffic,
+            broadcaster=(
+                self.processTrafficNow if self._config.fast_path else self.processTraffic
+            ),
             onConnect=self._connected,
             onDisconnect=self._disconnection,
         )
-        self.control = DynetControl(
-            self._dynet, self.loop, self._config.active, areaDefinition=self.devices[CONF_AREA]
-        )
-        self.connect()  # connect asynchronously. not needed to register devices
-        if not self._configured:
-            self.loop.create_task(self._configure())
 
     def connect(self):
         """Queue command to connect to Dynet."""
-        self.loop.create_task(self._connect())
+        self.tasks.track(self._connect())
 
     @asyncio.coroutine
     def _connect(self):
@@ -659,31 +1152,107 @@ class Dynalite(object):
     @asyncio.coroutine
     def _connected(self, dynet=None, transport=None):
         """Handle a successful connection."""
-        self.broadcast(DynetEvent(eventType=EVENT_CONNECTED, data={}))
+        self.broadcast(DynetEvent(eventType=EVENT_CONNECTED, data=self._gatewayData(dynet)))
+        if dynet in self._lostAt:
+            self.resync(dynet, self._lostAt.pop(dynet))
 
     @asyncio.coroutine
     def _disconnection(self, dynet=None):
-        """Handle a disconnection and try to reconnect."""
-        self.broadcast(DynetEvent(eventType=EVENT_DISCONNECTED, data={}))
-        yield from asyncio.sleep(1)  # Don't overload the network
-        self.connect()
+        """Handle a disconnection - the Dynet reconnects by itself."""
+        self.broadcast(DynetEvent(eventType=EVENT_DISCONNECTED, data=self._gatewayData(dynet)))
+        if dynet not in self._lostAt:
+            self._lostAt[dynet] = self.loop.time()
+        if dynet in self._resyncs:
+            self._resyncs.pop(dynet).cancel()
+
+    def resync(self, dynet=None, since=None):
+        """Poll the entities of a Dynet not confirmed since a loop time, stalest first, within the budget."""
+        if not self._config.resync or self._config.active not in [
+            CONF_ACTIVE_ON,
+            CONF_ACTIVE_INIT,
+        ]:
+            return None  # polling is not allowed
+        if since is None:
+            since = self.loop.time()
+        entities = []
+        for areaValue, area in self.devices[CONF_AREA].items():
+            if (
+                dynet is not None
+                and self._config.gateways
+                and self._dynet.dynetForArea(areaValue) is not dynet
+            ):
+                continue
+            entities.append((areaValue, None))
+            entities.extend((areaValue, channel) for channel in area.channel)
+        if dynet in self._resyncs:
+            self._resyncs.pop(dynet).cancel()
+        resync = ResyncPass(
+            self.loop,
+            self._staleness,
+            entities,
+            self._poll,
+            since,
+            onComplete=lambda resync: self._resyncDone(dynet, resync),
+            budget=self._config.resync_budget,
+            interval=2 * self._config.message_delay / 1000,  # leave room for commands
+        )
+        self._resyncs[dynet] = resync
+        resync.start()
+        return resync
+
+    def _poll(self, area, channel=None):
+        """Ask the bus for an area preset (channel None) or a channel level, once."""
+        if channel is None:
+            self.control.request_area_preset(area)
+        else:
+            self.control.request_channel_level(area, channel)
+
+    def _resyncDone(self, dynet, resync):
+        """Report the coverage of a finished resync pass."""
+        if self._resyncs.get(dynet) is resync:
+            del self._resyncs[dynet]
+        self.lastResync = resync.result
+        self.logger.info(
+            "Resync polled %d entities, %.1f%% confirmed",
+            resync.result[CONF_POLLED],
+            resync.result[CONF_COVERAGE],
+        )
+        data = dict(resync.result)
+        data.update(self._gatewayData(dynet))
+        self.broadcast(DynetEvent(eventType=EVENT_RESYNC, data=data))
+
+    def _gatewayData(self, dynet):
+        """Return the event data naming the gateway of a Dynet."""
+        if dynet is None or not self._config.gateways:
+            return {}
+        host, port = dynet.address
+        return {CONF_HOST: host, CONF_PORT: port}
 
     def processTraffic(self, event):
         """Process an event that arrived from Dynet - queue."""
-        self.loop.create_task(self._processTraffic(event))
+        self.tasks.spawn(self._processTraffic(event))
 
     @asyncio.coroutine
     def _processTraffic(self, event):
         """Process an event that arrived from Dynet - async."""
+        self.processTrafficNow(event)
+
+    def processTrafficNow(self, event):
+        """Process an event that arrived from Dynet - direct."""
         # The logic here is:
         # - new area is created - ask for the current preset
         # - preset selected - turn the preset on but don't send it as a command
         # - new channel is created - ask for the current level
         # - channel update - update the level and if it is fading (actual != target), schedule a timer to ask again
         # - channel set command - request current level (may not be the target because of fade)
-        areaValue = event.data[CONF_AREA]
+        if self.metrics is not None:
+            start = time.perf_counter()
+        profiled = None
+        if self.profiler is not None and self.profiler.sample(STAGE_PROCESS):
+            profiled = self.profiler.now()
+        areaValue = event.get(CONF_AREA)
         if areaValue not in self.devices[CONF_AREA]:
-            self.logger.debug("Update from unknown area: %s" % event.toJson)
+            self.logger.debug("Update from unknown area: %s", areaValue)
             if self._autodiscover:
                 areaName = "Area " + str(areaValue)
                 areaFade = (
@@ -699,6 +1268,8 @@ class Dynalite(object):
                     logger=self.logger,
                     broadcastFunction=self.broadcast,
                     dynetControl=self.control,
+                    stateFunction=self._stateChanged,
+                    wantsFunction=self.wantsEvent,
                 )
             else:
                 return  # No need to do anything if the area is not defined and we do not have autodiscovery
@@ -710,73 +1281,135 @@ class Dynalite(object):
             )
         elif event.eventType == EVENT_PRESET:
             curArea.presetOn(
-                event.data[CONF_PRESET],
+                event.get(CONF_PRESET),
                 sendDynet=False,
                 sendMQTT=False,
                 autodiscover=self._autodiscover,
             )
             curArea.presetUpdateCounter.update()
+            self._staleness.confirm(areaValue, None, self.loop.time())
         elif event.eventType == EVENT_CHANNEL:
-            if event.data[CONF_ACTION] == CONF_ACTION_REPORT:
+            if event.get(CONF_ACTION) == CONF_ACTION_REPORT:
+                self._staleness.confirm(areaValue, event.get(CONF_CHANNEL), self.loop.time())
                 if self._config.active == CONF_ACTIVE_ON:
                     curArea.setChannelLevel(
-                        event.data[CONF_CHANNEL],
-                        (255 - event.data[CONF_ACT_LEVEL]) / 254.0,
+                        event.get(CONF_CHANNEL),
+                        (255 - event.get(CONF_ACT_LEVEL)) / 254.0,
                         self._autodiscover,
                     )
-                    if event.data[CONF_ACT_LEVEL] != event.data[CONF_TRGT_LEVEL]:
+                    if event.get(CONF_ACT_LEVEL) != event.get(CONF_TRGT_LEVEL):
                         self.loop.call_later(
                             self._polltimer,
                             curArea.requestChannelLevel,
-                            event.data[CONF_CHANNEL],
+                            event.get(CONF_CHANNEL),
                         )
                 else:
                     curArea.setChannelLevel(
-                        event.data[CONF_CHANNEL],
-                        (255 - event.data[CONF_TRGT_LEVEL]) / 254.0,
+                        event.get(CONF_CHANNEL),
+                        (255 - event.get(CONF_TRGT_LEVEL)) / 254.0,
                         self._autodiscover,
                     )
                     
-            elif event.data[CONF_ACTION] == CONF_ACTION_CMD:
+            elif event.get(CONF_ACTION) == CONF_ACTION_CMD:
                 target_level = False
-                if CONF_PRESET in event.data:
+                if CONF_PRESET in event:
                     try:
                         target_level = curArea.channel[
-                            event.data[CONF_CHANNEL]
-                        ].presets[str(event.data[CONF_PRESET])]
+                            event.get(CONF_CHANNEL)
+                        ].presets[str(event.get(CONF_PRESET))]
                     except (KeyError, TypeError):
                         pass
-                if CONF_TRGT_LEVEL in event.data:
-                    target_level = (255 - event.data[CONF_TRGT_LEVEL]) / 254.0
+                if CONF_TRGT_LEVEL in event:
+                    target_level = (255 - event.get(CONF_TRGT_LEVEL)) / 254.0
                 if target_level:  # check if this is relevant for "ALL"
-                    if event.data[CONF_CHANNEL] == CONF_ALL:
+                    if event.get(CONF_CHANNEL) == CONF_ALL:
                         raise Exception(
                             "CHANNEL event with ALL and target_level - should never happen"
                         )  # XXX find a better way to handle it
                     curArea.setChannelLevel(
-                        event.data[CONF_CHANNEL], target_level, self._autodiscover
+                        event.get(CONF_CHANNEL), target_level, self._autodiscover
                     )
                 if self._config.active == CONF_ACTIVE_ON:
-                    if event.data[CONF_CHANNEL] == CONF_ALL:
+                    if event.get(CONF_CHANNEL) == CONF_ALL:
                         curArea.requestAllChannelLevels()
                     else:
-                        curArea.requestChannelLevel(event.data[CONF_CHANNEL])
+                        curArea.requestChannelLevel(event.get(CONF_CHANNEL))
             else:
                 self.logger.warning("CHANNEL command unknown cmd: %s" % event.toJson)
         else:
-            self.logger.debug("Unknown event type: %s" % event.toJson)
+            self.logger.debug("Unknown event type: %s", event.eventType)
+        if profiled is not None:
+            self.profiler.record(STAGE_PROCESS, profiled, event.eventType)
         # First handle, and then broadcast so broadcast receivers have updated device levels and presets
         self.broadcast(event)
+        if self.metrics is not None:
+            counter = self._eventsProcessed.get(event.eventType)
+            if counter is None:
+                counter = self._eventsProcessed[event.eventType] = self.metrics.counter(
+                    "events", "Inbound events processed by type", type=event.eventType
+                )
+            counter.inc()
+            self._processTime.observe(time.perf_counter() - start)
+
+    def _pendingRequests(self):
+        """Return the number of preset and channel requests waiting to be retried."""
+        pending = 0
+        for area in self.devices[CONF_AREA].values():
+            if area.presetUpdateCounter.timer is not None:
+                pending += 1
+            for counter in area.channelUpdateCounter.values():
+                if counter.timer is not None:
+                    pending += 1
+        return pending
 
     def broadcast(self, event):
-        """Broadcast an event to all listeners - queue."""
-        self.loop.create_task(self._broadcast(event))
+        """Broadcast an event to all listeners - queue, or direct with the fast path."""
+        if not self._subscriptions.wants(event.eventType):
+            return
+        if self._config.fast_path:
+            self._broadcastNow(event)
+        else:
+            self.tasks.spawn(self._broadcast(event))
+
+    def broadcastNow(self, event):
+        """Broadcast an event to all listeners - direct."""
+        if self._subscriptions.wants(event.eventType):
+            self._broadcastNow(event)
 
     @asyncio.coroutine
     def _broadcast(self, event):
         """Broadcast an event to all listeners - async."""
-        for listenerFunction in self._listeners:
-            listenerFunction.update(event=event, dynalite=self)
+        self._broadcastNow(event)
+
+    def _broadcastNow(self, event):
+        """Debounce or dispatch an event."""
+        if self._debouncer and event.eventType == EVENT_CHANNEL:
+            channel = event.get(CONF_CHANNEL)
+            if isinstance(channel, int):
+                self._debouncer.push((event.get(CONF_AREA), channel), event)
+                return
+        self._dispatch(event)
+
+    def _dispatch(self, event):
+        """Pass an event to the listeners subscribed to it, or hold it while a blocking stream is full."""
+        if self._readPauses:
+            self._heldEvents.append(event)
+            return
+        self._dispatchNow(event)
+
+    def _dispatchNow(self, event):
+        """Pass an event to the listeners subscribed to it."""
+        profiled = None
+        if self.profiler is not None and self.profiler.sample(STAGE_DISPATCH):
+            profiled = self.profiler.now()
+        for listener in self._subscriptions.match(event):
+            listener.deliver(event=event, dynalite=self)
+        if profiled is not None:
+            self.profiler.record(STAGE_DISPATCH, profiled)
+
+    def debounceStats(self):
+        """Return the CHANNEL event debouncing counters, or None if debouncing is off."""
+        return self._debouncer.stats() if self._debouncer else None
 
     @asyncio.coroutine
     def _configure(self):
@@ -834,13 +1467,20 @@ class Dynalite(object):
                 logger=self.logger,
                 broadcastFunction=self.broadcast,
                 dynetControl=self.control,
+                stateFunction=self._stateChanged,
+                wantsFunction=self.wantsEvent,
             )
+        if self._sharedState:
+            # readers see every configured channel, as getAreaLevels does, before it reports
+            for area in self.devices[CONF_AREA].values():
+                for channel in area.channel.values():
+                    self._publishState(area, channel)
         self._configured = True
         self.broadcast(DynetEvent(eventType=EVENT_CONFIGURED, data={}))
 
     def state(self):
         """Create the state for testing - queue."""
-        self.loop.create_task(self._state())
+        self.tasks.track(self._state())
 
     @asyncio.coroutine
     def _state(self):
@@ -865,10 +1505,193 @@ class Dynalite(object):
                     )
             self.control.areaReqPreset(area.value)
 
-    def addListener(self, listenerFunction=None):
-        """Create a new listener to the class."""
+    def _stateChanged(self, area, channel=None):
+        """Handle a change of area preset or channel level."""
+        if channel is None:
+            self._changes.record(area.value, None, area.activePreset)
+        else:
+            self._changes.record(area.value, channel.value, channel.level)
+        if self._sharedState:
+            self._publishState(area, channel)
+        for stateListener in self._stateListeners:
+            try:
+                stateListener(area, channel)
+            except Exception:  # pylint: disable=broad-except
+                self.logger.exception("State listener failed on area %s", area.value)
+
+    def _publishState(self, area, channel=None):
+        """Write an area preset or channel level to the shared state table."""
+        try:
+            if channel is None:
+                self._sharedState.setAreaPreset(area.value, area.activePreset)
+            else:
+                self._sharedState.setChannelLevel(area.value, channel.value, channel.level)
+        except SharedStateError as err:  # e.g. an autodiscovered channel above 255
+            entity = (area.value, None if channel is None else channel.value)
+            if entity not in self._sharedStateSkipped:
+                self._sharedStateSkipped.add(entity)
+                self.logger.warning("Not publishing to the shared state table: %s", err.message)
+
+    def addStateListener(self, stateFunction):
+        """Call stateFunction(area, channel) on every preset (channel None) or channel level change."""
+        self._stateListeners.append(stateFunction)
+
+    @property
+    def sequence(self):
+        """Return the sequence number of the last state change."""
+        return self._changes.sequence
+
+    def changes_since(self, seq):
+        """Return the state changes after sequence seq, or flag that a snapshot is needed."""
+        return self._changes.changes_since(seq)
+
+    def snapshot(self):
+        """Return the full area preset and channel level state with its sequence number."""
+        areas = {}
+        for areaValue in self.devices[CONF_AREA]:
+            areas[areaValue] = {
+                CONF_PRESET: self.getAreaPreset(areaValue),
+                CONF_CHANNEL: self.getAreaLevels(areaValue),
+            }
+        return {CONF_SEQUENCE: self._changes.sequence, CONF_AREA: areas}
+
+    def wantsEvent(self, eventType):
+        """Return whether any listener or stream would receive an event type."""
+        return self._subscriptions.wants(eventType)
+
+    def getAreaPreset(self, area):
+        """Return the active preset of an area or None if unknown."""
+        if area not in self.devices[CONF_AREA]:
+            return None
+        return self.devices[CONF_AREA][area].activePreset
+
+    def getChannelLevel(self, area, channel):
+        """Return the level (0.0-1.0) of a channel or None if unknown."""
+        if area not in self.devices[CONF_AREA]:
+            return None
+        curArea = self.devices[CONF_AREA][area]
+        if channel not in curArea.channel:
+            return None
+        return curArea.channel[channel].getLevel()
+
+    def getAreaLevels(self, area):
+        """Return a dict of channel levels of an area."""
+        if area not in self.devices[CONF_AREA]:
+            return {}
+        curArea = self.devices[CONF_AREA][area]
+        return {
+            channelValue: curArea.channel[channelValue].getLevel()
+            for channelValue in curArea.channel
+        }
+
+    def addListener(
+        self,
+        listenerFunction=None,
+        mode=LISTENER_INLINE,
+        maxPending=DEFAULT_LISTENER_MAX_PENDING,
+    ):
+        """Create a new listener to the class.
+
+        mode is inline (called from the broadcast), task (its own task per event) or thread
+        (called in order from a shared thread pool, keeping at most maxPending events queued).
+        """
+        executor = None
+        if mode == LISTENER_THREAD:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._config.listener_threads,
+                    thread_name_prefix="dynalite-listener",
+                )
+            executor = self._executor
         broadcaster = Broadcaster(
-            listenerFunction=listenerFunction, loop=self.loop, logger=self.logger
+            listenerFunction=listenerFunction,
+            loop=self.loop,
+            logger=self.logger,
+            mode=mode,
+            index=self._subscriptions,
+            executor=executor,
+            maxPending=maxPending,
+            slowThreshold=self._config.slow_listener,
+            metrics=self.metrics,
+            tasks=self.tasks,
         )
         self._listeners.append(broadcaster)
         return broadcaster
+
+    def close(self):
+        """Close the connections to Dynet and stop the work the library started."""
+        if self._dynet is not None:
+            self._dynet.close()
+        if self.metricsServer is not None:
+            self.metricsServer.close()
+        if self._debouncer is not None:
+            self._debouncer.flush()  # delivers the held events and cancels the window timers
+        self.tasks.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        if self.recorder is not None:
+            self.recorder.close()  # flushes the tail of the capture
+        if self._sharedState is not None:
+            self._sharedState.close()
+            self._sharedState = None
+
+    def listenerStats(self):
+        """Return the call counters and timings of all listeners."""
+        return [listener.stats() for listener in self._listeners]
+
+    def taskStats(self):
+        """Return the counters of the tasks the library started."""
+        return self.tasks.stats()
+
+    def events(self, filter=None, maxsize=DEFAULT_STREAM_SIZE, overflow=OVERFLOW_DROP_OLDEST):
+        """Return an EventStream to consume events with async for.
+
+        filter is an event type, a list of event types or a function of the event.
+        """
+        eventTypes = [WILDCARD]
+        predicate = None
+        if callable(filter):
+            predicate = filter
+        elif isinstance(filter, str):
+            eventTypes = [filter]
+        elif filter is not None:
+            eventTypes = list(filter)
+        stream = EventStream(
+            self.loop,
+            predicate=predicate,
+            maxsize=maxsize,
+            overflow=overflow,
+            onClose=lambda stream: self._closeStream(stream, eventTypes),
+            pauseFunction=self._pauseReading,
+            resumeFunction=self._resumeReading,
+        )
+        for eventType in eventTypes:
+            self._subscriptions.add(stream, eventType)
+        return stream
+
+    def _closeStream(self, stream, eventTypes):
+        """Unsubscribe a closed stream."""
+        for eventType in eventTypes:
+            self._subscriptions.remove(stream, eventType)
+
+    def _pauseReading(self):
+        """Stop reading from Dynet while a blocking stream is full."""
+        self._readPauses += 1
+        if self._readPauses == 1 and self._dynet:
+            self._dynet.pauseReading()
+
+    def _resumeReading(self):
+        """Resume reading from Dynet once no blocking stream is full."""
+        if self._readPauses == 1:
+            # events held meanwhile go first, in order, and may fill a stream again
+            while self._heldEvents and self._readPauses == 1:
+                self._dispatchNow(self._heldEvents.popleft())
+        self._readPauses -= 1
+        if self._readPauses == 0 and self._dynet:
+            self._dynet.resumeReading()
+
+    def removeListener(self, broadcaster):
+        """Remove a listener created with addListener."""
+        if broadcaster in self._listeners:
+            broadcaster.unmonitorAll()
+            self._listeners.remove(broadcaster)
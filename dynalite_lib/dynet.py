@@ -9,11 +9,41 @@
 import asyncio
 import logging
 import json
+import socket
 import time
-from .const import OpcodeType, SyncType, CONF_ACTIVE_ON, CONF_ACTIVE_INIT, CONF_ACTIVE_OFF
+from .const import (
+    OpcodeType,
+    SyncType,
+    CONF_ACTIVE_ON,
+    CONF_ACTIVE_INIT,
+    CONF_ACTIVE_OFF,
+    TRANSPORT_TCP,
+    TRANSPORT_SERIAL,
+    TRANSPORT_UDP,
+    DEFAULT_BAUDRATE,
+)
 from .inbound import DynetInbound
+from .serialport import createSerialConnection, frameTime, SerialError
+from .capture import DIRECTION_IN, DIRECTION_OUT
+from .profiling import STAGE_FRAMING, STAGE_HANDLER
+from .trace import FrameTracer, HexFrame, DEFAULT_TRACE_SAMPLE
+from .tasks import TaskTracker
+from .reconnect import (
+    ReconnectManager,
+    replayQueue,
+    DEFAULT_RECONNECT_BASE,
+    DEFAULT_RECONNECT_CAP,
+    DEFAULT_REPLAY_MAX_AGE,
+)
 
 DEFAULT_LOG = logging.getLogger(__name__)
+OPCODE_NAMES = {item.value: item.name for item in OpcodeType}
+# milliseconds between two packets sent to the bus
+DEFAULT_MESSAGE_DELAY = 200
+# seconds a TCP connection is idle before keepalive probes start
+DEFAULT_KEEPALIVE = 10
+# seconds to wait for any traffic after a liveness probe before the link is declared dead
+DEFAULT_LIVENESS_TIMEOUT = 5
 
 
 class DynetError(Exception):
@@ -32,6 +62,30 @@ class PacketError(Exception):
         self.message = message
 
 
+def configureSocket(sock, nodelay=True, keepalive=None, sendBuffer=None, receiveBuffer=None):
+    """Set TCP_NODELAY, keepalive timing and buffer sizes on a gateway socket."""
+    if sock is None:
+        return
+    if sock.type == socket.SOCK_STREAM:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1 if nodelay else 0)
+        if keepalive:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, keepalive)
+            elif hasattr(socket, "TCP_KEEPALIVE"):  # macOS
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, keepalive)
+            if hasattr(socket, "TCP_KEEPINTVL"):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, max(1, keepalive // 3))
+            if hasattr(socket, "TCP_KEEPCNT"):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
+            if hasattr(socket, "TCP_USER_TIMEOUT"):  # unacknowledged writes
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_USER_TIMEOUT, keepalive * 2000)
+    if sendBuffer:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, sendBuffer)
+    if receiveBuffer:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receiveBuffer)
+
+
 class DynetPacket(object):
     """Class for a Dynet network packet."""
 
@@ -47,6 +101,8 @@ class DynetPacket(object):
         if msg is not None:
             self.fromMsg(msg)
         self.shouldRun = shouldRun
+        self.queued = None  # monotonic time the packet was queued for sending
+        self.origin = None  # whoever queued the packet, for the sentHandler of the Dynet
 
     def toMsg(self, sync=28, area=0, command=0, data=[0, 0, 0], join=255):
         """Convert packet to a binary message."""
@@ -79,21 +135,39 @@ class DynetPacket(object):
         self.join = self._msg[6]
         self.chk = self._msg[7]
         if self.sync == 28:
-            if OpcodeType.has_value(self.command):
-                self.opcodeType = OpcodeType(self.command).name
+            self.opcodeType = OPCODE_NAMES.get(self.command)
+
+    def toDict(self):
+        """Convert to a dict of the decoded fields."""
+        return {
+            "opcodeType": self.opcodeType,
+            "sync": self.sync,
+            "area": self.area,
+            "data": self.data,
+            "command": self.command,
+            "join": self.join,
+            "chk": self.chk,
+        }
 
     def toJson(self):
         """Convert to JSON."""
-        return json.dumps(self.__dict__)
+        return json.dumps(self.toDict())
 
     def calcsum(self, msg):
         """Calculate the checksum."""
-        msg = msg[:7]
-        return -(sum(ord(c) for c in "".join(map(chr, msg))) % 256) & 0xFF
+        return -sum(msg[:7]) & 0xFF
 
     def __repr__(self):
         """Print the packet."""
-        return json.dumps(self.__dict__)
+        return "DynetPacket(%s area=%s command=%s data=%s join=%s sync=%s chk=%s)" % (
+            self.opcodeType,
+            self.area,
+            self.command,
+            self.data,
+            self.join,
+            self.sync,
+            self.chk,
+        )
 
 
 class DynetConnection(asyncio.Protocol):
@@ -108,15 +182,19 @@ class DynetConnection(asyncio.Protocol):
         connectionResume=None,
         loop=None,
         logger=DEFAULT_LOG,
+        tasks=None,
+        dataHandler=None,
     ):
-        """Initialize the connection."""
+        """Initialize the connection - a dataHandler is called with received data at once, never in a task."""
         self._transport = None
         self._paused = False
         self._loop = loop
         self._logger = logger
+        self._tasks = tasks if tasks is not None or loop is None else TaskTracker(loop)
         self.connectionMade = connectionMade
         self.connectionLost = connectionLost
         self.receiveHandler = receiveHandler
+        self.dataHandler = dataHandler
         self.connectionPause = connectionPause
         self.connectionResume = connectionResume
 
@@ -128,7 +206,7 @@ class DynetConnection(asyncio.Protocol):
             if self._loop is None:
                 self.connectionMade(transport)
             else:
-                self._loop.create_task(self.connectionMade(transport))
+                self._tasks.track(self.connectionMade(transport))
 
     def connection_lost(self, exc=None):
         """Call when connection is lost."""
@@ -137,7 +215,7 @@ class DynetConnection(asyncio.Protocol):
             if self._loop is None:
                 self.connectionLost(exc)
             else:
-                self._loop.create_task(self.connectionLost(exc))
+                self._tasks.track(self.connectionLost(exc))
 
     def pause_writing(self):
         """Call when connection is paused."""
@@ -146,7 +224,7 @@ class DynetConnection(asyncio.Protocol):
             if self._loop is None:
                 self.connectionPause()
             else:
-                self._loop.create_task(self.connectionPause())
+                self._tasks.track(self.connectionPause())
 
     def resume_writing(self):
         """Call when connection is resumed."""
@@ -155,41 +233,91 @@ class DynetConnection(asyncio.Protocol):
             if self._loop is None:
                 self.connectionResume()
             else:
-                self._loop.create_task(self.connectionResume())
+                self._tasks.track(self.connectionResume())
 
     def data_received(self, data):
         """Call when data is received."""
-        if self.receiveHandler is not None:
+        if self.dataHandler is not None:
+            self.dataHandler(data)
+        elif self.receiveHandler is not None:
             if self._loop is None:
                 self.receiveHandler(data)
             else:
-                self._loop.create_task(self.receiveHandler(data))
+                self._tasks.spawn(self.receiveHandler(data))
 
     def eof_received(self):
         """Call when EOF for connection."""
         self._logger.debug("EOF Received")
 
 
+class DynetDatagramConnection(DynetConnection, asyncio.DatagramProtocol):
+    """Class for an asyncio protocol for a UDP gateway - datagrams feed the same frame buffer."""
+
+    def datagram_received(self, data, addr):
+        """Call when a datagram is received - it may hold part of a frame or several frames."""
+        self.data_received(data)
+
+    def error_received(self, exc):
+        """Call when the gateway cannot be reached - drop the endpoint so it is re-created."""
+        self._logger.warning("Dynet UDP error: %s", exc)
+        if self._transport is not None:
+            self._transport.close()
+
+
 class DynetControl(object):
     """Class to control devices on Dynet network."""
 
-    def __init__(self, dynet, loop, active, areaDefinition=None, logger=DEFAULT_LOG):
-        """Initialize the class."""
+    def __init__(
+        self,
+        dynet,
+        loop,
+        active,
+        areaDefinition=None,
+        logger=DEFAULT_LOG,
+        metrics=None,
+        tasks=None,
+        direct=False,
+    ):
+        """Initialize the class - with direct the queue methods send at once and return None.
+
+        Queued commands are started with track(), so a task limit never holds back or drops them.
+        """
         self._dynet = dynet
         self._loop = loop
+        self._tasks = tasks if tasks is not None else TaskTracker(loop)
         self.active = active
         self._area = areaDefinition
         self._logger = logger
+        self._metrics = metrics
+        self.direct = direct
+
+    def _count(self, kind):
+        """Count a command sent through the control."""
+        self._metrics.counter("dynet_commands", "Commands queued by kind", kind=kind).inc()
 
     def areaPreset(self, area, preset, fade=2):
         """Area preset was set - queue."""
-        return self._loop.create_task(
+        if self.direct:
+            return self.areaPresetNow(area, preset, fade)
+        if self._metrics is not None:
+            self._count("preset")
+        return self._tasks.track(
             self._areaPreset(area=area, preset=preset, fade=fade)
         )
 
     @asyncio.coroutine
     def _areaPreset(self, area, preset, fade):
         """Area preset was set - async."""
+        self._dynet.write(self._presetPacket(area, preset, fade))
+
+    def areaPresetNow(self, area, preset, fade=2):
+        """Area preset was set - direct."""
+        if self._metrics is not None:
+            self._count("preset")
+        self._dynet.writeNow(self._presetPacket(area, preset, fade))
+
+    def _presetPacket(self, area, preset, fade):
+        """Return the packet selecting a preset."""
         packet = DynetPacket()
         preset = preset - 1
         bank = int((preset) / 8)
@@ -201,17 +329,31 @@ class DynetControl(object):
         packet.toMsg(
             sync=28, area=area, command=opcode, data=[fadeLow, fadeHigh, bank], join=255
         )
-        self._dynet.write(packet)
+        return packet
 
     def setChannel(self, area, channel, level, fade=2):
         """Set a channel to a given level - queue."""
-        return self._loop.create_task(
+        if self.direct:
+            return self.setChannelNow(area, channel, level, fade)
+        if self._metrics is not None:
+            self._count("channel")
+        return self._tasks.track(
             self._setChannel(area=area, channel=channel, level=level, fade=fade)
         )
 
     @asyncio.coroutine
     def _setChannel(self, area, channel, level, fade):
         """Set a channel to a given level - async."""
+        self._dynet.write(self._channelPacket(area, channel, level, fade))
+
+    def setChannelNow(self, area, channel, level, fade=2):
+        """Set a channel to a given level - direct."""
+        if self._metrics is not None:
+            self._count("channel")
+        self._dynet.writeNow(self._channelPacket(area, channel, level, fade))
+
+    def _channelPacket(self, area, channel, level, fade):
+        """Return the packet setting a channel level."""
         packet = DynetPacket()
         channel_bank = 0xFF if (channel <= 4) else (int((channel - 1) / 4) - 1)
         target_level = int(255 - 254 * level)
@@ -226,53 +368,85 @@ class DynetControl(object):
             data=[target_level, channel_bank, fade_time],
             join=255,
         )
-        self._dynet.write(packet)
+        return packet
 
     def request_channel_level(self, area, channel, shouldRun=None):
         """Request a level for a specific channel. - queue."""
-        return self._loop.create_task(
+        if self.direct:
+            return self.requestChannelLevelNow(area, channel, shouldRun)
+        if self._metrics is not None:
+            self._count("request_channel_level")
+        return self._tasks.track(
             self._request_channel_level(area=area, channel=channel, shouldRun=shouldRun)
         )
 
     @asyncio.coroutine
     def _request_channel_level(self, area, channel, shouldRun):
         """Request a level for a specific channel. - async."""
+        self._dynet.write(self._requestPacket(area, OpcodeType.REQUEST_CHANNEL_LEVEL, channel - 1, shouldRun))
+
+    def requestChannelLevelNow(self, area, channel, shouldRun=None):
+        """Request a level for a specific channel - direct."""
+        if self._metrics is not None:
+            self._count("request_channel_level")
+        self._dynet.writeNow(
+            self._requestPacket(area, OpcodeType.REQUEST_CHANNEL_LEVEL, channel - 1, shouldRun)
+        )
+
+    def _requestPacket(self, area, opcode, data0=0, shouldRun=None):
+        """Return a request or stop fading packet with only the first data byte set."""
         packet = DynetPacket(shouldRun=shouldRun)
         packet.toMsg(
             sync=28,
             area=area,
-            command=OpcodeType.REQUEST_CHANNEL_LEVEL.value,
-            data=[channel - 1, 0, 0],
+            command=opcode.value,
+            data=[data0, 0, 0],
             join=255,
         )
-        self._dynet.write(packet)
+        return packet
 
     def stop_channel_fade(self, area, channel):
         """Stop fading of a channel - queue."""
-        return self._loop.create_task(
+        if self.direct:
+            return self.stopChannelFadeNow(area, channel)
+        if self._metrics is not None:
+            self._count("stop_fade")
+        return self._tasks.track(
             self._stop_channel_fade(area=area, channel=channel)
         )
 
     @asyncio.coroutine
     def _stop_channel_fade(self, area, channel):
         """Stop fading of a channel - async."""
-        packet = DynetPacket()
-        packet.toMsg(
-            sync=28,
-            area=area,
-            command=OpcodeType.STOP_FADING.value,
-            data=[channel - 1, 0, 0],
-            join=255,
-        )
-        self._dynet.write(packet)
+        self._dynet.write(self._requestPacket(area, OpcodeType.STOP_FADING, channel - 1))
+
+    def stopChannelFadeNow(self, area, channel):
+        """Stop fading of a channel - direct."""
+        if self._metrics is not None:
+            self._count("stop_fade")
+        self._dynet.writeNow(self._requestPacket(area, OpcodeType.STOP_FADING, channel - 1))
 
     def areaOff(self, area, fade=2):
         """Turn an area off - queue."""
-        return self._loop.create_task(self._areaOff(area=area, fade=fade))
+        if self.direct:
+            return self.areaOffNow(area, fade)
+        if self._metrics is not None:
+            self._count("area_off")
+        return self._tasks.track(self._areaOff(area=area, fade=fade))
 
     @asyncio.coroutine
     def _areaOff(self, area, fade):
         """Turn an area off - async."""
+        self._dynet.write(self._areaOffPacket(area, fade))
+
+    def areaOffNow(self, area, fade=2):
+        """Turn an area off - direct."""
+        if self._metrics is not None:
+            self._count("area_off")
+        self._dynet.writeNow(self._areaOffPacket(area, fade))
+
+    def _areaOffPacket(self, area, fade):
+        """Return the packet turning an area off."""
         packet = DynetPacket()
         if fade > 25.5:
             fade = 25.5
@@ -281,26 +455,28 @@ class DynetControl(object):
         packet.toMsg(
             sync=28, area=area, command=104, data=[255, 0, int(fade * 10)], join=255
         )
-        self._dynet.write(packet)
+        return packet
 
     def request_area_preset(self, area, shouldRun=None):
         """Request current preset of an area - queue."""
-        return self._loop.create_task(
+        if self.direct:
+            return self.requestAreaPresetNow(area, shouldRun)
+        if self._metrics is not None:
+            self._count("request_preset")
+        return self._tasks.track(
             self._request_area_preset(area=area, shouldRun=shouldRun)
         )
 
     @asyncio.coroutine
     def _request_area_preset(self, area, shouldRun):
         """Request current preset of an area - async."""
-        packet = DynetPacket(shouldRun=shouldRun)
-        packet.toMsg(
-            sync=28,
-            area=area,
-            command=OpcodeType.REQUEST_PRESET.value,
-            data=[0, 0, 0],
-            join=255,
-        )
-        self._dynet.write(packet)
+        self._dynet.write(self._requestPacket(area, OpcodeType.REQUEST_PRESET, 0, shouldRun))
+
+    def requestAreaPresetNow(self, area, shouldRun=None):
+        """Request current preset of an area - direct."""
+        if self._metrics is not None:
+            self._count("request_preset")
+        self._dynet.writeNow(self._requestPacket(area, OpcodeType.REQUEST_PRESET, 0, shouldRun))
 
 
 class Dynet(object):
@@ -316,96 +492,266 @@ class Dynet(object):
         onDisconnect=None,
         loop=None,
         logger=DEFAULT_LOG,
+        frameHandler=None,
+        sentHandler=None,
+        messageDelay=DEFAULT_MESSAGE_DELAY,
+        transport=TRANSPORT_TCP,
+        device=None,
+        baudrate=DEFAULT_BAUDRATE,
+        nodelay=True,
+        keepalive=DEFAULT_KEEPALIVE,
+        sendBuffer=None,
+        receiveBuffer=None,
+        liveness=None,
+        livenessTimeout=DEFAULT_LIVENESS_TIMEOUT,
+        probeArea=1,
+        failover=None,
+        replay=None,
+        replayMaxAge=DEFAULT_REPLAY_MAX_AGE,
+        reconnectBase=DEFAULT_RECONNECT_BASE,
+        reconnectCap=DEFAULT_RECONNECT_CAP,
+        connectTimeout=30,
+        recorder=None,
+        metrics=None,
+        profiler=None,
+        traceSample=DEFAULT_TRACE_SAMPLE,
+        traceRate=None,
+        tasks=None,
     ):
         """Initialize the class."""
-        if host is None or port is None or loop is None:
-            raise DynetError("Must supply a host, port and loop for Dynet connection")
+        if transport == TRANSPORT_SERIAL:
+            if device is None or loop is None:
+                raise DynetError("Must supply a device and loop for a serial Dynet connection")
+            self._name = device
+            addresses = [(device, baudrate)]
+            # never queue frames faster than the line can carry them
+            messageDelay = max(messageDelay, frameTime(baudrate) * 1000)
+        elif transport in [TRANSPORT_TCP, TRANSPORT_UDP]:
+            if host is None or port is None or loop is None:
+                raise DynetError("Must supply a host, port and loop for Dynet connection")
+            self._name = "%s:%d" % (host, port)
+            addresses = [(host, port)] + list(failover or [])
+        else:
+            raise DynetError("Unknown Dynet transport %s" % transport)
         self._host = host
         self._port = port
+        self._transportType = transport
+        self._device = device
+        self._baudrate = baudrate
         self._loop = loop
         self._logger = logger
         self.broadcast = broadcaster
+        self.frameHandler = frameHandler  # called with the raw bytes of every whole frame
+        self.sentHandler = sentHandler  # called with every packet and its raw bytes once written
+        self.recorder = recorder  # CaptureRecorder getting every frame in and out
         self._onConnect = onConnect
         self._onDisconnect = onDisconnect
-        self._conn = lambda: DynetConnection(
+        self._tasks = tasks if tasks is not None else TaskTracker(loop)  # every task Dynet starts
+        protocol = DynetDatagramConnection if transport == TRANSPORT_UDP else DynetConnection
+        self._conn = lambda: protocol(
             connectionMade=self._connection,
             connectionLost=self._disconnection,
-            receiveHandler=self._receive,
+            dataHandler=self._received,
             connectionPause=self._pause,
             connectionResume=self._resume,
             loop=self._loop,
+            logger=self._logger,
+            tasks=self._tasks,
         )
         self._transport = None
+        self._inbound = DynetInbound()
         self._handlers = {}
-        self._connection_retry_timer = 1
         self._paused = False
+        self._readPaused = False
         self._inBuffer = []
         self._outBuffer = []
-        self._timeout = 30
+        self._timeout = connectTimeout
         self.active = active
+        # Dynet alone reconnects - onDisconnect is only told about it
+        self._closing = False
+        self.reconnect = ReconnectManager(
+            loop,
+            self._attemptConnect,
+            addresses,
+            base=reconnectBase,
+            cap=reconnectCap,
+            logger=logger,
+        )
+        self._replay = replay  # policies applied to the queue on every (re)connection
+        self._replayMaxAge = replayMaxAge
 
         self._lastSent = None
-        self._messageDelay = 200
+        self._messageDelay = messageDelay
         self._sending = False
 
+        self._socketOptions = {
+            "nodelay": nodelay,
+            "keepalive": keepalive,
+            "sendBuffer": sendBuffer,
+            "receiveBuffer": receiveBuffer,
+        }
+        # seconds of bus silence before a REQUEST_PRESET probe - polling needs an active connection
+        self._liveness = liveness if active in [CONF_ACTIVE_ON, CONF_ACTIVE_INIT] else None
+        if self._liveness and probeArea is None:
+            logger.warning("No configured area to probe on %s - liveness probing disabled", self._name)
+            self._liveness = None
+        self._livenessTimeout = livenessTimeout
+        self._probeArea = probeArea
+        self._livenessTimer = None
+        self._lastReceived = None
+        self._probe = None  # the probe packet waiting to be answered
+        self._probeSent = None  # loop time the probe went on the wire, None while it is queued
+        self.probes = 0
+        self.deadLinks = 0
+        self._metrics = metrics  # MetricsRegistry, or None to keep no metrics
+        self._profiler = profiler  # PipelineProfiler timing sampled frames, or None
+        self._tracer = FrameTracer(sampleRate=traceSample, rateLimit=traceRate)
+        if metrics is not None:
+            self._registerMetrics(metrics)
+
+    def _registerMetrics(self, metrics):
+        """Create the metrics of this gateway."""
+        gateway = self._name
+        self._framesIn = metrics.counter(
+            "dynet_frames_in", "Logical frames received", gateway=gateway
+        )
+        self._framesOut = metrics.counter("dynet_frames_out", "Frames sent", gateway=gateway)
+        self._badFrames = metrics.counter(
+            "dynet_bad_frames", "Frames that failed to decode", gateway=gateway
+        )
+        self._skippedBytes = metrics.counter(
+            "dynet_skipped_bytes", "Bytes dropped to find the next frame", gateway=gateway
+        )
+        self._sendLatency = metrics.histogram(
+            "dynet_send_latency_seconds", "Time from queueing a packet to sending it", gateway=gateway
+        )
+        self._connections = metrics.counter(
+            "dynet_connections", "Successful connections", gateway=gateway
+        )
+        self._disconnections = metrics.counter(
+            "dynet_disconnections", "Lost or closed connections", gateway=gateway
+        )
+        metrics.gauge(
+            "dynet_queue_depth", "Packets waiting to be sent", function=self.queueLength, gateway=gateway
+        )
+        metrics.gauge(
+            "dynet_connected",
+            "1 while connected",
+            function=lambda: int(self._transport is not None),
+            gateway=gateway,
+        )
+        metrics.gauge(
+            "dynet_liveness_probes", "Liveness probes sent", function=lambda: self.probes, gateway=gateway
+        )
+        metrics.gauge(
+            "dynet_reconnect_attempts",
+            "Connection attempts",
+            function=lambda: self.reconnect.attempts,
+            gateway=gateway,
+        )
+
     def cleanup(self):
         """Clean up with new connection or disconnection."""
-        self._connection_retry_timer = 1
         self._transport = None
+        self._probe = None
+        self._probeSent = None
+        if self._livenessTimer is not None:
+            self._livenessTimer.cancel()
+            self._livenessTimer = None
 
     def connect(self, onConnect=None):
-        """Connect to Dynet - queue."""
-        return self._loop.create_task(self._connect())
+        """Connect to Dynet unless already connected or connecting - queue."""
+        self._closing = False
+        self.reconnect.closed = False
+        if self._transport is not None:
+            return None
+        return self.reconnect.start()
+
+    def _attemptConnect(self, address):
+        """Start a connection attempt on an address - called by the reconnect manager."""
+        if self._transportType == TRANSPORT_SERIAL:
+            self._device, self._baudrate = address
+            self._name = self._device
+        else:
+            self._host, self._port = address
+            self._name = "%s:%d" % address
+        return self._tasks.track(self._connect())
 
     async def _connect(self):
         """Connect to Dynet - async."""
-        self._logger.debug("Connecting to Dynet on %s:%d" % (self._host, self._port))
+        self._logger.debug("Connecting to Dynet on %s", self._name)
         try:
-            await asyncio.wait_for(
-                self._loop.create_connection(
+            if self._transportType == TRANSPORT_SERIAL:
+                connection = createSerialConnection(
+                    self._loop, self._conn, self._device, self._baudrate
+                )
+            elif self._transportType == TRANSPORT_UDP:
+                connection = self._loop.create_datagram_endpoint(
+                    self._conn, remote_addr=(self._host, self._port)
+                )
+            else:
+                connection = self._loop.create_connection(
                     self._conn, host=self._host, port=self._port
-                ),
-                timeout=self._timeout,
-            )
-        except (ValueError, OSError, asyncio.TimeoutError) as err:
-            self._logger.warning(
-                "Could not connect to Dynet (%s). Retrying in %d seconds",
-                err,
-                self._connection_retry_timer,
-            )
-            self._loop.call_later(self._connection_retry_timer, self.connect)
-            self._connection_retry_timer = (
-                2 * self._connection_retry_timer
-                if self._connection_retry_timer < 32
-                else 60
-            )
+                )
+            await asyncio.wait_for(connection, timeout=self._timeout)
+        except (ValueError, OSError, SerialError, asyncio.TimeoutError) as err:
+            self._logger.warning("Could not connect to Dynet on %s (%s)", self._name, err)
+            self.reconnect.failed()
+        except Exception:  # pylint: disable=broad-except
+            self._logger.exception("Unexpected error connecting to Dynet on %s", self._name)
+            self.reconnect.failed()
+
+    def _received(self, data):
+        """Buffer received bytes at once and start a pass over the buffer."""
+        self._lastReceived = self._loop.time()
+        self._inBuffer.extend(data)
+        # a pass waiting for a free task slot covers all bytes buffered so far
+        self._tasks.spawn(self._receive(), key=(self, "receive"))
 
     @asyncio.coroutine
     def _receive(self, data=None):
         """Handle data that was received."""
         if data is not None:
+            self._lastReceived = self._loop.time()
             for byte in data:
                 self._inBuffer.append(int(byte))
 
-        if len(self._inBuffer) < 8:
-            self._logger.debug(
-                "Received %d bytes, not enough to process: %s"
-                % (len(self._inBuffer), self._inBuffer)
+        tracing = self._tracer.begin()
+        if tracing and len(self._inBuffer) < 8:
+            self._tracer.trace(
+                "Received %d bytes on %s, not enough to process: %s",
+                len(self._inBuffer),
+                self._name,
+                HexFrame(bytes(self._inBuffer)),
             )
 
         packet = None
-        while len(self._inBuffer) >= 8 and packet is None:
+        started = None
+        if self._profiler is not None and len(self._inBuffer) >= 8 and self._profiler.due(STAGE_FRAMING):
+            started = self._profiler.now()  # counted by sample() only if a packet comes out
+        # a paused reader leaves the rest of the buffer for resumeReading
+        while len(self._inBuffer) >= 8 and packet is None and not self._readPaused:
             firstByte = self._inBuffer[0]
             if SyncType.has_value(firstByte):
+                if self.frameHandler is not None or self.recorder is not None:
+                    frame = bytes(self._inBuffer[:8])
+                    if self.recorder is not None:
+                        self.recorder.record(frame, DIRECTION_IN)
+                    if self.frameHandler is not None:
+                        self.frameHandler(frame)
                 if firstByte == SyncType.DEBUG_MSG.value:
-                    bytemsg = "".join(chr(c) for c in self._inBuffer[1:7])
-                    self._logger.debug("Dynet DEBUG message %s" % bytemsg)
+                    if tracing:
+                        self._tracer.trace(
+                            "Dynet DEBUG message %s",
+                            "".join(chr(c) for c in self._inBuffer[1:7]),
+                        )
                     self._inBuffer = self._inBuffer[8:]
                     continue
                 elif firstByte == SyncType.DEVICE.value:
-                    self._logger.debug(
-                        "Not handling Dynet DEVICE message %s" % self._inBuffer[:8]
-                    )
+                    if tracing:
+                        self._tracer.trace(
+                            "Not handling Dynet DEVICE message %s", HexFrame(self._inBuffer[:8])
+                        )
                     self._inBuffer = self._inBuffer[8:]
                     continue
                 elif firstByte == SyncType.LOGICAL.value:
@@ -414,83 +760,221 @@ class Dynet(object):
                     except PacketError as err:
                         self._logger.warning(err)
                         packet = None
+                        if self._metrics is not None:
+                            self._badFrames.inc()
 
             if packet is None:
-                hexString = ":".join("{:02x}".format(c) for c in self._inBuffer[:8])
-                self._logger.debug(
-                    "Unable to process packet %s - moving one byte forward" % hexString
-                )
+                if tracing:
+                    self._tracer.trace(
+                        "Unable to process packet %s - moving one byte forward",
+                        HexFrame(self._inBuffer[:8]),
+                    )
                 del self._inBuffer[0]
+                if self._metrics is not None:
+                    self._skippedBytes.inc()
                 continue
             else:
                 self._inBuffer = self._inBuffer[8:]
-
-            self._logger.debug("Have packet: %s" % packet)
-
-            if hasattr(packet, "opcodeType") and packet.opcodeType is not None:
-                inboundHandler = DynetInbound()
-                if hasattr(inboundHandler, packet.opcodeType.lower()):
-                    event = getattr(inboundHandler, packet.opcodeType.lower())(packet)
+                if self._metrics is not None:
+                    self._framesIn.inc()
+
+            if tracing:
+                self._tracer.trace("Have packet: %s", packet)
+            if self._profiler is not None:
+                if self._profiler.sample(STAGE_FRAMING) and started is not None:
+                    self._profiler.record(STAGE_FRAMING, started)
+                    started = self._profiler.now()
+                else:
+                    started = None
+
+            if packet.opcodeType is not None:
+                handler = self._inboundHandler(packet.opcodeType)
+                if handler is not None:
+                    event = handler(packet)
+                    if started is not None:
+                        self._profiler.record(STAGE_HANDLER, started, packet.opcodeType)
                     if event:
                         self.broadcast(event)
-                else:
-                    self._logger.debug(
-                        "Unhandled Dynet Inbound (%s): %s" % (packet.opcodeType, packet)
-                    )
-            else:
-                self._logger.debug("Unhandled Dynet Inbound: %s" % packet)
+                elif tracing:
+                    self._tracer.trace("Unhandled Dynet Inbound (%s): %s", packet.opcodeType, packet)
+            elif tracing:
+                self._tracer.trace("Unhandled Dynet Inbound: %s", packet)
         # If there is still buffer to process - start again
-        if len(self._inBuffer) >= 8:
-            self._loop.create_task(self._receive())
+        if len(self._inBuffer) >= 8 and not self._readPaused:
+            self._tasks.spawn(self._receive(), key=(self, "receive"))
+
+    def _inboundHandler(self, opcodeType):
+        """Return the DynetInbound method for an opcode, or None if not handled."""
+        if opcodeType not in self._handlers:
+            self._handlers[opcodeType] = getattr(
+                self._inbound, opcodeType.lower(), None
+            )
+        return self._handlers[opcodeType]
 
     @asyncio.coroutine
     def _pause(self):
         """Pause transmission on Dynet."""
-        self._logger.debug("Pausing Dynet on %s:%d" % (self._host, self._port))
+        self._logger.debug("Pausing Dynet on %s", self._name)
         # Need to schedule a resend here
         self._paused = True
 
     @asyncio.coroutine
     def _resume(self):
         """Resume transmission on Dynet."""
-        self._logger.debug("Resuming Dynet on %s:%d" % (self._host, self._port))
+        self._logger.debug("Resuming Dynet on %s", self._name)
         # Need to schedule a resend here
         self._paused = False
 
     @asyncio.coroutine
     def _connection(self, transport=None):
         """Handle a new successful connection."""
-        self._logger.debug("Connected to Dynet on %s:%d" % (self._host, self._port))
+        self._logger.debug("Connected to Dynet on %s", self._name)
         self.cleanup()
         if transport is not None:
-            self.write()  # write whatever is queued in the buffer
             self._transport = transport
+            self.reconnect.connected()
+            if self._metrics is not None:
+                self._connections.inc()
+            if self._replay:
+                before = len(self._outBuffer)
+                self._outBuffer = replayQueue(self._outBuffer, self._replay, self._replayMaxAge)
+                if before != len(self._outBuffer):
+                    self._logger.debug(
+                        "Dropped %d queued packets on reconnect", before - len(self._outBuffer)
+                    )
+            self.write()  # write whatever is queued in the buffer
+            if self._transportType != TRANSPORT_SERIAL:
+                configureSocket(transport.get_extra_info("socket"), **self._socketOptions)
+            if self._readPaused:
+                transport.pause_reading()
+            if self._liveness:
+                self._lastReceived = self._loop.time()
+                self._scheduleLiveness(self._liveness)
             if self._onConnect is not None:
-                self._loop.create_task(self._onConnect(dynet=self, transport=transport))
+                self._tasks.track(self._onConnect(dynet=self, transport=transport))
         else:
             raise DynetError("Connected but no transport channel provided")
 
     @asyncio.coroutine
     def _disconnection(self, exc=None):
         """Handle a network disconnection from Dynet."""
-        self._logger.debug(
-            "Disconnected from Dynet on %s:%d" % (self._host, self._port)
-        )
+        self._logger.debug("Disconnected from Dynet on %s", self._name)
         self.cleanup()
+        if self._metrics is not None:
+            self._disconnections.inc()
         if self._onDisconnect is not None:
-            self._loop.create_task(self._onDisconnect(dynet=self))
+            self._tasks.track(self._onDisconnect(dynet=self))
 
         if exc is not None:
             self._logger.warning(exc)
+        if not self._closing:
+            self.reconnect.lost()
+
+    def close(self):
+        """Close the connection to the gateway and stop reconnecting."""
+        self._closing = True
+        self.reconnect.close()
+        if self._transport is not None:
+            self._transport.close()
+
+    def _scheduleLiveness(self, delay):
+        """Check the link again after delay seconds."""
+        if self._livenessTimer is not None:
+            self._livenessTimer.cancel()
+        self._livenessTimer = self._loop.call_later(delay, self._checkLiveness)
+
+    def _checkLiveness(self):
+        """Probe a silent bus and drop the connection if the probe goes unanswered."""
+        self._livenessTimer = None
+        if self._transport is None:
+            return
+        now = self._loop.time()
+        if self._probe is not None:
+            if self._probeSent is None:  # the timeout only starts once the probe is on the wire
+                self._scheduleLiveness(self._livenessTimeout)
+                return
+            if self._lastReceived < self._probeSent:
+                waited = now - self._probeSent
+                if waited < self._livenessTimeout:
+                    self._scheduleLiveness(self._livenessTimeout - waited)
+                    return
+                self._logger.warning(
+                    "No answer from Dynet on %s in %.1f seconds - reconnecting", self._name, waited
+                )
+                self.deadLinks += 1
+                self._transport.abort()
+                return
+            self._probe = None
+            self._probeSent = None
+        if self._outBuffer:  # still sending - probe once the queue is empty, so the probe goes first
+            self._scheduleLiveness(self._liveness)
+            return
+        silent = now - self._lastReceived
+        if silent < self._liveness:
+            self._scheduleLiveness(self._liveness - silent)
+            return
+        self._logger.debug("Dynet on %s silent for %.1f seconds - probing", self._name, silent)
+        packet = DynetPacket()
+        packet.toMsg(
+            sync=28,
+            area=self._probeArea,
+            command=OpcodeType.REQUEST_PRESET.value,
+            data=[0, 0, 0],
+            join=255,
+        )
+        self.probes += 1
+        self._probe = packet
+        self.write(packet)
+        self._scheduleLiveness(self._livenessTimeout)
+
+    def queueLength(self):
+        """Return the number of packets waiting to be sent."""
+        return len(self._outBuffer)
+
+    @property
+    def address(self):
+        """Return the (host, port) of the gateway in use - the failover one after a failover."""
+        return (self._host, self._port)
+
+    def pauseReading(self):
+        """Stop reading from the gateway and handling buffered bytes until resumeReading."""
+        if self._readPaused:
+            return
+        self._readPaused = True
+        if self._transport is not None:
+            self._transport.pause_reading()
+
+    def resumeReading(self):
+        """Resume reading from the gateway, starting with the bytes buffered while paused."""
+        if not self._readPaused:
+            return
+        self._readPaused = False
+        if self._transport is not None:
+            self._transport.resume_reading()
+        if len(self._inBuffer) >= 8:
+            self._tasks.spawn(self._receive(), key=(self, "receive"))
 
     def write(self, packet=None):
         """Write a packet or trigger write loop - queue."""
-        self._loop.create_task(self._write(packet))
+        if packet is not None:  # queued at once, so a full task ring can never drop a command
+            packet.queued = time.monotonic()
+            self._outBuffer.append(packet)
+        # a trigger waiting for a free task slot covers any later trigger
+        self._tasks.spawn(self._write(), key=(self, "write"))
 
     @asyncio.coroutine
     def _write(self, newPacket=None):
         """Write a packet or trigger write loop - async."""
+        self._send(newPacket)
+
+    def writeNow(self, packet):
+        """Queue a packet and send it if the pacing allows - direct."""
+        self._send(packet)
+
+    def _send(self, newPacket=None):
+        """Queue a packet, send the head of the queue if the pacing allows, and schedule the rest."""
         if newPacket is not None:
+            newPacket.queued = time.monotonic()
             self._outBuffer.append(newPacket)
 
         if self._transport is None:
@@ -499,17 +983,16 @@ class Dynet(object):
 
         if self._paused or self._sending:
             self._logger.debug("Connection busy - queuing packet")
-            self._loop.call_later(1, self.write)
+            self._loop.call_later(1, self._send)
             return
 
-        if self._lastSent is None:
-            self._lastSent = int(round(time.time() * 1000))
-
-        current_milli_time = int(round(time.time() * 1000))
+        current_milli_time = int(round(time.monotonic() * 1000))
+        if self._lastSent is None:  # nothing sent yet - no gap to keep
+            self._lastSent = current_milli_time - self._messageDelay
         elapsed = current_milli_time - self._lastSent
         delay = 0 - (elapsed - self._messageDelay)
         if delay > 0:
-            self._loop.call_later(delay / 1000, self.write)
+            self._loop.call_later(delay / 1000, self._send)
             return
 
         if len(self._outBuffer) == 0:
@@ -528,11 +1011,24 @@ class Dynet(object):
             msg.append(packet.join)
             msg.append(packet.chk)
             assert self.active in [CONF_ACTIVE_ON, CONF_ACTIVE_INIT] or packet.command not in [OpcodeType.REQUEST_CHANNEL_LEVEL.value, OpcodeType.REQUEST_PRESET.value]
-            self._transport.write(msg)
-            self._logger.debug("Dynet Sent: %s" % msg)
-            self._lastSent = int(round(time.time() * 1000))
+            if self._transportType == TRANSPORT_UDP:
+                self._transport.sendto(bytes(msg))
+            else:
+                self._transport.write(msg)
+            if self.recorder is not None:
+                self.recorder.record(msg, DIRECTION_OUT)
+            if self.sentHandler is not None:
+                self.sentHandler(packet, bytes(msg))
+            if self._metrics is not None:
+                self._framesOut.inc()
+                self._sendLatency.observe(time.monotonic() - packet.queued)
+            if self._tracer.enabled():  # begin() samples the receive path only
+                self._tracer.trace("Dynet Sent on %s: %s", self._name, HexFrame(msg))
+            self._lastSent = int(round(time.monotonic() * 1000))
             self._sending = False
+            if packet is self._probe:
+                self._probeSent = self._loop.time()
 
         del self._outBuffer[0]
         if len(self._outBuffer) > 0:
-            self._loop.call_later(self._messageDelay / 1000, self.write)
+            self._loop.call_later(self._messageDelay / 1000, self._send)
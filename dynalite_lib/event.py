@@ -3,19 +3,92 @@ import json
 
 
 class DynetEvent(object):
-    """Class to represent an event on the Dynet network."""
+    """Class to represent an event on the Dynet network.
 
-    def __init__(self, eventType=None, message=None, data={}, direction=None):
+    Events decoded from the bus are built with fromFields: the data dict and the message
+    string are only created the first time someone reads them.
+    """
+
+    __slots__ = ("eventType", "direction", "_data", "_keys", "_values", "_msg", "_msgFormat", "_msgArgs")
+
+    def __init__(self, eventType=None, message=None, data=None, direction=None):
         """Initialize the event."""
         self.eventType = eventType.upper() if eventType else None
-        self.msg = message
-        self.data = data
         self.direction = direction
+        self._data = data
+        self._keys = ()
+        self._values = ()
+        self._msg = message
+        self._msgFormat = None
+        self._msgArgs = None
+
+    @classmethod
+    def fromFields(cls, eventType, keys, values, msgFormat=None, msgArgs=None, direction=None):
+        """Create an event from a tuple of data keys and one of values - eventType must be upper case."""
+        event = cls.__new__(cls)
+        event.eventType = eventType
+        event.direction = direction
+        event._data = None
+        event._keys = keys
+        event._values = values
+        event._msg = None
+        event._msgFormat = msgFormat
+        event._msgArgs = msgArgs
+        return event
+
+    @property
+    def data(self):
+        """Return the data dict of the event."""
+        if self._data is None:
+            self._data = dict(zip(self._keys, self._values))
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        """Replace the data dict of the event."""
+        self._data = value
+
+    @property
+    def msg(self):
+        """Return the human readable message of the event."""
+        if self._msg is None and self._msgFormat is not None:
+            self._msg = self._msgFormat % self._msgArgs
+        return self._msg
+
+    @msg.setter
+    def msg(self, value):
+        """Replace the message of the event."""
+        self._msg = value
+
+    def get(self, key, default=None):
+        """Return a data value without building the data dict."""
+        if self._data is not None:
+            return self._data.get(key, default)
+        keys = self._keys
+        for index in range(len(keys)):
+            if keys[index] == key:
+                return self._values[index]
+        return default
+
+    def __contains__(self, key):
+        """Return whether the data has a key."""
+        if self._data is not None:
+            return key in self._data
+        return key in self._keys
+
+    def toDict(self):
+        """Convert to a dict."""
+        return {
+            "eventType": self.eventType,
+            "msg": self.msg,
+            "data": self.data,
+            "direction": self.direction,
+        }
 
     def toJson(self):
         """Convert to JSON."""
-        return json.dumps(self.__dict__)
+        return json.dumps(self.toDict())
 
     def __repr__(self):
         """Print the event."""
-        return json.dumps(self.__dict__)
+        return json.dumps(self.toDict())
@@ -0,0 +1,44 @@
+"""
+@ Author      : Troy Kelly
+@ Date        : 19 Oct 2026
+@ Description : Philips Dynalite Library - Optional uvloop event loop
+
+@ Notes:        uvloop is used only when asked for and installed (pip install dynalite[uvloop]),
+                otherwise the standard asyncio loop is used. The library only uses loop APIs both
+                loops implement the same way. uvloop timers tick in milliseconds and loop.time()
+                is only updated once per iteration, so the Dynet write pacing keeps its own
+                monotonic clock instead of trusting the loop clock between frames.
+"""
+
+import asyncio
+import logging
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+LOOP_ASYNCIO = "asyncio"
+LOOP_UVLOOP = "uvloop"
+DEFAULT_LOG = logging.getLogger(__name__)
+
+
+def uvloopAvailable():
+    """Return whether uvloop is installed."""
+    return uvloop is not None
+
+
+def newEventLoop(useUvloop=True, logger=DEFAULT_LOG):
+    """Return a new event loop - uvloop if asked for and installed, asyncio otherwise."""
+    if useUvloop:
+        if uvloop is not None:
+            return uvloop.new_event_loop()
+        logger.info("uvloop is not installed - using the asyncio event loop")
+    return asyncio.new_event_loop()
+
+
+def loopName(loop):
+    """Return the kind of an event loop, uvloop or asyncio."""
+    if uvloop is not None and isinstance(loop, uvloop.Loop):
+        return LOOP_UVLOOP
+    return LOOP_ASYNCIO
@@ -0,0 +1,131 @@
+"""
+@ Author      : Troy Kelly
+@ Date        : 19 Oct 2026
+@ Description : Philips Dynalite Library - Several RS485 gateways behind one Dynalite
+
+@ Notes:        Each gateway has its own Dynet connection, receive buffer and write pacer, so
+                commands to areas on different buses are sent in parallel. Inbound traffic from
+                all gateways goes to the same broadcaster and so into one device tree.
+"""
+
+import logging
+
+from .const import CONF_AREA, CONF_HOST, CONF_PORT
+
+DEFAULT_LOG = logging.getLogger(__name__)
+
+
+class GatewayError(Exception):
+    """Class for gateway configuration errors."""
+
+    def __init__(self, message):
+        """Initialize the error."""
+        self.message = message
+
+
+def parseAreas(areas):
+    """Return the set of areas from a list of area numbers and "first-last" ranges."""
+    result = set()
+    for area in areas:
+        if isinstance(area, str) and "-" in area:
+            first, last = area.split("-", 1)
+            try:
+                first, last = int(first), int(last)
+            except ValueError as err:
+                raise GatewayError("Bad area range %s" % area) from err
+            if first > last:
+                raise GatewayError("Bad area range %s" % area)
+            result.update(range(first, last + 1))
+        else:
+            try:
+                result.add(int(area))
+            except ValueError as err:
+                raise GatewayError("Bad area %s" % area) from err
+    return result
+
+
+def parseGateways(gateways):
+    """Return (host, port, set of areas or None for the default gateway) for each gateway config."""
+    result = []
+    seen = {}
+    default = None
+    for gateway in gateways:
+        if CONF_HOST not in gateway or CONF_PORT not in gateway:
+            raise GatewayError("A gateway must have a host and a port: %s" % gateway)
+        areas = parseAreas(gateway[CONF_AREA]) if CONF_AREA in gateway else None
+        name = "%s:%s" % (gateway[CONF_HOST], gateway[CONF_PORT])
+        if areas is None:
+            if default is not None:
+                raise GatewayError("Both %s and %s have no areas" % (default, name))
+            default = name
+        else:
+            for area in areas:
+                if area in seen:
+                    raise GatewayError(
+                        "Area %d is on both %s and %s" % (area, seen[area], name)
+                    )
+                seen[area] = name
+        result.append((gateway[CONF_HOST], gateway[CONF_PORT], areas))
+    return result
+
+
+class DynetGateways(object):
+    """Class to route writes to the Dynet of the gateway that serves the area."""
+
+    def __init__(self, gateways, logger=DEFAULT_LOG):
+        """Initialize with a list of (dynet, set of areas or None for the default)."""
+        self._logger = logger
+        self.dynets = []
+        self._byArea = {}
+        self._default = None
+        for dynet, areas in gateways:
+            self.dynets.append(dynet)
+            if areas is None:
+                self._default = dynet
+            else:
+                for area in areas:
+                    self._byArea[area] = dynet
+
+    def dynetForArea(self, area):
+        """Return the Dynet that serves an area, or None."""
+        return self._byArea.get(area, self._default)
+
+    def write(self, packet=None):
+        """Write a packet to the gateway of its area."""
+        if packet is None:
+            for dynet in self.dynets:
+                dynet.write()
+            return
+        dynet = self.dynetForArea(packet.area)
+        if dynet is None:
+            self._logger.warning("No gateway for area %d - dropping %s", packet.area, packet)
+            return
+        dynet.write(packet)
+
+    def writeNow(self, packet):
+        """Queue a packet on the gateway of its area without a task."""
+        dynet = self.dynetForArea(packet.area)
+        if dynet is None:
+            self._logger.warning("No gateway for area %d - dropping %s", packet.area, packet)
+            return
+        dynet.writeNow(packet)
+
+    def connect(self):
+        """Connect to all gateways."""
+        for dynet in self.dynets:
+            dynet.connect()
+
+    def close(self):
+        """Close the connections to all gateways."""
+        for dynet in self.dynets:
+            dynet.close()
+
+    def pauseReading(self):
+        """Stop reading from all gateways."""
+        for dynet in self.dynets:
+            dynet.pauseReading()
+
+    def resumeReading(self):
+        """Resume reading from all gateways."""
+        for dynet in self.dynets:
+            dynet.resumeReading()
@@ -28,6 +28,38 @@ from .const import (
 )
 
 
+PRESET_KEYS = (CONF_AREA, CONF_PRESET, CONF_FADE, CONF_JOIN, CONF_STATE)
+REPORT_PRESET_KEYS = (CONF_AREA, CONF_PRESET, CONF_JOIN, CONF_STATE)
+REQUEST_PRESET_KEYS = (CONF_AREA, CONF_JOIN)
+REPORT_CHANNEL_KEYS = (
+    CONF_AREA,
+    CONF_CHANNEL,
+    CONF_ACTION,
+    CONF_TRGT_LEVEL,
+    CONF_ACT_LEVEL,
+    CONF_JOIN,
+    CONF_STATE,
+)
+SET_CHANNEL_KEYS = (
+    CONF_AREA,
+    CONF_CHANNEL,
+    CONF_ACTION,
+    CONF_TRGT_LEVEL,
+    CONF_JOIN,
+    CONF_STATE,
+)
+STOP_FADING_KEYS = (CONF_AREA, CONF_CHANNEL, CONF_ACTION, CONF_JOIN, CONF_STATE)
+CHANNEL_PRESET_KEYS = (
+    CONF_AREA,
+    CONF_CHANNEL,
+    CONF_FADE,
+    CONF_ACTION,
+    CONF_PRESET,
+    CONF_JOIN,
+    CONF_STATE,
+)
+
+
 class DynetInbound(object):
     """Class to handle inboud Dynet packets."""
 
@@ -38,25 +70,18 @@ class DynetInbound(object):
     def preset(self, packet):
         """Handle a preset that was selected."""
         if packet.command > 3:
-            packet.preset = packet.command - 6
+            preset = packet.command - 6
         else:
-            packet.preset = packet.command
-        packet.preset = (packet.preset + (packet.data[2] * 8)) + 1
-        packet.fade = (packet.data[0] + (packet.data[1] * 256)) * 0.02
-        return DynetEvent(
-            eventType=EVENT_PRESET,
-            message=(
-                "Area %d Preset %d Fade %d seconds."
-                % (packet.area, packet.preset, packet.fade)
-            ),
-            data={
-                CONF_AREA: packet.area,
-                CONF_PRESET: packet.preset,
-                CONF_FADE: packet.fade,
-                CONF_JOIN: packet.join,
-                CONF_STATE: CONF_STATE_ON,
-            },
-            direction=CONF_DIR_IN,
+            preset = packet.command
+        preset = (preset + (packet.data[2] * 8)) + 1
+        fade = (packet.data[0] + (packet.data[1] * 256)) * 0.02
+        return DynetEvent.fromFields(
+            EVENT_PRESET,
+            PRESET_KEYS,
+            (packet.area, preset, fade, packet.join, CONF_STATE_ON),
+            "Area %d Preset %d Fade %d seconds.",
+            (packet.area, preset, fade),
+            CONF_DIR_IN,
         )
 
     def preset_1(self, packet):
@@ -93,46 +118,38 @@ class DynetInbound(object):
 
     def request_preset(self, packet):
         """Report that preset was requested."""
-        return DynetEvent(
-            eventType=EVENT_REQPRESET,
-            message=("Request Area %d preset" % (packet.area)),
-            data={CONF_AREA: packet.area, CONF_JOIN: packet.join},
-            direction=CONF_DIR_IN,
+        return DynetEvent.fromFields(
+            EVENT_REQPRESET,
+            REQUEST_PRESET_KEYS,
+            (packet.area, packet.join),
+            "Request Area %d preset",
+            (packet.area,),
+            CONF_DIR_IN,
         )
 
     def report_preset(self, packet):
         """Report the current preset of an area."""
-        packet.preset = packet.data[0] + 1
-        return DynetEvent(
-            eventType=EVENT_PRESET,
-            message=("Current Area %d Preset is %d" % (packet.area, packet.preset)),
-            data={
-                CONF_AREA: packet.area,
-                CONF_PRESET: packet.preset,
-                CONF_JOIN: packet.join,
-                CONF_STATE: CONF_STATE_ON,
-            },
-            direction=CONF_DIR_IN,
+        preset = packet.data[0] + 1
+        return DynetEvent.fromFields(
+            EVENT_PRESET,
+            REPORT_PRESET_KEYS,
+            (packet.area, preset, packet.join, CONF_STATE_ON),
+            "Current Area %d Preset is %d",
+            (packet.area, preset),
+            CONF_DIR_IN,
         )
 
     def linear_preset(self, packet):
         """Report that preset was selected with fade."""
-        packet.preset = packet.data[0] + 1
-        packet.fade = (packet.data[1] + (packet.data[2] * 256)) * 0.02
-        return DynetEvent(
-            eventType=EVENT_PRESET,
-            message=(
-                "Area %d Preset %d Fade %d seconds."
-                % (packet.area, packet.preset, packet.fade)
-            ),
-            data={
-                CONF_AREA: packet.area,
-                CONF_PRESET: packet.preset,
-                CONF_FADE: packet.fade,
-                CONF_JOIN: packet.join,
-                CONF_STATE: CONF_STATE_ON,
-            },
-            direction=CONF_DIR_IN,
+        preset = packet.data[0] + 1
+        fade = (packet.data[1] + (packet.data[2] * 256)) * 0.02
+        return DynetEvent.fromFields(
+            EVENT_PRESET,
+            PRESET_KEYS,
+            (packet.area, preset, fade, packet.join, CONF_STATE_ON),
+            "Area %d Preset %d Fade %d seconds.",
+            (packet.area, preset, fade),
+            CONF_DIR_IN,
         )
 
     def report_channel_level(self, packet):
@@ -140,43 +157,41 @@ class DynetInbound(object):
         channel = packet.data[0] + 1
         target_level = packet.data[1]
         actual_level = packet.data[2]
-        return DynetEvent(
-            eventType=EVENT_CHANNEL,
-            message=(
-                "Area %d Channel %d Target Level %d Actual Level %d."
-                % (packet.area, channel, target_level, actual_level)
+        return DynetEvent.fromFields(
+            EVENT_CHANNEL,
+            REPORT_CHANNEL_KEYS,
+            (
+                packet.area,
+                channel,
+                CONF_ACTION_REPORT,
+                target_level,
+                actual_level,
+                packet.join,
+                CONF_STATE_ON,
             ),
-            data={
-                CONF_AREA: packet.area,
-                CONF_CHANNEL: channel,
-                CONF_ACTION: CONF_ACTION_REPORT,
-                CONF_TRGT_LEVEL: target_level,
-                CONF_ACT_LEVEL: actual_level,
-                CONF_JOIN: packet.join,
-                CONF_STATE: CONF_STATE_ON,
-            },
-            direction=CONF_DIR_IN,
+            "Area %d Channel %d Target Level %d Actual Level %d.",
+            (packet.area, channel, target_level, actual_level),
+            CONF_DIR_IN,
         )
 
     def set_channel_x_to_level_with_fade(self, packet, channel_offset):
         """Report that a channel was set to a specific level."""
         channel = ((packet.data[1] + 1) % 256) * 4 + channel_offset
         target_level = packet.data[0]
-        return DynetEvent(
-            eventType=EVENT_CHANNEL,
-            message=(
-                "Area %d Channel %d Target Level %d"
-                % (packet.area, channel, target_level)
+        return DynetEvent.fromFields(
+            EVENT_CHANNEL,
+            SET_CHANNEL_KEYS,
+            (
+                packet.area,
+                channel,
+                CONF_ACTION_CMD,
+                target_level,
+                packet.join,
+                CONF_STATE_ON,
             ),
-            data={
-                CONF_AREA: packet.area,
-                CONF_CHANNEL: channel,
-                CONF_ACTION: CONF_ACTION_CMD,
-                CONF_TRGT_LEVEL: target_level,
-                CONF_JOIN: packet.join,
-                CONF_STATE: CONF_STATE_ON,
-            },
-            direction=CONF_DIR_IN,
+            "Area %d Channel %d Target Level %d",
+            (packet.area, channel, target_level),
+            CONF_DIR_IN,
         )
 
     def set_channel_1_to_level_with_fade(self, packet):
@@ -204,55 +219,43 @@ class DynetInbound(object):
         channel = packet.data[0] + 1
         if channel == 256:  # all channels in area
             channel = CONF_ALL
-        return DynetEvent(
-            eventType=EVENT_CHANNEL,
-            message=("Area %d Channel %s" % (packet.area, channel)),
-            data={
-                CONF_AREA: packet.area,
-                CONF_CHANNEL: channel,
-                CONF_ACTION: CONF_ACTION_CMD,
-                CONF_JOIN: packet.join,
-                CONF_STATE: CONF_STATE_ON,
-            },
-            direction=CONF_DIR_IN,
+        return DynetEvent.fromFields(
+            EVENT_CHANNEL,
+            STOP_FADING_KEYS,
+            (packet.area, channel, CONF_ACTION_CMD, packet.join, CONF_STATE_ON),
+            "Area %d Channel %s",
+            (packet.area, channel),
+            CONF_DIR_IN,
         )
 
     def fade_channel_area_to_preset(self, packet):
         """Report that a channel or area was set to a preset."""
         channel = packet.data[0] + 1
-        packet.preset = packet.data[1] + 1
-        packet.fade = packet.data[2] * 0.02
+        preset = packet.data[1] + 1
+        fade = packet.data[2] * 0.02
         if channel == 256:  # all channels in area
-            return DynetEvent(
-                eventType=EVENT_PRESET,
-                message=(
-                    "Current Area %d Preset is %d fade %s"
-                    % (packet.area, packet.preset, packet.fade)
-                ),
-                data={
-                    CONF_AREA: packet.area,
-                    CONF_PRESET: packet.preset,
-                    CONF_FADE: packet.fade,
-                    CONF_JOIN: packet.join,
-                    CONF_STATE: CONF_STATE_ON,
-                },
-                direction=CONF_DIR_IN,
+            return DynetEvent.fromFields(
+                EVENT_PRESET,
+                PRESET_KEYS,
+                (packet.area, preset, fade, packet.join, CONF_STATE_ON),
+                "Current Area %d Preset is %d fade %s",
+                (packet.area, preset, fade),
+                CONF_DIR_IN,
             )
         else:
-            return DynetEvent(
-                eventType=EVENT_CHANNEL,
-                message=(
-                    "Area %d Channel %s preset %s fade %s"
-                    % (packet.area, channel, packet.preset, packet.fade)
+            return DynetEvent.fromFields(
+                EVENT_CHANNEL,
+                CHANNEL_PRESET_KEYS,
+                (
+                    packet.area,
+                    channel,
+                    fade,
+                    CONF_ACTION_CMD,
+                    preset,
+                    packet.join,
+                    CONF_STATE_ON,
                 ),
-                data={
-                    CONF_AREA: packet.area,
-                    CONF_CHANNEL: channel,
-                    CONF_FADE: packet.fade,
-                    CONF_ACTION: CONF_ACTION_CMD,
-                    CONF_PRESET: packet.preset,
-                    CONF_JOIN: packet.join,
-                    CONF_STATE: CONF_STATE_ON,
-                },
-                direction=CONF_DIR_IN,
+                "Area %d Channel %s preset %s fade %s",
+                (packet.area, channel, preset, fade),
+                CONF_DIR_IN,
             )
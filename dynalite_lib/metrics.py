@@ -0,0 +1,264 @@
+"""
+@ Author      : Troy Kelly
+@ Date        : 19 Oct 2026
+@ Description : Philips Dynalite Library - Counters, gauges and latency histograms for bus health
+
+@ Notes:        Metrics are only kept when a MetricsRegistry is passed in - without one every
+                instrumented call site costs a single "is not None" test.
+                Metrics are updated from the event loop thread. A registry renders as a snapshot
+                dict or as Prometheus/OpenMetrics text, which MetricsServer serves over HTTP.
+"""
+
+import asyncio
+from bisect import bisect_left
+
+# seconds - from sub-millisecond dispatch to multi-second retries of a paced bus
+DEFAULT_LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+METRICS_PREFIX = "dynalite_"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+DEFAULT_METRICS_HOST = "127.0.0.1"
+
+
+class MetricsError(Exception):
+    """Class for metrics errors."""
+
+    def __init__(self, message):
+        """Initialize the error."""
+        self.message = message
+
+
+class Counter(object):
+    """Class for a value that only goes up."""
+
+    __slots__ = ("value",)
+    kind = "counter"
+
+    def __init__(self):
+        """Initialize the counter at 0."""
+        self.value = 0
+
+    def inc(self, amount=1):
+        """Add to the counter."""
+        self.value += amount
+
+    def sample(self):
+        """Return the value."""
+        return self.value
+
+
+class Gauge(object):
+    """Class for a value that goes up and down, or is read from a function when sampled."""
+
+    __slots__ = ("value", "function")
+    kind = "gauge"
+
+    def __init__(self, function=None):
+        """Initialize the gauge at 0 - a function is called for the value on every sample."""
+        self.value = 0
+        self.function = function
+
+    def set(self, value):
+        """Set the value."""
+        self.value = value
+
+    def inc(self, amount=1):
+        """Add to the value."""
+        self.value += amount
+
+    def dec(self, amount=1):
+        """Subtract from the value."""
+        self.value -= amount
+
+    def sample(self):
+        """Return the value."""
+        return self.function() if self.function is not None else self.value
+
+
+class Histogram(object):
+    """Class for observations counted in fixed buckets."""
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+    kind = "histogram"
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        """Initialize the histogram with the upper bounds of its buckets."""
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # the last is above every bound
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Count one observation."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def sample(self):
+        """Return the count, sum and the cumulative count at each bucket bound."""
+        cumulative = {}
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            cumulative[bound] = total
+        return {"count": self.count, "sum": self.sum, "buckets": cumulative}
+
+
+def _labelText(labels):
+    """Return the label set of a sample, e.g. {gateway="host:12345"}."""
+    if not labels:
+        return ""
+    return "{%s}" % ",".join(
+        '%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+
+
+class MetricsRegistry(object):
+    """Class to hold the metrics of a Dynalite instance by name and labels."""
+
+    def __init__(self, prefix=METRICS_PREFIX):
+        """Initialize an empty registry."""
+        self.prefix = prefix
+        self._families = {}  # name: [kind, description, {labels: metric}]
+
+    def _metric(self, cls, name, description, labels, *args):
+        """Return the metric of a name and labels, creating it the first time."""
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = [cls.kind, description, {}]
+        elif family[0] != cls.kind:
+            raise MetricsError("Metric %s is a %s, not a %s" % (name, family[0], cls.kind))
+        key = tuple(sorted(labels.items()))
+        metric = family[2].get(key)
+        if metric is None:
+            metric = family[2][key] = cls(*args)
+        return metric
+
+    def counter(self, name, description="", **labels):
+        """Return a counter."""
+        return self._metric(Counter, name, description, labels)
+
+    def gauge(self, name, description="", function=None, **labels):
+        """Return a gauge - with a function the value is read from it when sampled."""
+        gauge = self._metric(Gauge, name, description, labels)
+        if function is not None:
+            gauge.function = function
+        return gauge
+
+    def histogram(self, name, description="", buckets=DEFAULT_LATENCY_BUCKETS, **labels):
+        """Return a histogram."""
+        return self._metric(Histogram, name, description, labels, buckets)
+
+    def remove(self, name, **labels):
+        """Forget the metric of a name and labels, e.g. of a closed gateway."""
+        family = self._families.get(name)
+        if family is not None:
+            family[2].pop(tuple(sorted(labels.items())), None)
+
+    def snapshot(self):
+        """Return every sample as a dict of name{labels}: value."""
+        samples = {}
+        for name, (_, _, metrics) in sorted(self._families.items()):
+            for labels, metric in sorted(metrics.items()):
+                samples[self.prefix + name + _labelText(labels)] = metric.sample()
+        return samples
+
+    def render(self):
+        """Return the metrics in the OpenMetrics text format."""
+        lines = []
+        for name, (kind, description, metrics) in sorted(self._families.items()):
+            name = self.prefix + name
+            lines.append("# TYPE %s %s" % (name, kind))
+            if description:
+                lines.append("# HELP %s %s" % (name, description))
+            for labels, metric in sorted(metrics.items()):
+                if kind == "counter":
+                    lines.append("%s_total%s %s" % (name, _labelText(labels), metric.sample()))
+                elif kind == "gauge":
+                    lines.append("%s%s %s" % (name, _labelText(labels), metric.sample()))
+                else:
+                    sample = metric.sample()
+                    for bound, count in sample["buckets"].items():
+                        lines.append(
+                            "%s_bucket%s %d"
+                            % (name, _labelText(labels + (("le", repr(float(bound))),)), count)
+                        )
+                    lines.append(
+                        "%s_bucket%s %d" % (name, _labelText(labels + (("le", "+Inf"),)), sample["count"])
+                    )
+                    lines.append("%s_count%s %d" % (name, _labelText(labels), sample["count"]))
+                    lines.append("%s_sum%s %r" % (name, _labelText(labels), sample["sum"]))
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer(object):
+    """Class for a minimal HTTP endpoint serving GET /metrics."""
+
+    def __init__(self, registry, host=DEFAULT_METRICS_HOST, port=0, loop=None):
+        """Initialize the endpoint - port 0 picks a free port."""
+        self._registry = registry
+        self._loop = loop if loop else asyncio.get_event_loop()
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        """Start listening."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        if not self.port:
+            self.port = self._server.sockets[0].getsockname()[1]
+
+    async def _handle(self, reader, writer):
+        """Answer one request and close the connection."""
+        try:
+            request = await asyncio.wait_for(reader.readline(), 5)
+            while True:  # skip the headers
+                line = await asyncio.wait_for(reader.readline(), 5)
+                if line in [b"\r\n", b"\n", b""]:
+                    break
+            parts = request.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] in ["GET", "HEAD"] and parts[1].split("?")[0] == "/metrics":
+                status = "200 OK"
+                body = self._registry.render().encode()
+                contentType = OPENMETRICS_CONTENT_TYPE
+            else:
+                status = "404 Not Found"
+                body = b"Not Found\n"
+                contentType = "text/plain"
+            writer.write(
+                (
+                    "HTTP/1.0 %s\r\nContent-Type: %s\r\nContent-Length: %d\r\nConnection: close\r\n\r\n"
+                    % (status, contentType, len(body))
+                ).encode()
+            )
+            if parts and parts[0] != "HEAD":
+                writer.write(body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        """Stop listening."""
+        if self._server is not None:
+            self._server.close()
+            self._server = None
@@ -0,0 +1,264 @@
+"""
+@ Author      : Troy Kelly
+@ Date        : 19 Oct 2026
+@ Description : Philips Dynalite Library - Share one gateway connection between many local clients
+
+@ Notes:        Most RS485-IP gateways only take one TCP client. The multiplexer holds that one
+                connection through a Dynet and listens locally: every frame from the bus goes to
+                every client, and frames from clients are sent to the bus through the Dynet pacer,
+                taking one frame from each client with something queued in turn. A frame sent
+                for one client is also passed to the other clients, as they would see it on the bus,
+                once the Dynet has written it - a frame that never reaches the bus is not echoed.
+
+                Run standalone with: python -m dynalite_lib.multiplexer GATEWAY_HOST GATEWAY_PORT
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from collections import deque
+
+from .const import SyncType, CONF_ACTIVE_ON
+from .dynet import Dynet, DynetPacket, DEFAULT_MESSAGE_DELAY
+
+DEFAULT_LOG = logging.getLogger(__name__)
+DEFAULT_LISTEN_HOST = "127.0.0.1"
+DEFAULT_LISTEN_PORT = 12345
+# frames queued per client before the oldest is dropped
+DEFAULT_CLIENT_QUEUE = 100
+SYNC_VALUES = [item.value for item in SyncType]
+
+
+class MultiplexerClient(asyncio.Protocol):
+    """Class for the connection of one local client."""
+
+    def __init__(self, multiplexer):
+        """Initialize the client."""
+        self._multiplexer = multiplexer
+        self.transport = None
+        self.peer = None
+        self.queue = deque()
+        self._inBuffer = bytearray()
+        self.framesIn = 0
+        self.framesOut = 0
+        self.framesSent = 0
+        self.bytesIn = 0
+        self.bytesOut = 0
+        self.dropped = 0
+        self.maxQueued = 0
+        self.waitTotal = 0.0
+
+    def connection_made(self, transport):
+        """Register the client."""
+        self.transport = transport
+        self.peer = transport.get_extra_info("peername")
+        self._multiplexer.addClient(self)
+
+    def connection_lost(self, exc=None):
+        """Unregister the client."""
+        self.transport = None
+        self._multiplexer.removeClient(self)
+
+    def data_received(self, data):
+        """Split client data into frames and queue them for the bus."""
+        self.bytesIn += len(data)
+        self._inBuffer.extend(data)
+        while len(self._inBuffer) >= 8:
+            if self._inBuffer[0] not in SYNC_VALUES:
+                del self._inBuffer[0]
+                continue
+            frame = bytes(self._inBuffer[:8])
+            del self._inBuffer[:8]
+            self.framesIn += 1
+            if len(self.queue) >= self._multiplexer.clientQueue:
+                self.queue.popleft()
+                self.dropped += 1
+            self.queue.append((time.monotonic(), frame))
+            self.maxQueued = max(self.maxQueued, len(self.queue))
+        self._multiplexer.pump()
+
+    def send(self, frame):
+        """Send a frame to the client."""
+        if self.transport is None:
+            return
+        self.transport.write(frame)
+        self.framesOut += 1
+        self.bytesOut += len(frame)
+
+    def stats(self):
+        """Return the throughput and queueing counters of the client."""
+        return {
+            "peer": self.peer,
+            "frames_in": self.framesIn,
+            "frames_out": self.framesOut,
+            "frames_sent": self.framesSent,
+            "bytes_in": self.bytesIn,
+            "bytes_out": self.bytesOut,
+            "dropped": self.dropped,
+            "queued": len(self.queue),
+            "max_queued": self.maxQueued,
+            "avg_wait": self.waitTotal / self.framesSent if self.framesSent else 0.0,
+        }
+
+
+class DynetMultiplexer(object):
+    """Class to hold the gateway connection and serve it to local clients."""
+
+    def __init__(
+        self,
+        host,
+        port,
+        listenHost=DEFAULT_LISTEN_HOST,
+        listenPort=DEFAULT_LISTEN_PORT,
+        loop=None,
+        logger=DEFAULT_LOG,
+        clientQueue=DEFAULT_CLIENT_QUEUE,
+        messageDelay=DEFAULT_MESSAGE_DELAY,
+    ):
+        """Initialize the multiplexer."""
+        self._loop = loop if loop else asyncio.get_event_loop()
+        self._logger = logger
+        self.listenHost = listenHost
+        self.listenPort = listenPort
+        self.clientQueue = clientQueue
+        self._clients = deque()
+        self._server = None
+        self._pumpTimer = None
+        self._closing = False
+        self._dynet = Dynet(
+            host=host,
+            port=port,
+            active=CONF_ACTIVE_ON,  # clients may poll, so requests must go through
+            broadcaster=self._event,
+            onConnect=self._connected,
+            onDisconnect=self._disconnected,
+            loop=self._loop,
+            logger=logger,
+            frameHandler=self._fromBus,
+            sentHandler=self._toBus,
+            messageDelay=messageDelay,
+        )
+        self._messageDelay = messageDelay
+        self.framesFromBus = 0
+        self.framesToBus = 0
+
+    async def start(self):
+        """Start listening and connect to the gateway."""
+        self._server = await self._loop.create_server(
+            lambda: MultiplexerClient(self), self.listenHost, self.listenPort
+        )
+        if not self.listenPort:
+            self.listenPort = self._server.sockets[0].getsockname()[1]
+        self._dynet.connect()
+
+    async def close(self):
+        """Stop listening, disconnect every client and the gateway."""
+        self._closing = True
+        if self._pumpTimer is not None:
+            self._pumpTimer.cancel()
+            self._pumpTimer = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for client in list(self._clients):
+            if client.transport is not None:
+                client.transport.close()
+        self._dynet.close()
+
+    def addClient(self, client):
+        """Start serving a client."""
+        self._logger.debug("Multiplexer client %s connected", client.peer)
+        self._clients.append(client)
+
+    def removeClient(self, client):
+        """Stop serving a client."""
+        self._logger.debug("Multiplexer client %s disconnected", client.peer)
+        if client in self._clients:
+            self._clients.remove(client)
+
+    def _event(self, event):
+        """Ignore decoded events - clients decode frames themselves."""
+
+    async def _connected(self, dynet=None, transport=None):
+        """Handle the gateway connection."""
+        self._logger.info("Multiplexer connected to gateway")
+        self.pump()
+
+    async def _disconnected(self, dynet=None):
+        """Report the loss of the gateway - the Dynet reconnects by itself."""
+        if self._closing:
+            return
+        self._logger.warning("Multiplexer lost the gateway - reconnecting")
+
+    def _fromBus(self, frame):
+        """Pass a frame from the bus to every client."""
+        self.framesFromBus += 1
+        for client in self._clients:
+            client.send(frame)
+
+    def _toBus(self, packet, frame):
+        """Pass a frame written to the bus to every client but the one that sent it."""
+        self.framesToBus += 1
+        for client in self._clients:
+            if client is not packet.origin:
+                client.send(frame)
+
+    def pump(self):
+        """Send the next client frame to the bus if the Dynet queue is empty, taking clients in turn."""
+        if self._pumpTimer is not None:
+            return
+        sent = False
+        if self._dynet.queueLength() == 0:
+            for _ in range(len(self._clients)):
+                client = self._clients[0]
+                self._clients.rotate(-1)
+                if client.queue:
+                    queued, frame = client.queue.popleft()
+                    client.framesSent += 1
+                    client.waitTotal += time.monotonic() - queued
+                    packet = DynetPacket(msg=list(frame))
+                    packet.origin = client
+                    self._dynet.write(packet)
+                    sent = True
+                    break
+        if sent or any(client.queue for client in self._clients):
+            self._pumpTimer = self._loop.call_later(
+                self._messageDelay / 1000, self._pumpLater
+            )
+
+    def _pumpLater(self):
+        """Pump again once the pacer had time to send."""
+        self._pumpTimer = None
+        self.pump()
+
+    def stats(self):
+        """Return multiplexer and per-client counters."""
+        return {
+            "frames_from_bus": self.framesFromBus,
+            "frames_to_bus": self.framesToBus,
+            "bus_queue": self._dynet.queueLength(),
+            "clients": [client.stats() for client in self._clients],
+        }
+
+
+def main():
+    """Run a multiplexer from the command line."""
+    parser = argparse.ArgumentParser(description="Share one Dynet gateway between clients")
+    parser.add_argument("host", help="gateway host")
+    parser.add_argument("port", type=int, help="gateway port")
+    parser.add_argument("--listen-host", default=DEFAULT_LISTEN_HOST)
+    parser.add_argument("--listen-port", type=int, default=DEFAULT_LISTEN_PORT)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    loop = asyncio.get_event_loop()
+    multiplexer = DynetMultiplexer(
+        args.host, args.port, args.listen_host, args.listen_port, loop=loop
+    )
+    loop.run_until_complete(multiplexer.start())
+    loop.run_forever()
+
+
+if __name__ == "__main__":
+    main()
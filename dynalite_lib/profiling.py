@@ -0,0 +1,97 @@
+"""
+@ Author      : Troy Kelly
+@ Date        : 19 Oct 2026
+@ Description : Philips Dynalite Library - Sampled profiling of the inbound pipeline stages
+
+@ Notes:        One call in every sampleRate of each inbound pipeline stage is timed with
+                perf_counter_ns: framing in Dynet._receive, the DynetInbound handler of each
+                opcode, Dynalite._processTraffic per event type and the dispatch to listeners.
+                Unsampled calls cost a counter increment, so a rate of 100 or more can stay on.
+                A framing call only counts when it produces a packet: Dynet stamps the start of a
+                pass when the sample is due() and calls sample() once a packet comes out.
+"""
+
+import time
+
+STAGE_FRAMING = "framing"
+STAGE_HANDLER = "handler"
+STAGE_PROCESS = "process"
+STAGE_DISPATCH = "dispatch"
+DEFAULT_SAMPLE_RATE = 100
+
+
+class PipelineProfiler(object):
+    """Class to accumulate sampled time and calls per pipeline stage and per opcode or event type."""
+
+    def __init__(self, sampleRate=DEFAULT_SAMPLE_RATE):
+        """Initialize the profiler - sampleRate 1 times everything."""
+        self.sampleRate = max(int(sampleRate), 1)
+        self._ticks = {}  # calls of each stage since its last sample
+        self._costs = {}  # (stage, detail or None): [sampled calls, nanoseconds]
+        self.started = time.monotonic()
+
+    def sample(self, stage):
+        """Return whether the next call of a stage should be timed."""
+        tick = self._ticks.get(stage, 0) + 1
+        if tick >= self.sampleRate:
+            self._ticks[stage] = 0
+            return True
+        self._ticks[stage] = tick
+        return False
+
+    def due(self, stage):
+        """Return whether the next call of a stage will be timed, without counting a call."""
+        return self._ticks.get(stage, 0) + 1 >= self.sampleRate
+
+    @staticmethod
+    def now():
+        """Return the clock the profiler times with."""
+        return time.perf_counter_ns()
+
+    def record(self, stage, started, detail=None):
+        """Add the time since started to a stage, and to its breakdown by opcode or event type."""
+        elapsed = time.perf_counter_ns() - started
+        self._add((stage, None), elapsed)
+        if detail is not None:
+            self._add((stage, detail), elapsed)
+
+    def _add(self, key, elapsed):
+        """Add one sampled call."""
+        cost = self._costs.get(key)
+        if cost is None:
+            self._costs[key] = [1, elapsed]
+        else:
+            cost[0] += 1
+            cost[1] += elapsed
+
+    def report(self, top=10, stage=None):
+        """Return the top costs, largest first, estimated from the samples.
+
+        Without a stage the stages are listed, with one its breakdown by opcode or event type.
+        """
+        costs = [
+            (key, cost)
+            for key, cost in self._costs.items()
+            if (key[1] is None) == (stage is None) and (stage is None or key[0] == stage)
+        ]
+        total = sum(cost[1] for _, cost in costs)
+        entries = [
+            {
+                "stage": costStage,
+                "name": costStage if detail is None else detail,
+                "sampled_calls": calls,
+                "estimated_calls": calls * self.sampleRate,
+                "estimated_ms": elapsed * self.sampleRate / 1e6,
+                "mean_us": elapsed / calls / 1e3,
+                "share": elapsed / total if total else 0.0,
+            }
+            for (costStage, detail), (calls, elapsed) in costs
+        ]
+        entries.sort(key=lambda entry: entry["estimated_ms"], reverse=True)
+        return entries[:top] if top else entries
+
+    def reset(self):
+        """Forget everything recorded."""
+        self._costs.clear()
+        self._ticks.clear()
+        self.started = time.monotonic()
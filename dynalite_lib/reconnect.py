@@ -0,0 +1,261 @@
+"""
+@ Author      : Troy Kelly
+@ Date        : 19 Oct 2026
+@ Description : Philips Dynalite Library - Reconnect scheduling and replay of queued commands
+
+@ Notes:        The Dynet is the only owner of reconnection. Retries wait a decorrelated jitter
+                delay (AWS architecture blog "Exponential Backoff And Jitter") so many clients of one
+                gateway do not retry in step, and rotate through the failover addresses - an
+                address that fails is skipped straight away while there are others not yet tried.
+"""
+
+import asyncio
+import logging
+import random
+import time
+
+from .const import (
+    OpcodeType,
+    REPLAY_EXPIRE,
+    REPLAY_LATEST,
+    REPLAY_DROP_POLLS,
+)
+
+DEFAULT_LOG = logging.getLogger(__name__)
+DEFAULT_RECONNECT_BASE = 1
+DEFAULT_RECONNECT_CAP = 60
+# seconds a queued command stays worth sending with the expire replay policy
+DEFAULT_REPLAY_MAX_AGE = 30
+# a connection lost sooner than this (seconds) counts as a failed attempt, so a flapping gateway backs off
+STABLE_CONNECTION = 10
+
+PRESET_OPCODES = [
+    OpcodeType.PRESET_1.value,
+    OpcodeType.PRESET_2.value,
+    OpcodeType.PRESET_3.value,
+    OpcodeType.PRESET_4.value,
+    OpcodeType.PRESET_5.value,
+    OpcodeType.PRESET_6.value,
+    OpcodeType.PRESET_7.value,
+    OpcodeType.PRESET_8.value,
+    OpcodeType.RECALL_OFF.value,
+    OpcodeType.LINEAR_PRESET.value,
+]
+CHANNEL_OPCODES = [
+    OpcodeType.SET_CHANNEL_1_TO_LEVEL_WITH_FADE.value,
+    OpcodeType.SET_CHANNEL_2_TO_LEVEL_WITH_FADE.value,
+    OpcodeType.SET_CHANNEL_3_TO_LEVEL_WITH_FADE.value,
+    OpcodeType.SET_CHANNEL_4_TO_LEVEL_WITH_FADE.value,
+]
+POLL_OPCODES = [OpcodeType.REQUEST_PRESET.value, OpcodeType.REQUEST_CHANNEL_LEVEL.value]
+
+
+class ReconnectError(Exception):
+    """Class for reconnect configuration errors."""
+
+    def __init__(self, message):
+        """Initialize the error."""
+        self.message = message
+
+
+def packetEntity(packet):
+    """Return the area or channel a queued packet sets, or None if it does not set one state."""
+    if packet.command in PRESET_OPCODES:
+        return ("preset", packet.area, packet.join)
+    if packet.command in CHANNEL_OPCODES:
+        bank = packet.data[1]
+        channel = (0 if bank == 0xFF else (bank + 1) * 4) + packet.command - CHANNEL_OPCODES[0] + 1
+        return ("channel", packet.area, packet.join, channel)
+    if packet.command in POLL_OPCODES:
+        return ("poll", packet.area, packet.join, packet.command, packet.data[0])
+    return None
+
+
+def replayQueue(packets, policies, maxAge=DEFAULT_REPLAY_MAX_AGE, now=None):
+    """Return the queued packets that are still worth sending after a reconnect."""
+    if not policies:
+        return list(packets)
+    if now is None:
+        now = time.monotonic()
+    if REPLAY_EXPIRE in policies:
+        packets = [
+            packet
+            for packet in packets
+            if packet.queued is None or now - packet.queued <= maxAge
+        ]
+    if REPLAY_DROP_POLLS in policies:
+        packets = [packet for packet in packets if packet.command not in POLL_OPCODES]
+    if REPLAY_LATEST in policies:
+        latest = {}
+        for index, packet in enumerate(packets):
+            entity = packetEntity(packet)
+            if entity is not None:
+                latest[entity] = index
+        packets = [
+            packet
+            for index, packet in enumerate(packets)
+            if latest.get(packetEntity(packet), index) == index
+        ]
+    return packets
+
+
+class ReconnectManager(object):
+    """Class to schedule connection attempts over a list of addresses and time recoveries."""
+
+    def __init__(
+        self,
+        loop,
+        connectFunction,
+        addresses,
+        base=DEFAULT_RECONNECT_BASE,
+        cap=DEFAULT_RECONNECT_CAP,
+        logger=DEFAULT_LOG,
+    ):
+        """Initialize with the function that starts an attempt on an address."""
+        if not addresses:
+            raise ReconnectError("At least one address is needed")
+        if base <= 0 or cap < base:
+            raise ReconnectError("Bad reconnect delays %s-%s" % (base, cap))
+        self._loop = loop
+        self._connectFunction = connectFunction
+        self.addresses = list(addresses)
+        self._base = base
+        self._cap = cap
+        self._logger = logger
+        self._index = 0
+        self._failedInRound = 0
+        self._sleep = base
+        self._timer = None
+        self._attempting = False
+        self._lostAt = None
+        self._connectedAt = None
+        self.closed = False
+        self.attempts = 0
+        self.failures = 0
+        self.recoveries = 0
+        self.failovers = 0
+        self.lastRecovery = None
+        self.maxRecovery = 0.0
+        self.totalRecovery = 0.0
+
+    @property
+    def address(self):
+        """Return the address in use or being tried."""
+        return self.addresses[self._index]
+
+    def nextDelay(self):
+        """Return the next retry delay - decorrelated jitter between base and three times the last."""
+        self._sleep = min(self._cap, random.uniform(self._base, self._sleep * 3))
+        return self._sleep
+
+    def start(self):
+        """Start an attempt now unless one is already running or scheduled."""
+        if self.closed or self._attempting or self._timer is not None:
+            return None
+        return self._attempt()
+
+    def _attempt(self):
+        """Start an attempt on the current address."""
+        self._timer = None
+        if self.closed:
+            return None
+        self._attempting = True
+        self.attempts += 1
+        attempt = self._connectFunction(self.address)
+        if isinstance(attempt, asyncio.Future):
+            attempt.add_done_callback(self._attemptDone)
+        return attempt
+
+    def _attemptDone(self, attempt):
+        """Count an attempt that raised or was cancelled as failed, so reconnecting goes on."""
+        if not attempt.cancelled() and attempt.exception() is None:
+            return
+        if not self._attempting:
+            return
+        if self.closed:
+            self._attempting = False
+            return
+        if not attempt.cancelled():
+            self._logger.warning(
+                "Connection attempt on %s:%s failed unexpectedly",
+                *self.address,
+                exc_info=attempt.exception()
+            )
+        self.failed()
+
+    def _schedule(self, delay):
+        """Start the next attempt after delay seconds."""
+        if self._timer is not None:
+            return
+        if delay <= 0:
+            self._timer = self._loop.call_soon(self._attempt)
+        else:
+            self._timer = self._loop.call_later(delay, self._attempt)
+
+    def connected(self):
+        """Record a successful attempt."""
+        self._attempting = False
+        self._connectedAt = time.monotonic()
+        if self._lostAt is not None:
+            recovery = time.monotonic() - self._lostAt
+            self._lostAt = None
+            self.recoveries += 1
+            self.lastRecovery = recovery
+            self.totalRecovery += recovery
+            self.maxRecovery = max(self.maxRecovery, recovery)
+            self._logger.info("Dynet recovered in %.2f seconds on %s:%s", recovery, *self.address)
+
+    def failed(self):
+        """Record a failed attempt and schedule the next - the next address at once if not all were tried."""
+        self._attempting = False
+        self.failures += 1
+        self._failedInRound += 1
+        if self._lostAt is None:
+            self._lostAt = time.monotonic()
+        if len(self.addresses) > 1:
+            self._index = (self._index + 1) % len(self.addresses)
+            self.failovers += 1
+        if self._failedInRound < len(self.addresses):
+            self._schedule(0)
+            return
+        self._failedInRound = 0
+        delay = self.nextDelay()
+        self._logger.warning(
+            "Could not connect to Dynet. Retrying in %.1f seconds on %s:%s", delay, *self.address
+        )
+        self._schedule(delay)
+
+    def lost(self):
+        """Record the loss of an established connection and reconnect at once on the same address."""
+        now = time.monotonic()
+        connectedAt, self._connectedAt = self._connectedAt, None
+        if connectedAt is not None and now - connectedAt < STABLE_CONNECTION:
+            self.failed()  # flapping - back off and fail over
+            return
+        self._attempting = False
+        self._failedInRound = 0
+        self._sleep = self._base
+        if self._lostAt is None:
+            self._lostAt = now
+        self._schedule(0)
+
+    def close(self):
+        """Stop reconnecting."""
+        self.closed = True
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def stats(self):
+        """Return attempt and time-to-recover counters."""
+        return {
+            "address": "%s:%s" % self.address,
+            "attempts": self.attempts,
+            "failures": self.failures,
+            "failovers": self.failovers,
+            "recoveries": self.recoveries,
+            "last_recovery": self.lastRecovery,
+            "max_recovery": self.maxRecovery,
+            "avg_recovery": self.totalRecovery / self.recoveries if self.recoveries else 0.0,
+            "down": self._lostAt is not None,
+        }
@@ -0,0 +1,140 @@
+"""
+@ Author      : Troy Kelly
+@ Date        : 19 Oct 2026
+@ Description : Philips Dynalite Library - Re-validate state after a reconnect, stalest first
+
+@ Notes:        Every preset or level report from the bus confirms an area or channel. After a
+                reconnect only the entities not confirmed since the link went down are polled,
+                oldest confirmation first, one poll per interval and at most budget polls per pass,
+                so commands from users still get through and a gateway blip costs seconds of bus
+                time instead of a full re-poll.
+"""
+
+from .const import (
+    CONF_COVERAGE,
+    CONF_POLLED,
+    CONF_CONFIRMED,
+    CONF_TOTAL,
+    CONF_DURATION,
+)
+
+# most polls one resync pass may put on the bus
+DEFAULT_RESYNC_BUDGET = 100
+# seconds to wait for the answers after the last poll
+DEFAULT_RESYNC_TIMEOUT = 5
+NEVER = float("-inf")
+
+
+class StalenessTracker(object):
+    """Class to keep when each area preset and channel level was last confirmed by the bus."""
+
+    def __init__(self):
+        """Initialize the tracker."""
+        self._confirmed = {}
+
+    def confirm(self, area, channel=None, when=0.0):
+        """Record that the bus reported an area preset (channel None) or a channel level."""
+        self._confirmed[(area, channel)] = when
+
+    def lastConfirmed(self, area, channel=None):
+        """Return when an entity was last confirmed, or None."""
+        return self._confirmed.get((area, channel))
+
+    def confirmedSince(self, entity, since):
+        """Return whether an entity was confirmed at or after since."""
+        return self._confirmed.get(entity, NEVER) >= since
+
+    def stalest(self, entities, since):
+        """Return the entities not confirmed since a time, oldest confirmation first."""
+        confirmed = self._confirmed
+        stale = [entity for entity in entities if confirmed.get(entity, NEVER) < since]
+        stale.sort(key=lambda entity: confirmed.get(entity, NEVER))
+        return stale
+
+
+class ResyncPass(object):
+    """Class for one paced resync pass over a set of entities."""
+
+    def __init__(
+        self,
+        loop,
+        tracker,
+        entities,
+        pollFunction,
+        since,
+        onComplete=None,
+        budget=DEFAULT_RESYNC_BUDGET,
+        interval=0.4,
+        timeout=DEFAULT_RESYNC_TIMEOUT,
+    ):
+        """Initialize with the (area, channel or None) entities and a function polling one."""
+        self._loop = loop
+        self._tracker = tracker
+        self.entities = list(entities)
+        self._pollFunction = pollFunction
+        self.since = since
+        self._onComplete = onComplete
+        self._interval = interval
+        self._timeout = timeout
+        stale = tracker.stalest(self.entities, since)
+        self._queue = stale[:budget]
+        self.skipped = len(stale) - len(self._queue)  # left for the next pass
+        self.polled = []
+        self._timer = None
+        self._started = None
+        self._lastPoll = None
+        self.done = False
+        self.result = None
+
+    def start(self):
+        """Start polling."""
+        self._started = self._loop.time()
+        self._next()
+
+    def _next(self):
+        """Poll the next stale entity that was not confirmed meanwhile, or start waiting for answers."""
+        self._timer = None
+        while self._queue:
+            entity = self._queue.pop(0)
+            if self._tracker.confirmedSince(entity, self.since):
+                continue  # answered by ordinary traffic already
+            self._pollFunction(*entity)
+            self.polled.append(entity)
+            self._lastPoll = self._loop.time()
+            self._timer = self._loop.call_later(self._interval, self._next)
+            return
+        self._settle()
+
+    def _settle(self):
+        """Finish once every polled entity answered or the timeout passed."""
+        self._timer = None
+        answered = all(self._tracker.confirmedSince(entity, self.since) for entity in self.polled)
+        waited = self._loop.time() - (self._lastPoll if self._lastPoll is not None else self._started)
+        if answered or waited >= self._timeout:
+            self._finish()
+        else:
+            self._timer = self._loop.call_later(self._interval, self._settle)
+
+    def _finish(self):
+        """Compute the coverage and report it."""
+        self.done = True
+        total = len(self.entities)
+        confirmed = sum(
+            1 for entity in self.entities if self._tracker.confirmedSince(entity, self.since)
+        )
+        self.result = {
+            CONF_COVERAGE: round(100.0 * confirmed / total, 1) if total else 100.0,
+            CONF_POLLED: len(self.polled),
+            CONF_CONFIRMED: confirmed,
+            CONF_TOTAL: total,
+            CONF_DURATION: round(self._loop.time() - self._started, 3),
+        }
+        if self._onComplete:
+            self._onComplete(self)
+
+    def cancel(self):
+        """Stop the pass without reporting."""
+        self.done = True
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
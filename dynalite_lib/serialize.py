@@ -0,0 +1,214 @@
+"""
+@ Author      : Troy Kelly
+@ Date        : 19 Oct 2026
+@ Description : Philips Dynalite Library - Batch serialization of events and state
+
+@ Notes:        NDJSON uses orjson or ujson when installed and falls back to a precompiled json
+                encoder. The binary format is a fixed-width little-endian record per event.
+"""
+
+import json
+import math
+import struct
+import time
+
+from .event import DynetEvent
+from .const import (
+    CONF_AREA,
+    CONF_CHANNEL,
+    CONF_PRESET,
+    CONF_FADE,
+    CONF_ACTION,
+    CONF_ACTION_REPORT,
+    CONF_ACTION_CMD,
+    CONF_TRGT_LEVEL,
+    CONF_ACT_LEVEL,
+    CONF_ALL,
+    CONF_DIR_IN,
+    EVENT_CHANNEL,
+    EVENT_CONFIGURED,
+    EVENT_CONNECTED,
+    EVENT_DISCONNECTED,
+    EVENT_NEWCHANNEL,
+    EVENT_NEWPRESET,
+    EVENT_PRESET,
+    EVENT_REQPRESET,
+    EVENT_RESYNC,
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+BACKEND_ORJSON = "orjson"
+BACKEND_UJSON = "ujson"
+BACKEND_JSON = "json"
+
+# timestamp, event type, area, channel, preset, action, target level, actual level, fade, direction
+EVENT_RECORD = struct.Struct("<dBBHHBHHfB")
+NO_VALUE = 0xFFFF
+CHANNEL_ALL = 0xFFFE
+EVENT_CODES = {
+    EVENT_CHANNEL: 1,
+    EVENT_PRESET: 2,
+    EVENT_NEWCHANNEL: 3,
+    EVENT_NEWPRESET: 4,
+    EVENT_REQPRESET: 5,
+    EVENT_CONNECTED: 6,
+    EVENT_DISCONNECTED: 7,
+    EVENT_CONFIGURED: 8,
+    EVENT_RESYNC: 9,
+}
+BUS_STATE_CODES = [6, 7, 8, 9]  # events that are not about an area
+EVENT_TYPES = {code: eventType for eventType, code in EVENT_CODES.items()}
+ACTION_CODES = {CONF_ACTION_REPORT: 1, CONF_ACTION_CMD: 2}
+ACTIONS = {code: action for action, code in ACTION_CODES.items()}
+
+
+class SerializeError(Exception):
+    """Class for serialization errors."""
+
+    def __init__(self, message):
+        """Initialize the error."""
+        self.message = message
+
+
+def _jsonDumps(backend):
+    """Return a function encoding an object to JSON bytes with the given backend."""
+    if backend == BACKEND_ORJSON:
+        return orjson.dumps
+    if backend == BACKEND_UJSON:
+        ujsonDumps = ujson.dumps
+        return lambda obj: ujsonDumps(obj, ensure_ascii=False).encode("utf-8")
+    encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+    return lambda obj: encode(obj).encode("utf-8")
+
+
+def availableBackend():
+    """Return the fastest JSON backend installed."""
+    if orjson is not None:
+        return BACKEND_ORJSON
+    if ujson is not None:
+        return BACKEND_UJSON
+    return BACKEND_JSON
+
+
+class NdjsonEncoder(object):
+    """Class to encode batches of events or state to newline delimited JSON bytes."""
+
+    def __init__(self, backend=None):
+        """Initialize the encoder, with the fastest available backend by default."""
+        backend = backend if backend else availableBackend()
+        if (backend == BACKEND_ORJSON and orjson is None) or (
+            backend == BACKEND_UJSON and ujson is None
+        ):
+            raise SerializeError("JSON backend %s is not installed" % backend)
+        if backend not in [BACKEND_ORJSON, BACKEND_UJSON, BACKEND_JSON]:
+            raise SerializeError("Unknown JSON backend %s" % backend)
+        self.backend = backend
+        self._dumps = _jsonDumps(backend)
+
+    def encodeEvents(self, events):
+        """Encode events to NDJSON, one event per line."""
+        dumps = self._dumps
+        lines = [dumps(event.toDict()) for event in events]
+        lines.append(b"")
+        return b"\n".join(lines)
+
+    def encodeState(self, snapshot):
+        """Encode a Dynalite.snapshot() to NDJSON, one area per line."""
+        dumps = self._dumps
+        lines = []
+        for areaValue, area in snapshot[CONF_AREA].items():
+            lines.append(
+                dumps(
+                    {
+                        CONF_AREA: areaValue,
+                        CONF_PRESET: area[CONF_PRESET],
+                        CONF_CHANNEL: {
+                            str(channel): level
+                            for channel, level in area[CONF_CHANNEL].items()
+                        },
+                    }
+                )
+            )
+        lines.append(b"")
+        return b"\n".join(lines)
+
+
+def _optional(value):
+    """Return an integer field or NO_VALUE."""
+    return NO_VALUE if value is None else int(value)
+
+
+def encodeEventsBinary(events, timestamp=None):
+    """Encode events to fixed-width binary records."""
+    if timestamp is None:
+        timestamp = time.time()
+    buffer = bytearray(EVENT_RECORD.size * len(events))
+    offset = 0
+    for event in events:
+        if event.eventType not in EVENT_CODES:
+            raise SerializeError("Event type %s has no binary code" % event.eventType)
+        channel = event.get(CONF_CHANNEL)
+        fade = event.get(CONF_FADE)
+        EVENT_RECORD.pack_into(
+            buffer,
+            offset,
+            timestamp,
+            EVENT_CODES[event.eventType],
+            event.get(CONF_AREA, 0),
+            CHANNEL_ALL if channel == CONF_ALL else _optional(channel),
+            _optional(event.get(CONF_PRESET)),
+            ACTION_CODES.get(event.get(CONF_ACTION), 0),
+            _optional(event.get(CONF_TRGT_LEVEL)),
+            _optional(event.get(CONF_ACT_LEVEL)),
+            math.nan if fade is None else fade,
+            1 if event.direction == CONF_DIR_IN else 0,
+        )
+        offset += EVENT_RECORD.size
+    return bytes(buffer)
+
+
+def decodeEventsBinary(buffer):
+    """Decode binary records back to (timestamp, DynetEvent) pairs."""
+    if len(buffer) % EVENT_RECORD.size:
+        raise SerializeError("Binary event buffer is not a whole number of records")
+    result = []
+    for record in EVENT_RECORD.iter_unpack(buffer):
+        timestamp, code, area, channel, preset, action, target, actual, fade, direction = record
+        keys = []
+        values = []
+        if area or code not in BUS_STATE_CODES:
+            keys.append(CONF_AREA)
+            values.append(area)
+        if channel != NO_VALUE:
+            keys.append(CONF_CHANNEL)
+            values.append(CONF_ALL if channel == CHANNEL_ALL else channel)
+        for key, value in ((CONF_PRESET, preset), (CONF_TRGT_LEVEL, target), (CONF_ACT_LEVEL, actual)):
+            if value != NO_VALUE:
+                keys.append(key)
+                values.append(value)
+        if action in ACTIONS:
+            keys.append(CONF_ACTION)
+            values.append(ACTIONS[action])
+        if not math.isnan(fade):
+            keys.append(CONF_FADE)
+            values.append(fade)
+        result.append(
+            (
+                timestamp,
+                DynetEvent.fromFields(
+                    EVENT_TYPES.get(code),
+                    tuple(keys),
+                    tuple(values),
+                    direction=CONF_DIR_IN if direction else None,
+                ),
+            )
+        )
+    return result
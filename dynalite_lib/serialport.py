@@ -0,0 +1,222 @@
+"""
+@ Author      : Troy Kelly
+@ Date        : 19 Oct 2026
+@ Description : Philips Dynalite Library - Direct serial port transport for RS485 adapters
+
+@ Notes:        Opens the tty in raw 8N1 mode with termios and drives it from the event loop with
+                add_reader/add_writer, so any asyncio.Protocol (DynetConnection) can use a USB-RS485
+                adapter the same way it uses a TCP gateway. POSIX only.
+"""
+
+import asyncio
+import errno
+import os
+
+from .const import DEFAULT_BAUDRATE
+
+try:
+    import termios
+except ImportError:  # not POSIX
+    termios = None
+
+# DyNET runs 8 data bits, no parity, 1 stop bit
+BITS_PER_BYTE = 10  # start + 8 data + stop
+FRAME_BYTES = 8
+HIGH_WATER = 64 * 1024
+LOW_WATER = 16 * 1024
+READ_SIZE = 4096
+
+
+class SerialError(Exception):
+    """Class for serial port errors."""
+
+    def __init__(self, message):
+        """Initialize the error."""
+        self.message = message
+
+
+def frameTime(baudrate):
+    """Return the seconds one Dynet frame takes on the wire at a baud rate."""
+    return FRAME_BYTES * BITS_PER_BYTE / float(baudrate)
+
+
+def configurePort(fd, baudrate):
+    """Put a tty in raw 8N1 mode at a baud rate."""
+    if termios is None:
+        raise SerialError("Serial ports need termios")
+    speed = getattr(termios, "B%d" % baudrate, None)
+    if speed is None:
+        raise SerialError("Unsupported baud rate %s" % baudrate)
+    try:
+        iflag, oflag, cflag, lflag, _, _, cc = termios.tcgetattr(fd)
+    except termios.error as err:  # not an OSError - e.g. the device is not a tty
+        raise SerialError("Not a serial port (%s)" % (err.args[-1] if err.args else err)) from err
+    iflag &= ~(
+        termios.IGNBRK
+        | termios.BRKINT
+        | termios.PARMRK
+        | termios.ISTRIP
+        | termios.INLCR
+        | termios.IGNCR
+        | termios.ICRNL
+        | termios.IXON
+        | termios.IXOFF
+        | termios.IXANY
+        | termios.INPCK
+    )
+    oflag &= ~termios.OPOST
+    lflag &= ~(termios.ECHO | termios.ECHONL | termios.ICANON | termios.ISIG | termios.IEXTEN)
+    cflag &= ~(termios.CSIZE | termios.PARENB | termios.CSTOPB)
+    cflag |= termios.CS8 | termios.CREAD | termios.CLOCAL
+    if hasattr(termios, "CRTSCTS"):
+        cflag &= ~termios.CRTSCTS
+    cc[termios.VMIN] = 0
+    cc[termios.VTIME] = 0
+    try:
+        termios.tcsetattr(fd, termios.TCSANOW, [iflag, oflag, cflag, lflag, speed, speed, cc])
+    except termios.error as err:
+        raise SerialError(
+            "Unable to configure the serial port (%s)" % (err.args[-1] if err.args else err)
+        ) from err
+
+
+class SerialTransport(asyncio.Transport):
+    """Class for an asyncio transport over a tty file descriptor."""
+
+    def __init__(self, loop, protocol, fd, device):
+        """Initialize the transport and start reading."""
+        super().__init__(extra={"device": device})
+        self._loop = loop
+        self._protocol = protocol
+        self._fd = fd
+        self._buffer = bytearray()
+        self._closing = False
+        self._readPaused = False
+        self._writePaused = False
+        self._loop.call_soon(self._protocol.connection_made, self)
+        self._loop.call_soon(self._loop.add_reader, self._fd, self._readReady)
+
+    def _readReady(self):
+        """Read what the tty has."""
+        try:
+            data = os.read(self._fd, READ_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as err:
+            self._fatal(err)
+            return
+        if data:
+            self._protocol.data_received(data)
+
+    def write(self, data):
+        """Write data, buffering what the tty does not take at once."""
+        if self._closing:
+            return
+        if not self._buffer:
+            try:
+                written = os.write(self._fd, data)
+            except (BlockingIOError, InterruptedError):
+                written = 0
+            except OSError as err:
+                self._fatal(err)
+                return
+            data = data[written:]
+            if not data:
+                return
+            self._loop.add_writer(self._fd, self._writeReady)
+        self._buffer.extend(data)
+        if not self._writePaused and len(self._buffer) > HIGH_WATER:
+            self._writePaused = True
+            self._protocol.pause_writing()
+
+    def _writeReady(self):
+        """Write buffered data once the tty can take it."""
+        try:
+            written = os.write(self._fd, self._buffer)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as err:
+            self._fatal(err)
+            return
+        del self._buffer[:written]
+        if not self._buffer:
+            self._loop.remove_writer(self._fd)
+            if self._closing:
+                self._finish(None)
+        if self._writePaused and len(self._buffer) <= LOW_WATER:
+            self._writePaused = False
+            self._protocol.resume_writing()
+
+    def get_write_buffer_size(self):
+        """Return the number of bytes waiting to be written."""
+        return len(self._buffer)
+
+    def pause_reading(self):
+        """Stop reading from the tty."""
+        if not self._readPaused and not self._closing:
+            self._readPaused = True
+            self._loop.remove_reader(self._fd)
+
+    def resume_reading(self):
+        """Resume reading from the tty."""
+        if self._readPaused and not self._closing:
+            self._readPaused = False
+            self._loop.add_reader(self._fd, self._readReady)
+
+    def is_reading(self):
+        """Return whether the tty is being read."""
+        return not self._readPaused and not self._closing
+
+    def is_closing(self):
+        """Return whether the transport is closing."""
+        return self._closing
+
+    def close(self):
+        """Close after writing what is buffered."""
+        if self._closing:
+            return
+        self._closing = True
+        self._loop.remove_reader(self._fd)
+        if not self._buffer:
+            self._loop.call_soon(self._finish, None)
+
+    def abort(self):
+        """Close now, dropping buffered data."""
+        self._buffer.clear()
+        self._closing = True
+        self._loop.remove_reader(self._fd)
+        self._loop.remove_writer(self._fd)
+        self._loop.call_soon(self._finish, None)
+
+    def _fatal(self, err):
+        """Close after an error."""
+        if err.errno == errno.EIO:
+            err = SerialError("Serial device went away")
+        self._buffer.clear()
+        self._closing = True
+        self._loop.remove_reader(self._fd)
+        self._loop.remove_writer(self._fd)
+        self._loop.call_soon(self._finish, err)
+
+    def _finish(self, exc):
+        """Release the tty and tell the protocol."""
+        if self._fd is None:
+            return
+        try:
+            self._protocol.connection_lost(exc)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+async def createSerialConnection(loop, protocolFactory, device, baudrate=DEFAULT_BAUDRATE):
+    """Open a tty and connect a protocol to it, like loop.create_connection."""
+    fd = os.open(device, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+    try:
+        configurePort(fd, baudrate)
+    except Exception:
+        os.close(fd)
+        raise
+    protocol = protocolFactory()
+    transport = SerialTransport(loop, protocol, fd, device)
+    return transport, protocol
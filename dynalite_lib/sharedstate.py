@@ -0,0 +1,170 @@
+"""
+@ Author      : Troy Kelly
+@ Date        : 19 Oct 2026
+@ Description : Philips Dynalite Library - Memory-mapped state table shared between local processes
+
+@ Notes:        One process (the one running Dynalite) writes, any number of local processes read.
+                Reads are made consistent with a sequence counter (seqlock): the writer makes the
+                counter odd while it updates a record and even again when done, a reader retries
+                whenever the counter is odd or changed while it was reading. Dynalite publishes
+                every configured channel once configured, so a reader's getAreaLevels lists the
+                same channels as Dynalite.getAreaLevels in the writing process.
+"""
+
+import math
+import mmap
+import os
+import struct
+
+# magic, layout version, channels per area, sequence counter
+HEADER = struct.Struct("<4sHHQ")
+# active preset (0 = unknown), reserved, one float per channel (NaN = unknown)
+AREA_CHANNELS = 255
+AREA_RECORD = struct.Struct("<HH%df" % AREA_CHANNELS)
+AREA_COUNT = 256
+MAGIC = b"DYNS"
+LAYOUT_VERSION = 1
+SEQUENCE = struct.Struct("<Q")
+SEQUENCE_OFFSET = 8
+LEVEL = struct.Struct("<f")
+PRESET = struct.Struct("<H")
+TABLE_SIZE = HEADER.size + AREA_COUNT * AREA_RECORD.size
+READ_RETRIES = 1000
+
+
+class SharedStateError(Exception):
+    """Class for shared state table errors."""
+
+    def __init__(self, message):
+        """Initialize the error."""
+        self.message = message
+
+
+def _areaOffset(area):
+    """Return the offset of an area record."""
+    area = int(area)
+    if area < 0 or area >= AREA_COUNT:
+        raise SharedStateError("Area out of range: %s" % area)
+    return HEADER.size + area * AREA_RECORD.size
+
+
+def _channelOffset(area, channel):
+    """Return the offset of a channel level."""
+    channel = int(channel)
+    if channel < 1 or channel > AREA_CHANNELS:
+        raise SharedStateError("Channel out of range: %s" % channel)
+    return _areaOffset(area) + PRESET.size * 2 + (channel - 1) * LEVEL.size
+
+
+class SharedStateWriter(object):
+    """Class to publish area and channel state into a memory-mapped file."""
+
+    def __init__(self, path):
+        """Create (or reset) the table at path and map it."""
+        self.path = path
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, TABLE_SIZE)
+            self._map = mmap.mmap(fd, TABLE_SIZE, access=mmap.ACCESS_WRITE)
+        finally:
+            os.close(fd)
+        self._seq = 0
+        HEADER.pack_into(self._map, 0, MAGIC, LAYOUT_VERSION, AREA_CHANNELS, 0)
+        emptyArea = AREA_RECORD.pack(0, 0, *([math.nan] * AREA_CHANNELS))
+        for area in range(AREA_COUNT):
+            self._map[_areaOffset(area) : _areaOffset(area) + AREA_RECORD.size] = emptyArea
+
+    @property
+    def sequence(self):
+        """Return the current sequence number."""
+        return self._seq
+
+    def _begin(self):
+        """Mark the table as being updated."""
+        self._seq += 1
+        SEQUENCE.pack_into(self._map, SEQUENCE_OFFSET, self._seq)
+
+    def _end(self):
+        """Mark the table as consistent again."""
+        self._seq += 1
+        SEQUENCE.pack_into(self._map, SEQUENCE_OFFSET, self._seq)
+
+    def setAreaPreset(self, area, preset):
+        """Publish the active preset of an area."""
+        offset = _areaOffset(area)
+        if preset and not 0 < int(preset) <= 0xFFFF:
+            raise SharedStateError("Preset out of range: %s" % preset)
+        self._begin()
+        PRESET.pack_into(self._map, offset, int(preset) if preset else 0)
+        self._end()
+
+    def setChannelLevel(self, area, channel, level):
+        """Publish the level (0.0-1.0) of a channel."""
+        offset = _channelOffset(area, channel)
+        self._begin()
+        LEVEL.pack_into(self._map, offset, math.nan if level is None else level)
+        self._end()
+
+    def close(self):
+        """Unmap the table."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+class SharedStateReader(object):
+    """Class to read state published by a SharedStateWriter in another process."""
+
+    def __init__(self, path):
+        """Map the table at path read-only."""
+        self.path = path
+        with open(path, "rb") as fp:
+            self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < TABLE_SIZE:
+            self.close()
+            raise SharedStateError("Shared state table %s is truncated" % path)
+        magic, version, channels, _ = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != LAYOUT_VERSION or channels != AREA_CHANNELS:
+            self.close()
+            raise SharedStateError("Unsupported shared state table %s" % path)
+
+    @property
+    def sequence(self):
+        """Return the current sequence number of the writer."""
+        return SEQUENCE.unpack_from(self._map, SEQUENCE_OFFSET)[0]
+
+    def _read(self, unpack, offset):
+        """Read a value, retrying while the writer is mid-update."""
+        for _ in range(READ_RETRIES):
+            before = SEQUENCE.unpack_from(self._map, SEQUENCE_OFFSET)[0]
+            if before & 1:
+                continue
+            value = unpack(self._map, offset)
+            if SEQUENCE.unpack_from(self._map, SEQUENCE_OFFSET)[0] == before:
+                return value
+        raise SharedStateError("Could not get a consistent read of %s" % self.path)
+
+    def getAreaPreset(self, area):
+        """Return the active preset of an area or None if unknown."""
+        preset = self._read(PRESET.unpack_from, _areaOffset(area))[0]
+        return preset if preset else None
+
+    def getChannelLevel(self, area, channel):
+        """Return the level (0.0-1.0) of a channel or None if unknown."""
+        level = self._read(LEVEL.unpack_from, _channelOffset(area, channel))[0]
+        return None if math.isnan(level) else level
+
+    def getAreaLevels(self, area):
+        """Return a dict of channel levels of an area - every channel Dynalite published."""
+        record = self._read(AREA_RECORD.unpack_from, _areaOffset(area))
+        return {
+            channel: level
+            for channel, level in enumerate(record[2:], start=1)
+            if not math.isnan(level)
+        }
+
+    def close(self):
+        """Unmap the table."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
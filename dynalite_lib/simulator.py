@@ -0,0 +1,378 @@
+"""
+@ Author      : Troy Kelly
+@ Date        : 19 Oct 2026
+@ Description : Philips Dynalite Library - Simulated Dynet bus behind a fake RS485-IP gateway
+
+@ Notes:        A local TCP server that behaves like a gateway on a bus with a configurable number
+                of areas, channels and presets. Channel levels fade over time, REQUEST_PRESET and
+                REQUEST_CHANNEL_LEVEL are answered, wall panels select presets at a set rate, and
+                the bus carries one frame at a time at the baud rate with added latency and loss.
+                Frames a client sends are seen by the other clients, as on a real bus.
+
+                Run standalone with: python -m dynalite_lib.simulator --areas 250 --channels 40
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+from collections import deque
+
+from .const import OpcodeType, SyncType, DEFAULT_BAUDRATE
+from .dynet import DynetPacket
+from .serialport import frameTime
+from .eventloop import newEventLoop
+
+DEFAULT_LOG = logging.getLogger(__name__)
+DEFAULT_SIM_PORT = 12345
+DEFAULT_PRESETS = 4
+# seconds a channel takes to fade when a preset is selected without a fade time
+DEFAULT_CHANNEL_FADE = 2.0
+LEVEL_ON = 1  # Dynet levels run from 1 (100%) to 255 (off)
+LEVEL_OFF = 255
+SYNC_VALUES = [item.value for item in SyncType]
+PRESET_OPCODES = [0, 1, 2, 3, 10, 11, 12, 13]
+CHANNEL_OPCODES = [
+    OpcodeType.SET_CHANNEL_1_TO_LEVEL_WITH_FADE.value,
+    OpcodeType.SET_CHANNEL_2_TO_LEVEL_WITH_FADE.value,
+    OpcodeType.SET_CHANNEL_3_TO_LEVEL_WITH_FADE.value,
+    OpcodeType.SET_CHANNEL_4_TO_LEVEL_WITH_FADE.value,
+]
+
+
+def makeFrame(area, command, data, join=255):
+    """Return the 8 bytes of a logical frame."""
+    packet = DynetPacket()
+    packet.toMsg(sync=SyncType.LOGICAL.value, area=area, command=command, data=data, join=join)
+    return bytes(
+        [
+            packet.sync,
+            packet.area,
+            packet.data[0],
+            packet.command,
+            packet.data[1],
+            packet.data[2],
+            packet.join,
+            packet.chk,
+        ]
+    )
+
+
+def presetFrame(area, preset, fade):
+    """Return the frame selecting a preset (from 1) with a fade in seconds."""
+    preset -= 1
+    bank = preset // 8
+    opcode = PRESET_OPCODES[preset % 8]
+    fade = min(int(fade / 0.02), 0xFFFF)
+    return makeFrame(area, opcode, [fade & 0xFF, fade >> 8, bank])
+
+
+class SimulatedChannel(object):
+    """Class for the fading level of one simulated channel."""
+
+    __slots__ = ("start", "target", "started", "duration")
+
+    def __init__(self, level=LEVEL_OFF):
+        """Initialize the channel at a level."""
+        self.start = level
+        self.target = level
+        self.started = 0.0
+        self.duration = 0.0
+
+    def level(self, now):
+        """Return the actual level at a loop time."""
+        if self.duration <= 0 or now >= self.started + self.duration:
+            return self.target
+        done = (now - self.started) / self.duration
+        return int(round(self.start + (self.target - self.start) * done))
+
+    def fadeTo(self, target, duration, now):
+        """Start fading from the actual level to a target."""
+        self.start = self.level(now)
+        self.target = target
+        self.started = now
+        self.duration = duration
+
+    def stop(self, now):
+        """Stop the fade at the actual level."""
+        self.start = self.target = self.level(now)
+        self.duration = 0.0
+
+
+class SimulatedArea(object):
+    """Class for the preset and channels of one simulated area."""
+
+    def __init__(self, value, channels, presets, rng):
+        """Initialize the area with random preset levels."""
+        self.value = value
+        self.preset = presets  # the last preset is off
+        self.channels = [SimulatedChannel() for _ in range(channels)]
+        self.levels = {}
+        for preset in range(1, presets + 1):
+            if preset == 1:
+                self.levels[preset] = [LEVEL_ON] * channels
+            elif preset == presets:
+                self.levels[preset] = [LEVEL_OFF] * channels
+            else:
+                self.levels[preset] = [rng.randint(LEVEL_ON, LEVEL_OFF) for _ in range(channels)]
+
+    def selectPreset(self, preset, fade, now):
+        """Select a preset and fade every channel to its level."""
+        self.preset = preset
+        levels = self.levels.get(preset)
+        if levels is None:
+            return
+        for channel, level in zip(self.channels, levels):
+            channel.fadeTo(level, fade, now)
+
+
+class SimulatorClient(asyncio.Protocol):
+    """Class for the connection of one client to the simulated gateway."""
+
+    def __init__(self, simulator):
+        """Initialize the client."""
+        self._simulator = simulator
+        self.transport = None
+        self._inBuffer = bytearray()
+
+    def connection_made(self, transport):
+        """Register the client."""
+        self.transport = transport
+        self._simulator.clients.append(self)
+
+    def connection_lost(self, exc=None):
+        """Unregister the client."""
+        self.transport = None
+        if self in self._simulator.clients:
+            self._simulator.clients.remove(self)
+
+    def data_received(self, data):
+        """Split client data into frames and put them on the bus."""
+        self._inBuffer.extend(data)
+        while len(self._inBuffer) >= 8:
+            if self._inBuffer[0] not in SYNC_VALUES:
+                del self._inBuffer[0]
+                continue
+            frame = bytes(self._inBuffer[:8])
+            del self._inBuffer[:8]
+            self._simulator.framesFromClients += 1
+            self._simulator.send(frame, source=self)
+
+
+class DynetSimulator(object):
+    """Class for a simulated bus served as a TCP gateway."""
+
+    def __init__(
+        self,
+        areas=10,
+        channels=8,
+        presets=DEFAULT_PRESETS,
+        host="127.0.0.1",
+        port=DEFAULT_SIM_PORT,
+        loop=None,
+        logger=DEFAULT_LOG,
+        baudrate=DEFAULT_BAUDRATE,
+        latency=0.0,
+        loss=0.0,
+        panelRate=0.0,
+        channelFade=DEFAULT_CHANNEL_FADE,
+        seed=None,
+    ):
+        """Initialize the bus - baudrate None sends frames without delay, panelRate is presets per second."""
+        self._loop = loop if loop else asyncio.get_event_loop()
+        self._logger = logger
+        self._random = random.Random(seed)
+        self.host = host
+        self.port = port
+        self.areas = {
+            area: SimulatedArea(area, channels, presets, self._random)
+            for area in range(1, areas + 1)
+        }
+        self._presets = presets
+        self._frameTime = frameTime(baudrate) if baudrate else 0.0
+        self.latency = latency
+        self.loss = loss
+        self.panelRate = panelRate
+        self.channelFade = channelFade
+        self.clients = []
+        self._bus = deque()
+        self._busReady = None
+        self._busTask = None
+        self._panelTimer = None
+        self._server = None
+        self.framesFromClients = 0
+        self.framesOnBus = 0
+        self.framesLost = 0
+        self.answers = 0
+        self.panelPresets = 0
+        self.maxBusQueue = 0
+
+    async def start(self):
+        """Start the bus, the panels and the gateway server."""
+        self._server = await self._loop.create_server(
+            lambda: SimulatorClient(self), self.host, self.port
+        )
+        if not self.port:
+            self.port = self._server.sockets[0].getsockname()[1]
+        self._busReady = asyncio.Event()
+        self._busTask = self._loop.create_task(self._runBus())
+        if self.panelRate:
+            self._schedulePanel()
+
+    async def close(self):
+        """Stop everything and disconnect the clients."""
+        if self._panelTimer is not None:
+            self._panelTimer.cancel()
+            self._panelTimer = None
+        if self._busTask is not None:
+            self._busTask.cancel()
+            self._busTask = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for client in list(self.clients):
+            if client.transport is not None:
+                client.transport.close()
+
+    def send(self, frame, source=None):
+        """Queue a frame for the bus - source is the client that sent it, or None for a device."""
+        self._bus.append((frame, source))
+        self.maxBusQueue = max(self.maxBusQueue, len(self._bus))
+        if self._busReady is not None:
+            self._busReady.set()
+
+    async def _runBus(self):
+        """Carry one frame at a time at the baud rate."""
+        while True:
+            if not self._bus:
+                self._busReady.clear()
+                await self._busReady.wait()
+            frame, source = self._bus.popleft()
+            if self._frameTime:
+                await asyncio.sleep(self._frameTime)
+            if self.loss and self._random.random() < self.loss:
+                self.framesLost += 1
+                continue
+            self.framesOnBus += 1
+            if self.latency:
+                self._loop.call_later(self.latency, self._deliver, frame, source)
+            else:
+                self._deliver(frame, source)
+
+    def _deliver(self, frame, source):
+        """Pass a frame that went over the bus to the other clients and the devices."""
+        for client in self.clients:
+            if client is not source and client.transport is not None:
+                client.transport.write(frame)
+        if source is not None:
+            self._handle(frame)
+
+    def _handle(self, frame):
+        """Act on a frame from a client like the devices on the bus would."""
+        if frame[0] != SyncType.LOGICAL.value:
+            return
+        area = self.areas.get(frame[1])
+        if area is None:
+            return
+        command = frame[3]
+        now = self._loop.time()
+        if command == OpcodeType.REQUEST_PRESET.value:
+            self.answers += 1
+            self.send(makeFrame(area.value, OpcodeType.REPORT_PRESET.value, [area.preset - 1, 0, 0]))
+        elif command == OpcodeType.REQUEST_CHANNEL_LEVEL.value:
+            index = frame[2]
+            if index < len(area.channels):
+                channel = area.channels[index]
+                self.answers += 1
+                self.send(
+                    makeFrame(
+                        area.value,
+                        OpcodeType.REPORT_CHANNEL_LEVEL.value,
+                        [index, channel.target, channel.level(now)],
+                    )
+                )
+        elif command in PRESET_OPCODES:
+            preset = PRESET_OPCODES.index(command) + frame[5] * 8 + 1
+            fade = (frame[2] + frame[4] * 256) * 0.02
+            area.selectPreset(preset, fade, now)
+        elif command == OpcodeType.LINEAR_PRESET.value:
+            area.selectPreset(frame[2] + 1, (frame[4] + frame[5] * 256) * 0.02, now)
+        elif command in CHANNEL_OPCODES:
+            bank = frame[4]
+            index = ((bank + 1) % 256) * 4 + CHANNEL_OPCODES.index(command)
+            if index < len(area.channels):
+                area.channels[index].fadeTo(frame[2], frame[5] * 0.02, now)
+        elif command == OpcodeType.STOP_FADING.value:
+            if frame[2] == 0xFF:
+                for channel in area.channels:
+                    channel.stop(now)
+            elif frame[2] < len(area.channels):
+                area.channels[frame[2]].stop(now)
+
+    def _schedulePanel(self):
+        """Press a panel button after a random (Poisson) interval."""
+        self._panelTimer = self._loop.call_later(
+            self._random.expovariate(self.panelRate), self._panelPress
+        )
+
+    def _panelPress(self):
+        """Select a random preset of a random area, as a wall panel would."""
+        area = self.areas[self._random.randint(1, len(self.areas))]
+        preset = self._random.randint(1, self._presets)
+        area.selectPreset(preset, self.channelFade, self._loop.time())
+        self.panelPresets += 1
+        self.send(presetFrame(area.value, preset, self.channelFade))
+        self._schedulePanel()
+
+    def stats(self):
+        """Return the bus counters."""
+        return {
+            "clients": len(self.clients),
+            "frames_from_clients": self.framesFromClients,
+            "frames_on_bus": self.framesOnBus,
+            "frames_lost": self.framesLost,
+            "answers": self.answers,
+            "panel_presets": self.panelPresets,
+            "bus_queue": len(self._bus),
+            "max_bus_queue": self.maxBusQueue,
+        }
+
+
+def main():
+    """Run a simulator from the command line."""
+    parser = argparse.ArgumentParser(description="Simulate a Dynet bus behind a gateway")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_SIM_PORT)
+    parser.add_argument("--areas", type=int, default=10)
+    parser.add_argument("--channels", type=int, default=8)
+    parser.add_argument("--presets", type=int, default=DEFAULT_PRESETS)
+    parser.add_argument("--baud", type=int, default=DEFAULT_BAUDRATE, help="0 for no bus delay")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--loss", type=float, default=0.0, help="probability a frame is lost")
+    parser.add_argument("--panel-rate", type=float, default=0.0, help="panel presses per second")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--uvloop", action="store_true", help="run on uvloop when installed")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    loop = newEventLoop(args.uvloop)
+    asyncio.set_event_loop(loop)
+    simulator = DynetSimulator(
+        areas=args.areas,
+        channels=args.channels,
+        presets=args.presets,
+        host=args.host,
+        port=args.port,
+        loop=loop,
+        baudrate=args.baud,
+        latency=args.latency,
+        loss=args.loss,
+        panelRate=args.panel_rate,
+        seed=args.seed,
+    )
+    loop.run_until_complete(simulator.start())
+    loop.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+@ Author      : Troy Kelly
+@ Date        : 19 Oct 2026
+@ Description : Philips Dynalite Library - Async iterator over Dynalite events
+
+@ Notes:        Each stream has its own bounded buffer so a slow consumer only costs memory up to
+                maxsize and never piles up tasks. What happens when the buffer is full is chosen
+                per stream: drop the oldest event, coalesce events of the same area/channel so the
+                latest level of every entity survives, or block the gateway reader until drained.
+                When coalescing, every entity has one slot and maxsize only bounds the events of no
+                entity. When blocking, the buffer filling up pauses the reader: Dynet stops
+                handling the bytes it buffered and Dynalite holds the events of work already under
+                way, passing them on in order when the stream is drained. The buffer never grows
+                past maxsize - an event delivered to a full stream some other way is dropped and
+                counted.
+"""
+
+from collections import OrderedDict, deque
+
+from .const import (
+    CONF_AREA,
+    CONF_CHANNEL,
+    OVERFLOW_DROP_OLDEST,
+    OVERFLOW_COALESCE,
+    OVERFLOW_BLOCK,
+)
+
+DEFAULT_STREAM_SIZE = 100
+
+
+class StreamError(Exception):
+    """Class for event stream errors."""
+
+    def __init__(self, message):
+        """Initialize the error."""
+        self.message = message
+
+
+class EventStream(object):
+    """Class to consume Dynalite events with async for."""
+
+    def __init__(
+        self,
+        loop,
+        predicate=None,
+        maxsize=DEFAULT_STREAM_SIZE,
+        overflow=OVERFLOW_DROP_OLDEST,
+        onClose=None,
+        pauseFunction=None,
+        resumeFunction=None,
+    ):
+        """Initialize the stream."""
+        if overflow not in [OVERFLOW_DROP_OLDEST, OVERFLOW_COALESCE, OVERFLOW_BLOCK]:
+            raise StreamError("Unknown overflow policy %s" % overflow)
+        if maxsize < 1:
+            raise StreamError("Stream size must be at least 1")
+        self._loop = loop
+        self._predicate = predicate
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self._onClose = onClose
+        self._pauseFunction = pauseFunction
+        self._resumeFunction = resumeFunction
+        self._pending = OrderedDict()
+        self._unkeyed = deque()  # keys of the pending events of no entity when coalescing, oldest first
+        self._serial = 0
+        self._waiter = None
+        self._paused = False
+        self.closed = False
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.blocked = 0
+
+    def __len__(self):
+        """Return the number of events waiting to be consumed."""
+        return len(self._pending)
+
+    def stats(self):
+        """Return the counters of the stream."""
+        return {
+            "pending": len(self._pending),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "blocked": self.blocked,
+        }
+
+    def _key(self, event):
+        """Return the buffer key of an event - same entity shares a key when coalescing."""
+        if self.overflow == OVERFLOW_COALESCE:
+            if CONF_AREA in event:
+                return (event.eventType, event.get(CONF_AREA), event.get(CONF_CHANNEL))
+        self._serial += 1
+        return self._serial
+
+    def deliver(self, event, dynalite=None):
+        """Add an event to the stream."""
+        if self.closed:
+            return
+        if self._predicate is not None and not self._predicate(event):
+            return
+        key = self._key(event)
+        if key in self._pending:
+            self._pending[key] = event
+            self.coalesced += 1
+        elif self.overflow == OVERFLOW_COALESCE:
+            if isinstance(key, int):  # no entity to coalesce on
+                if len(self._unkeyed) >= self.maxsize:
+                    del self._pending[self._unkeyed.popleft()]
+                    self.dropped += 1
+                self._unkeyed.append(key)
+            self._pending[key] = event
+        elif self.overflow == OVERFLOW_BLOCK:
+            if len(self._pending) >= self.maxsize:
+                self.dropped += 1  # not held back by the paused producer
+                return
+            self._pending[key] = event
+            if len(self._pending) >= self.maxsize and not self._paused:
+                self._paused = True
+                self.blocked += 1
+                if self._pauseFunction:
+                    self._pauseFunction()
+        else:
+            if len(self._pending) >= self.maxsize:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+            self._pending[key] = event
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def __aiter__(self):
+        """Return the iterator."""
+        return self
+
+    async def __anext__(self):
+        """Return the next event, waiting for one if needed."""
+        while not self._pending:
+            if self.closed:
+                raise StopAsyncIteration
+            self._waiter = self._loop.create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        key, event = self._pending.popitem(last=False)
+        if self._unkeyed and self._unkeyed[0] == key:
+            self._unkeyed.popleft()
+        self.delivered += 1
+        if self._paused and len(self._pending) <= self.maxsize // 2:
+            self._paused = False
+            if self._resumeFunction:
+                self._resumeFunction()
+        return event
+
+    def close(self):
+        """Stop receiving events - events already buffered can still be consumed."""
+        if self.closed:
+            return
+        self.closed = True
+        if self._paused:
+            self._paused = False
+            if self._resumeFunction:
+                self._resumeFunction()
+        if self._onClose:
+            self._onClose(self)
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def __aenter__(self):
+        """Enter an async with block."""
+        return self
+
+    async def __aexit__(self, excType, exc, tb):
+        """Close the stream when leaving an async with block."""
+        self.close()
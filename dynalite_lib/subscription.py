@@ -0,0 +1,84 @@
+"""
+@ Author      : Troy Kelly
+@ Date        : 19 Oct 2026
+@ Description : Philips Dynalite Library - Index of event subscriptions
+
+@ Notes:        Subscriptions are keyed by (event type, area, channel) where "*" for the event type
+                and None for area or channel match anything, so dispatching an event only looks at
+                the few buckets it can match instead of asking every listener.
+"""
+
+from .const import CONF_AREA, CONF_CHANNEL
+
+WILDCARD = "*"
+
+
+def subscriptionKey(eventType, area=None, channel=None):
+    """Return the normalized index key of a subscription."""
+    eventType = eventType.upper()
+    if area == WILDCARD:
+        area = None
+    if channel == WILDCARD:
+        channel = None
+    return (eventType, area, channel)
+
+
+class SubscriptionIndex(object):
+    """Class to find the subscribers interested in an event."""
+
+    def __init__(self):
+        """Initialize the index."""
+        self._index = {}
+        self._typeCount = {}
+
+    def add(self, subscriber, eventType, area=None, channel=None):
+        """Subscribe to an event type, optionally limited to an area and channel."""
+        key = subscriptionKey(eventType, area, channel)
+        bucket = self._index.setdefault(key, [])
+        if subscriber in bucket:
+            return
+        bucket.append(subscriber)
+        self._typeCount[key[0]] = self._typeCount.get(key[0], 0) + 1
+
+    def remove(self, subscriber, eventType, area=None, channel=None):
+        """Remove a subscription."""
+        key = subscriptionKey(eventType, area, channel)
+        bucket = self._index.get(key)
+        if not bucket or subscriber not in bucket:
+            return
+        bucket.remove(subscriber)
+        if not bucket:
+            del self._index[key]
+        self._typeCount[key[0]] -= 1
+        if not self._typeCount[key[0]]:
+            del self._typeCount[key[0]]
+
+    def wants(self, eventType):
+        """Return whether anyone subscribed to an event type."""
+        return eventType in self._typeCount or WILDCARD in self._typeCount
+
+    def match(self, event):
+        """Return the subscribers of an event, each once, in bucket order."""
+        if not self.wants(event.eventType):
+            return []
+        area = event.get(CONF_AREA)
+        channel = event.get(CONF_CHANNEL)
+        if area is None:
+            keys = ((None, None),)
+        elif channel is None:
+            keys = ((None, None), (area, None))
+        else:
+            keys = ((None, None), (area, None), (area, channel))
+        found = None
+        for eventType in (event.eventType, WILDCARD):
+            for areaKey, channelKey in keys:
+                bucket = self._index.get((eventType, areaKey, channelKey))
+                if not bucket:
+                    continue
+                if found is None:
+                    found = list(bucket)
+                else:
+                    for subscriber in bucket:
+                        if subscriber not in found:
+                            found.append(subscriber)
+        return found if found is not None else []
@@ -0,0 +1,102 @@
+"""
+@ Author      : Troy Kelly
+@ Date        : 19 Oct 2026
+@ Description : Philips Dynalite Library - Accounting and an optional cap for library-spawned tasks
+
+@ Notes:        Every task the library starts goes through a TaskTracker, which counts those in
+                flight. Connection handling is started at once with track(). Other work is
+                started with spawn() and, with a limit, work beyond it is not turned into a task:
+                it waits in a ring and starts as running tasks finish, in order. Work spawned with
+                a key replaces waiting work with the same key, e.g. repeated write triggers. When
+                the ring is full the oldest waiting work is dropped - so nothing that must not be
+                lost goes in the ring: Dynet buffers received bytes and queued packets at once and
+                only spawns the keyed passes over them, and commands are started with track().
+"""
+
+import logging
+from collections import OrderedDict
+
+DEFAULT_TASK_QUEUE = 10000
+DEFAULT_LOG = logging.getLogger(__name__)
+
+
+class TaskTracker(object):
+    """Class to start tasks, count them while they run and hold back work above a limit."""
+
+    def __init__(self, loop, limit=None, queueSize=DEFAULT_TASK_QUEUE, logger=DEFAULT_LOG):
+        """Initialize the tracker - a limit of None starts every task at once."""
+        self._loop = loop
+        self.limit = limit
+        self.queueSize = queueSize
+        self._logger = logger
+        self._waiting = OrderedDict()  # key or unique token: coroutine
+        self._token = 0
+        self.inFlight = 0
+        self.peak = 0
+        self.started = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def spawn(self, coro, key=None):
+        """Start a coroutine as a task, or hold it back - return the task, or None if held back."""
+        if self.limit is None or self.inFlight < self.limit:
+            return self._start(coro)
+        if key is not None and key in self._waiting:
+            self._waiting[key].close()
+            self._waiting[key] = coro  # the latest work replaces the waiting one in its place
+            self.coalesced += 1
+            return None
+        if len(self._waiting) >= self.queueSize:
+            _, oldest = self._waiting.popitem(last=False)
+            oldest.close()
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                self._logger.warning("Task queue full - %d queued tasks dropped", self.dropped)
+        if key is None:
+            self._token += 1
+            key = (TaskTracker, self._token)
+        self._waiting[key] = coro
+        return None
+
+    def track(self, coro):
+        """Start a coroutine as a task at once, counting it but never holding it back."""
+        return self._start(coro)
+
+    def _start(self, coro):
+        """Start a task and count it until it is done."""
+        task = self._loop.create_task(coro)
+        self.inFlight += 1
+        self.started += 1
+        if self.inFlight > self.peak:
+            self.peak = self.inFlight
+        task.add_done_callback(self._done)
+        return task
+
+    def _done(self, task):
+        """Count a finished task and start waiting work in its place."""
+        self.inFlight -= 1
+        while self._waiting and (self.limit is None or self.inFlight < self.limit):
+            _, coro = self._waiting.popitem(last=False)
+            self._start(coro)
+
+    def queued(self):
+        """Return the number of coroutines waiting for a free slot."""
+        return len(self._waiting)
+
+    def close(self):
+        """Drop all waiting work."""
+        for coro in self._waiting.values():
+            coro.close()
+        self._waiting.clear()
+
+    def stats(self):
+        """Return the task counters."""
+        return {
+            "in_flight": self.inFlight,
+            "peak": self.peak,
+            "started": self.started,
+            "queued": len(self._waiting),
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "limit": self.limit,
+        }
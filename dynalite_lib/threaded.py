@@ -0,0 +1,292 @@
+"""
+@ Author      : Troy Kelly
+@ Date        : 19 Oct 2026
+@ Description : Philips Dynalite Library - Dynalite on its own event loop thread for threaded code
+
+@ Notes:        ThreadedDynalite runs Dynalite on an event loop in a background thread. Any thread
+                can post work to it: posted calls go into a deque and only the call that finds
+                no wakeup pending pays for call_soon_threadsafe, so a burst of commands costs one
+                wakeup of the loop. Commands use the task-free DynetControl methods.
+                State reads never touch the loop: every loop iteration with state changes publishes
+                a new snapshot dict, which is swapped in whole and never changed after that.
+"""
+
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import CancelledError, Future
+
+from .const import (
+    CONF_AREA,
+    CONF_CHANNEL,
+    CONF_PRESET,
+    CONF_UVLOOP,
+    EVENT_CONFIGURED,
+    LISTENER_INLINE,
+    LISTENER_THREAD,
+)
+from .changefeed import CONF_SEQUENCE
+from .dynalite import Dynalite
+from .eventloop import newEventLoop
+
+DEFAULT_START_TIMEOUT = 10
+DEFAULT_STOP_TIMEOUT = 5
+DEFAULT_LOG = logging.getLogger(__name__)
+
+
+class ThreadedDynaliteError(Exception):
+    """Class for errors of the background loop thread."""
+
+    def __init__(self, message):
+        """Initialize the error."""
+        self.message = message
+
+
+class ThreadedDynalite(object):
+    """Class to run Dynalite on a background loop thread and use it from any thread."""
+
+    def __init__(self, config=None, logger=DEFAULT_LOG, loopFactory=None):
+        """Initialize the client - the loop is made by loopFactory, by default uvloop if configured."""
+        self._config = config
+        self._logger = logger
+        self._loopFactory = loopFactory
+        self.loop = None
+        self.dynalite = None
+        self._thread = None
+        self._running = False
+        self._configured = threading.Event()
+        self._calls = deque()  # (function, args, kwargs, future or None) posted by other threads
+        self._wakeupPending = False
+        self._dirtyAreas = set()
+        self._publishPending = False
+        self._snapshot = {CONF_SEQUENCE: 0, CONF_AREA: {}}
+        self.posted = 0
+        self.wakeups = 0
+
+    def start(self, timeout=DEFAULT_START_TIMEOUT):
+        """Start the loop thread and Dynalite, and wait until the configured areas are known."""
+        if self._thread is not None:
+            raise ThreadedDynaliteError("The loop thread is already started")
+        ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(ready,), name="dynalite-loop", daemon=True
+        )
+        self._thread.start()
+        ready.wait()
+        if self.dynalite is None:
+            self._thread.join()
+            self._thread = None
+            raise ThreadedDynaliteError("Dynalite could not be created on the loop thread")
+        if not self._configured.wait(timeout):
+            self.stop()  # a start that failed leaves no loop thread behind
+            raise ThreadedDynaliteError("Dynalite was not configured in %s seconds" % timeout)
+
+    def _run(self, ready):
+        """Run the loop until stopped - runs on the loop thread."""
+        try:
+            if self._loopFactory is not None:
+                self.loop = self._loopFactory()
+            else:
+                self.loop = newEventLoop(
+                    self._config[CONF_UVLOOP] if CONF_UVLOOP in self._config else False,
+                    logger=self._logger,
+                )
+            asyncio.set_event_loop(self.loop)
+            self.dynalite = Dynalite(config=self._config, loop=self.loop, logger=self._logger)
+        except Exception:
+            self._logger.exception("Unable to create Dynalite on the loop thread")
+            if self.loop is not None:
+                self.loop.close()
+            ready.set()
+            return
+        self.dynalite.addStateListener(self._stateChanged)
+        self.dynalite.addListener(
+            listenerFunction=self._onConfigured, mode=LISTENER_INLINE
+        ).monitorEvent(EVENT_CONFIGURED)
+        self.dynalite.start()
+        self._running = True
+        ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self._running = False
+            while self._calls:  # posted while the loop was stopping
+                future = self._calls.popleft()[3]
+                if future is not None and future.set_running_or_notify_cancel():
+                    future.set_exception(ThreadedDynaliteError("The loop thread stopped"))
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    def stop(self, timeout=DEFAULT_STOP_TIMEOUT):
+        """Close Dynalite, stop the loop and wait for its thread to end."""
+        if not self._running:
+            return
+        self.post(self._stop)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _stop(self):
+        """Close Dynalite and stop the loop - runs on the loop thread."""
+        self._running = False
+        self.dynalite.close()
+        self.loop.call_soon(self.loop.stop)  # after the transports report the connections lost
+
+    def post(self, function, *args, **kwargs):
+        """Call a function on the loop thread without waiting for it."""
+        self._enqueue(function, args, kwargs, None)
+
+    def submit(self, function, *args, **kwargs):
+        """Call a function on the loop thread and return a Future of its result.
+
+        A coroutine returned by the function is run and its result is the result of the Future.
+        """
+        future = Future()
+        self._enqueue(function, args, kwargs, future)
+        return future
+
+    def call(self, function, *args, timeout=None, **kwargs):
+        """Call a function on the loop thread and wait for its result."""
+        return self.submit(function, *args, **kwargs).result(timeout)
+
+    def _enqueue(self, function, args, kwargs, future):
+        """Queue a call, waking the loop only if no wakeup is pending."""
+        if not self._running:
+            raise ThreadedDynaliteError("The loop thread is not running")
+        self._calls.append((function, args, kwargs, future))
+        self.posted += 1
+        if not self._wakeupPending:
+            self._wakeupPending = True
+            self.wakeups += 1
+            self.loop.call_soon_threadsafe(self._runCalls)
+
+    def _runCalls(self):
+        """Run the queued calls, in order - runs on the loop thread."""
+        self._wakeupPending = False  # calls queued from here on are run by a new wakeup
+        calls = self._calls
+        for _ in range(len(calls)):  # not calls queued meanwhile, so a busy poster can't starve the loop
+            function, args, kwargs, future = calls.popleft()
+            if future is not None and not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = function(*args, **kwargs)
+            except Exception as exc:
+                if future is None:
+                    self._logger.exception("Error in %s posted to the loop thread", function)
+                else:
+                    future.set_exception(exc)
+                continue
+            if future is None:
+                if asyncio.iscoroutine(result):
+                    self.dynalite.tasks.track(result)
+            elif asyncio.iscoroutine(result):
+                self.dynalite.tasks.track(result).add_done_callback(
+                    lambda task, future=future: self._taskDone(task, future)
+                )
+            else:
+                future.set_result(result)
+
+    @staticmethod
+    def _taskDone(task, future):
+        """Pass the result of a coroutine to the Future of its call."""
+        if task.cancelled():
+            future.set_exception(CancelledError())
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    def _command(self, name, *args):
+        """Send a Dynet command with the task-free control method - runs on the loop thread."""
+        if self.dynalite.control is None:
+            self._logger.warning("Dynalite is not started - dropping %s%s", name, args)
+            return
+        getattr(self.dynalite.control, name)(*args)
+
+    def areaPreset(self, area, preset, fade=2):
+        """Select a preset in an area."""
+        self.post(self._command, "areaPresetNow", area, preset, fade)
+
+    def setChannel(self, area, channel, level, fade=2):
+        """Set the level (0.0-1.0) of a channel."""
+        self.post(self._command, "setChannelNow", area, channel, level, fade)
+
+    def areaOff(self, area, fade=2):
+        """Turn an area off."""
+        self.post(self._command, "areaOffNow", area, fade)
+
+    def stopChannelFade(self, area, channel):
+        """Stop the fade of a channel."""
+        self.post(self._command, "stopChannelFadeNow", area, channel)
+
+    def requestAreaPreset(self, area):
+        """Ask an area for its active preset."""
+        self.post(self._command, "requestAreaPresetNow", area)
+
+    def requestChannelLevel(self, area, channel):
+        """Ask a channel for its level."""
+        self.post(self._command, "requestChannelLevelNow", area, channel)
+
+    def addListener(self, listenerFunction, mode=LISTENER_THREAD, **kwargs):
+        """Add a listener and return its Broadcaster - by default it is called on a pool thread."""
+        return self.call(
+            self.dynalite.addListener, listenerFunction=listenerFunction, mode=mode, **kwargs
+        )
+
+    def _onConfigured(self, event=None, dynalite=None):
+        """Publish the configured areas and release start() - runs on the loop thread."""
+        self._dirtyAreas.update(self.dynalite.devices[CONF_AREA])
+        self._publish()
+        self._configured.set()
+
+    def _stateChanged(self, area, channel=None):
+        """Mark an area changed and publish once at the end of the loop iteration."""
+        self._dirtyAreas.add(area.value)
+        if not self._publishPending:
+            self._publishPending = True
+            self.loop.call_soon(self._publish)
+
+    def _publish(self):
+        """Swap in a new snapshot with the changed areas - runs on the loop thread."""
+        self._publishPending = False
+        areas = dict(self._snapshot[CONF_AREA])
+        for areaValue in self._dirtyAreas:
+            areas[areaValue] = {
+                CONF_PRESET: self.dynalite.getAreaPreset(areaValue),
+                CONF_CHANNEL: self.dynalite.getAreaLevels(areaValue),
+            }
+        self._dirtyAreas.clear()
+        self._snapshot = {CONF_SEQUENCE: self.dynalite.sequence, CONF_AREA: areas}
+
+    def snapshot(self):
+        """Return the latest published state - the dict must not be changed."""
+        return self._snapshot
+
+    @property
+    def sequence(self):
+        """Return the sequence number of the latest published state."""
+        return self._snapshot[CONF_SEQUENCE]
+
+    def getAreaPreset(self, area):
+        """Return the active preset of an area or None if unknown."""
+        areaState = self._snapshot[CONF_AREA].get(area)
+        return areaState[CONF_PRESET] if areaState is not None else None
+
+    def getChannelLevel(self, area, channel):
+        """Return the level (0.0-1.0) of a channel or None if unknown."""
+        areaState = self._snapshot[CONF_AREA].get(area)
+        return areaState[CONF_CHANNEL].get(channel) if areaState is not None else None
+
+    def getAreaLevels(self, area):
+        """Return a dict of channel levels of an area."""
+        areaState = self._snapshot[CONF_AREA].get(area)
+        return dict(areaState[CONF_CHANNEL]) if areaState is not None else {}
+
+    def stats(self):
+        """Return the counters of calls posted from other threads - approximate while threads post."""
+        return {"posted": self.posted, "wakeups": self.wakeups, "queued": len(self._calls)}
@@ -0,0 +1,82 @@
+"""
+@ Author      : Troy Kelly
+@ Date        : 19 Oct 2026
+@ Description : Philips Dynalite Library - Sampled and rate limited frame tracing
+
+@ Notes:        Frame traces go to their own logger, dynalite_lib.frames, so they can be turned on
+                without the rest of the debug logging. Dynet asks begin() once per received
+                frame: it checks the level, takes one frame in every sampleRate and at most
+                rateLimit frames a second. Sent frames are already paced, so they are traced
+                whenever enabled() and never count towards the sampling of received ones.
+                Messages are passed to the logger with their arguments, so nothing is formatted
+                for a frame that is not traced.
+"""
+
+import logging
+import time
+
+TRACE_LOGGER = "dynalite_lib.frames"
+DEFAULT_TRACE_SAMPLE = 1
+
+
+class FrameTracer(object):
+    """Class to decide which frames are traced and log them."""
+
+    def __init__(self, logger=None, sampleRate=DEFAULT_TRACE_SAMPLE, rateLimit=None):
+        """Initialize the tracer - rateLimit is the most frames traced a second, None for no limit."""
+        self.logger = logger if logger else logging.getLogger(TRACE_LOGGER)
+        self.sampleRate = max(int(sampleRate), 1)
+        self.rateLimit = rateLimit
+        self._tick = 0
+        self._window = None  # second the rate limit is counting
+        self._inWindow = 0
+        self.suppressed = 0  # sampled frames not traced because of the rate limit
+
+    def enabled(self):
+        """Return whether traces are logged at all - for frames that are not sampled."""
+        return self.logger.isEnabledFor(logging.DEBUG)
+
+    def begin(self):
+        """Return whether the frame being handled should be traced."""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return False
+        if self.sampleRate > 1:
+            self._tick += 1
+            if self._tick < self.sampleRate:
+                return False
+            self._tick = 0
+        if self.rateLimit is not None:
+            window = int(time.monotonic())
+            if window != self._window:
+                if self.suppressed:
+                    self.logger.debug(
+                        "%d frame traces suppressed by the limit of %s a second",
+                        self.suppressed,
+                        self.rateLimit,
+                    )
+                    self.suppressed = 0
+                self._window = window
+                self._inWindow = 0
+            if self._inWindow >= self.rateLimit:
+                self.suppressed += 1
+                return False
+            self._inWindow += 1
+        return True
+
+    def trace(self, message, *args):
+        """Log a trace of the frame - call only when begin() returned True."""
+        self.logger.debug(message, *args)
+
+
+class HexFrame(object):
+    """Class to render frame bytes as hex only when a log record is formatted."""
+
+    __slots__ = ("frame",)
+
+    def __init__(self, frame):
+        """Initialize with the bytes."""
+        self.frame = frame
+
+    def __str__(self):
+        """Return the bytes as colon separated hex."""
+        return ":".join("{:02x}".format(c) for c in self.frame)
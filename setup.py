@@ -146,7 +146,7 @@ setup(
     #
     #   py_modules=["my_module"],
     #
-    packages=find_packages(exclude=['contrib', 'docs', 'tests']),  # Required
+    packages=find_packages(exclude=['contrib', 'docs', 'tests', 'benchmarks']),  # Required
 
     # This field lists other packages that your project depends on to run.
     # Any package you put here will be installed by pip when your project is
@@ -156,6 +156,13 @@ setup(
     # https://packaging.python.org/en/latest/requirements.html
     #install_requires=['peppercorn'],  # Optional
 
+    # Faster JSON encoding for dynalite_lib.serialize, used when installed.
+    extras_require={
+        'fastjson': ['orjson'],
+        # Faster event loop, used with the uvloop config option or eventloop.newEventLoop.
+        'uvloop': ['uvloop'],
+    },
+
     # List additional groups of dependencies here (e.g. development
     # dependencies). Users will be able to install these using the "extras"
     # syntax, for example:
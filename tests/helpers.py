@@ -0,0 +1,20 @@
+import asyncio
+import time
+
+
+async def wait_for(condition, timeout=2):
+    """Wait on the event loop until condition() is true."""
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met")
+
+
+def wait_for_thread(condition, timeout=2):
+    """Block the calling thread until condition() is true."""
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        time.sleep(0.01)
+    raise AssertionError("condition not met")
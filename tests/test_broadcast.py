@@ -0,0 +1,111 @@
+import pytest
+import asyncio
+import threading
+import time
+from unittest.mock import Mock
+
+from dynalite_lib.dynalite import Dynalite, Broadcaster, BroadcasterError
+from dynalite_lib.event import DynetEvent
+from dynalite_lib.subscription import SubscriptionIndex
+
+
+def channel_event(area, channel):
+    return DynetEvent(eventType="CHANNEL", data={"area": area, "channel": channel})
+
+
+def test_subscription_index_match():
+    index = SubscriptionIndex()
+    all_events, channels, area_1, chan_1_2 = Mock(), Mock(), Mock(), Mock()
+    index.add(all_events, "*")
+    index.add(channels, "channel")
+    index.add(area_1, "CHANNEL", 1)
+    index.add(chan_1_2, "CHANNEL", 1, 2)
+    assert index.match(channel_event(1, 2)) == [channels, area_1, chan_1_2, all_events]
+    assert index.match(channel_event(1, 3)) == [channels, area_1, all_events]
+    assert index.match(channel_event(2, 2)) == [channels, all_events]
+    assert index.match(DynetEvent(eventType="CONNECTED", data={})) == [all_events]
+    index.remove(all_events, "*")
+    assert not index.wants("PRESET")
+    assert index.match(DynetEvent(eventType="PRESET", data={"area": 1})) == []
+    assert index.wants("CHANNEL")
+
+
+def test_broadcaster_modes():
+    with pytest.raises(BroadcasterError):
+        Broadcaster(listenerFunction=Mock(), mode="bogus")
+    with pytest.raises(BroadcasterError):
+        Broadcaster(listenerFunction=Mock(), mode="task")
+    with pytest.raises(BroadcasterError):
+        Broadcaster(listenerFunction=Mock()).monitorEvent("CHANNEL", channel=3)
+    listener = Mock()
+    broadcaster = Broadcaster(listenerFunction=listener)
+    broadcaster.monitorEvent("CHANNEL", 1, 2)
+    broadcaster.update(channel_event(1, 3))
+    listener.assert_not_called()
+    event = channel_event(1, 2)
+    broadcaster.update(event)
+    listener.assert_called_once_with(event=event, dynalite=None)
+
+
+@pytest.mark.asyncio
+async def test_dynalite_dispatch_inline():
+    dynalite = Dynalite(config={}, loop=Mock())
+    wanted, other, failing = Mock(), Mock(), Mock(side_effect=ValueError("Boom!"))
+    dynalite.addListener(listenerFunction=failing).monitorEvent("CHANNEL")
+    dynalite.addListener(listenerFunction=wanted).monitorEvent("CHANNEL", 1, 2)
+    other_broadcaster = dynalite.addListener(listenerFunction=other)
+    other_broadcaster.monitorEvent("CHANNEL", 4)
+    event = channel_event(1, 2)
+    await dynalite._broadcast(event)
+    failing.assert_called_once()
+    wanted.assert_called_once_with(event=event, dynalite=dynalite)
+    other.assert_not_called()
+    dynalite.removeListener(other_broadcaster)
+    assert other_broadcaster not in dynalite._subscriptions.match(channel_event(4, 1))
+
+
+@pytest.mark.asyncio
+async def test_dynalite_dispatch_task():
+    loop = Mock()
+    dynalite = Dynalite(config={}, loop=loop)
+    listener = Mock()
+    dynalite.addListener(listenerFunction=listener, mode="task").monitorEvent("*")
+    await dynalite._broadcast(channel_event(1, 2))
+    listener.assert_not_called()
+    loop.create_task.assert_called_once()
+    loop.create_task.mock_calls[0][1][0].close()
+
+
+@pytest.mark.asyncio
+async def test_dynalite_dispatch_thread():
+    dynalite = Dynalite(config={"slow_listener": 0.01}, loop=asyncio.get_event_loop())
+    seen = []
+    threads = set()
+    done = asyncio.Event()
+
+    def listener(event=None, dynalite=None):
+        threads.add(threading.current_thread().name)
+        if not seen:
+            time.sleep(0.05)  # slow first call, later events queue up behind it
+        seen.append(event.get("channel"))
+        if len(seen) == 3:
+            dynalite.loop.call_soon_threadsafe(done.set)
+
+    broadcaster = dynalite.addListener(listenerFunction=listener, mode="thread", maxPending=2)
+    broadcaster.monitorEvent("CHANNEL")
+    for channel in range(1, 5):
+        await dynalite._broadcast(channel_event(1, channel))
+    await asyncio.wait_for(done.wait(), 2)
+    assert seen == [1, 3, 4]  # in order, channel 2 dropped as the oldest pending
+    assert all(name.startswith("dynalite-listener") for name in threads)
+    stats = dynalite.listenerStats()[0]
+    assert stats["mode"] == "thread"
+    assert stats["calls"] == 3
+    assert stats["dropped"] == 1
+    assert stats["slow_calls"] == 1
+    assert stats["max_time"] >= 0.05
+
+
+def test_thread_listener_needs_executor():
+    with pytest.raises(BroadcasterError):
+        Broadcaster(listenerFunction=Mock(), loop=Mock(), mode="thread")
@@ -0,0 +1,92 @@
+import pytest
+import asyncio
+import os
+from unittest.mock import Mock
+
+from dynalite_lib.capture import (
+    CaptureError,
+    CaptureRecorder,
+    CaptureReplayer,
+    DIRECTION_IN,
+    DIRECTION_OUT,
+    readCapture,
+)
+from dynalite_lib.dynalite import Dynalite
+from dynalite_lib.dynet import Dynet
+from dynalite_lib.simulator import makeFrame
+
+
+
+def test_record_and_read(tmp_path):
+    path = str(tmp_path / "bus.cap")
+    recorder = CaptureRecorder(path)
+    recorder.record(makeFrame(1, 0, [0, 0, 0]), DIRECTION_IN, timestamp=100.0)
+    recorder.record(makeFrame(2, 1, [0, 0, 0]), DIRECTION_OUT, timestamp=100.5)
+    recorder.close()
+    assert list(readCapture(path)) == [
+        (100.0, DIRECTION_IN, makeFrame(1, 0, [0, 0, 0])),
+        (100.5, DIRECTION_OUT, makeFrame(2, 1, [0, 0, 0])),
+    ]
+    with open(path, "ab") as captureFile:
+        captureFile.write(b"\x00" * 5)  # torn record from a crash
+    assert len(list(readCapture(path))) == 2
+    with open(path + ".bad", "wb") as captureFile:
+        captureFile.write(b"nonsense")
+    with pytest.raises(CaptureError):
+        list(readCapture(path + ".bad"))
+    with open(path, "rb") as captureFile:
+        data = bytearray(captureFile.read())
+    data[4] = 2  # a later version of the format
+    with open(path + ".v2", "wb") as captureFile:
+        captureFile.write(data)
+    with pytest.raises(CaptureError):
+        list(readCapture(path + ".v2"))
+
+
+def test_dynalite_close_flushes_the_capture(tmp_path):
+    path = str(tmp_path / "bus.cap")
+    dynalite = Dynalite(config={"capture": path}, loop=Mock())
+    dynalite.recorder.record(makeFrame(1, 0, [0, 0, 0]), DIRECTION_IN, timestamp=100.0)
+    dynalite.close()
+    assert dynalite.recorder._file is None
+    assert list(readCapture(path)) == [(100.0, DIRECTION_IN, makeFrame(1, 0, [0, 0, 0]))]
+
+
+def test_rotation(tmp_path):
+    path = str(tmp_path / "bus.cap")
+    recorder = CaptureRecorder(path, maxBytes=8 + 17 * 4, backupCount=2)
+    for area in range(10):
+        recorder.record(makeFrame(area, 0, [0, 0, 0]), timestamp=float(area))
+    recorder.close()
+    assert recorder.rotations == 2
+    assert not os.path.exists(path + ".3")
+    assert [record[0] for record in readCapture(path + ".2")] == [0.0, 1.0, 2.0, 3.0]
+    assert [record[0] for record in readCapture(path + ".1")] == [4.0, 5.0, 6.0, 7.0]
+    assert [record[0] for record in readCapture(path)] == [8.0, 9.0]
+
+
+@pytest.mark.asyncio
+async def test_dynet_records_and_replays(tmp_path):
+    loop = asyncio.get_event_loop()
+    path = str(tmp_path / "bus.cap")
+    recorder = CaptureRecorder(path)
+    live = Dynet(host="localhost", port=12345, loop=loop, broadcaster=lambda event: None, recorder=recorder)
+    await live._receive(makeFrame(1, 0, [0, 0, 0]) + b"\xff" + makeFrame(2, 0, [0, 0, 0]))
+    await asyncio.sleep(0.01)
+    recorder.close()
+    records = list(readCapture(path))
+    assert [record[2][1] for record in records] == [1, 2]
+
+    events = []
+    dynet = Dynet(host="localhost", port=12345, loop=loop, broadcaster=events.append)
+    spread = [(10.0 + index * 0.05, DIRECTION_IN, makeFrame(index + 1, 0, [0, 0, 0])) for index in range(3)]
+    spread.insert(1, (10.01, DIRECTION_OUT, makeFrame(9, 0, [0, 0, 0])))  # our own writes are not replayed
+    stats = await CaptureReplayer(spread, loop=loop, speed=2.0).replay(dynet)
+    assert stats["frames"] == 3
+    assert 0.04 <= stats["duration"] < 0.5  # 0.1 seconds of traffic at twice real time
+    assert [event.get("area") for event in events] == [1, 2, 3]
+
+    events.clear()
+    stats = await CaptureReplayer.fromFile(path, loop=loop, speed=0).replay(dynet)
+    assert stats["frames"] == 2
+    assert [event.get("area") for event in events] == [1, 2]
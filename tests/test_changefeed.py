@@ -0,0 +1,50 @@
+import pytest
+from unittest.mock import Mock
+
+from dynalite_lib.changefeed import ChangeFeed
+from dynalite_lib.dynalite import Dynalite
+
+
+def test_change_feed_sequence():
+    feed = ChangeFeed()
+    assert feed.record(1, None, 4) == 1
+    assert feed.record(1, 2, 0.5) == 2
+    assert feed.record(1, 2, 0.5) is None  # unchanged values are not new changes
+    assert feed.record(1, 2, 1.0) == 3
+    assert feed.sequence == 3
+
+
+def test_change_feed_diff():
+    feed = ChangeFeed()
+    feed.record(1, None, 4)
+    feed.record(1, 2, 0.5)
+    feed.record(3, None, 1)
+    feed.record(1, 2, 1.0)
+    result = feed.changes_since(1)
+    assert result == {
+        "seq": 4,
+        "snapshot": False,
+        "changes": [{"area": 3, "preset": 1}, {"area": 1, "channel": 2, "level": 1.0}],
+    }
+    assert feed.changes_since(4) == {"seq": 4, "snapshot": False, "changes": []}
+    assert feed.changes_since(0)["changes"][0] == {"area": 1, "preset": 4}
+
+
+def test_change_feed_snapshot_needed():
+    feed = ChangeFeed(maxlen=2)
+    for level in range(5):
+        feed.record(1, 1, level)
+    assert feed.changes_since(2) == {"seq": 5, "snapshot": True}
+    assert feed.changes_since(3)["snapshot"] is False
+    assert feed.changes_since(6) == {"seq": 5, "snapshot": True}
+
+
+def test_dynalite_changes_since():
+    dynalite = Dynalite(config={}, loop=Mock())
+    area = Mock()
+    area.value = 2
+    area.activePreset = 3
+    dynalite._stateChanged(area=area)
+    assert dynalite.sequence == 1
+    assert dynalite.changes_since(0)["changes"] == [{"area": 2, "preset": 3}]
+    assert dynalite.snapshot() == {"seq": 1, "area": {}}
@@ -0,0 +1,82 @@
+import pytest
+from unittest.mock import Mock
+
+from dynalite_lib.debounce import Debouncer
+from dynalite_lib.dynalite import Dynalite, BroadcasterError
+from dynalite_lib.event import DynetEvent
+
+
+def test_debounce_leading():
+    loop = Mock()
+    emit = Mock()
+    debouncer = Debouncer(loop, emit, interval=0.25)
+    for level in range(4):
+        debouncer.push((1, 1), level)
+    emit.assert_called_once_with(0)
+    assert loop.call_later.mock_calls[0][1][0] == 0.25
+    debouncer._expire((1, 1))
+    emit.assert_called_with(3)  # final state always emitted
+    assert emit.call_count == 2
+    debouncer._expire((1, 1))  # nothing new in the next window
+    assert emit.call_count == 2
+    debouncer.push((1, 1), 4)  # new burst starts with a leading emit
+    emit.assert_called_with(4)
+    assert debouncer.stats() == {
+        "emitted": 3,
+        "suppressed": 2,
+        "pending": 0,
+        "suppressed_by_entity": {(1, 1): 2},
+    }
+
+
+def test_debounce_trailing():
+    loop = Mock()
+    emit = Mock()
+    debouncer = Debouncer(loop, emit, leading=False)
+    debouncer.push((1, 1), 1)
+    debouncer.push((1, 2), 1)
+    debouncer.push((1, 1), 2)
+    emit.assert_not_called()
+    debouncer._expire((1, 1))
+    emit.assert_called_once_with(2)
+    debouncer.flush()
+    emit.assert_called_with(1)
+    assert debouncer.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_dynalite_debounces_channel_events():
+    loop = Mock()
+    with pytest.raises(BroadcasterError):
+        Dynalite(config={"debounce": {"edge": "middle"}}, loop=loop)
+    dynalite = Dynalite(config={"debounce": {"interval": 0.5}}, loop=loop)
+    listener = Mock()
+    dynalite.addListener(listenerFunction=listener).monitorEvent("*")
+    for level in range(3):
+        await dynalite._broadcast(
+            DynetEvent(eventType="CHANNEL", data={"area": 1, "channel": 2, "level": level})
+        )
+    await dynalite._broadcast(
+        DynetEvent(eventType="CHANNEL", data={"area": 1, "channel": "ALL"})
+    )
+    await dynalite._broadcast(DynetEvent(eventType="PRESET", data={"area": 1}))
+    assert listener.call_count == 3
+    assert dynalite.debounceStats()["suppressed"] == 1
+    assert Dynalite(config={}, loop=loop).debounceStats() is None
+
+
+def test_dynalite_close_flushes_the_debouncer():
+    loop = Mock()
+    dynalite = Dynalite(config={"debounce": {"interval": 0.5}}, loop=loop)
+    listener = Mock()
+    dynalite.addListener(listenerFunction=listener).monitorEvent("CHANNEL")
+    for level in range(3):
+        dynalite._broadcastNow(
+            DynetEvent(eventType="CHANNEL", data={"area": 1, "channel": 2, "level": level})
+        )
+    assert listener.call_count == 1
+    dynalite.close()
+    assert listener.call_count == 2
+    assert listener.call_args[1]["event"].data["level"] == 2
+    loop.call_later.return_value.cancel.assert_called_once_with()
+    assert dynalite.debounceStats()["pending"] == 0
@@ -0,0 +1,77 @@
+import pytest
+import json
+from unittest.mock import Mock
+
+from dynalite_lib.event import DynetEvent
+from dynalite_lib.dynet import DynetPacket
+from dynalite_lib.inbound import DynetInbound
+from dynalite_lib.dynalite import Dynalite
+
+
+def test_event_lazy_fields():
+    event = DynetEvent.fromFields(
+        "CHANNEL", ("area", "channel"), (3, 4), "Area %d Channel %d", (3, 4), "IN"
+    )
+    assert event._data is None
+    assert event._msg is None
+    assert event.get("area") == 3
+    assert event.get("preset", 7) == 7
+    assert "channel" in event
+    assert event._data is None
+    assert event.msg == "Area 3 Channel 4"
+    assert event.data == {"area": 3, "channel": 4}
+    assert json.loads(event.toJson()) == {
+        "eventType": "CHANNEL",
+        "msg": "Area 3 Channel 4",
+        "data": {"area": 3, "channel": 4},
+        "direction": "IN",
+    }
+    assert not hasattr(event, "__dict__")
+
+
+def test_event_from_dict():
+    event = DynetEvent(eventType="preset", message="hello", data={"area": 1})
+    assert event.eventType == "PRESET"
+    assert event.msg == "hello"
+    assert event.get("area") == 1
+    assert "preset" not in event
+    assert DynetEvent().data == {}
+
+
+def test_inbound_report_channel_level():
+    packet = DynetPacket()
+    packet.toMsg(sync=28, area=5, command=96, data=[2, 10, 20])
+    event = DynetInbound().report_channel_level(packet)
+    assert event.eventType == "CHANNEL"
+    assert event.data == {
+        "area": 5,
+        "channel": 3,
+        "action": "report",
+        "target_level": 10,
+        "actual_level": 20,
+        "join": 255,
+        "state": "ON",
+    }
+    assert event.msg == "Area 5 Channel 3 Target Level 10 Actual Level 20."
+
+
+def test_inbound_preset_leaves_packet_alone():
+    packet = DynetPacket()
+    packet.toMsg(sync=28, area=5, command=10, data=[50, 0, 1])
+    event = DynetInbound().preset_5(packet)
+    assert event.get("preset") == 13
+    assert event.get("fade") == 1.0
+    assert not hasattr(packet, "preset")
+
+
+def test_broadcast_skipped_without_listeners():
+    loop = Mock()
+    dynalite = Dynalite(config={}, loop=loop)
+    dynalite.broadcast(DynetEvent(eventType="CHANNEL", data={}))
+    loop.create_task.assert_not_called()
+    assert not dynalite.wantsEvent("CHANNEL")
+    dynalite.addListener(listenerFunction=Mock()).monitorEvent("CHANNEL")
+    assert dynalite.wantsEvent("CHANNEL")
+    dynalite.broadcast(DynetEvent(eventType="CHANNEL", data={}))
+    loop.create_task.assert_called_once()
+    loop.create_task.mock_calls[0][1][0].close()
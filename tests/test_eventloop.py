@@ -0,0 +1,99 @@
+import pytest
+import asyncio
+import time
+from unittest.mock import patch
+
+from dynalite_lib.const import CONF_ACTIVE_ON
+from dynalite_lib.dynet import Dynet, DynetControl
+from dynalite_lib.eventloop import loopName, newEventLoop, uvloopAvailable
+from dynalite_lib.simulator import DynetSimulator
+from dynalite_lib.threaded import ThreadedDynalite
+from tests.helpers import wait_for
+
+LOOPS = [
+    "asyncio",
+    pytest.param(
+        "uvloop", marks=pytest.mark.skipif(not uvloopAvailable(), reason="uvloop not installed")
+    ),
+]
+
+
+class RecordingSimulator(DynetSimulator):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.arrivals = []
+
+    def _handle(self, frame):
+        self.arrivals.append((time.monotonic(), bytes(frame)))
+        super()._handle(frame)
+
+
+async def bus_round_trip(loop):
+    simulator = RecordingSimulator(areas=3, channels=6, port=0, baudrate=None, seed=1, loop=loop)
+    await simulator.start()
+    events = []
+    dynet = Dynet(
+        host="127.0.0.1",
+        port=simulator.port,
+        loop=loop,
+        active=CONF_ACTIVE_ON,
+        broadcaster=events.append,
+        messageDelay=30,
+        reconnectBase=0.05,
+        reconnectCap=0.2,
+    )
+    control = DynetControl(dynet, loop, CONF_ACTIVE_ON)
+    dynet.connect()
+    await wait_for(lambda: simulator.clients and dynet._transport is not None)
+
+    # paced writes keep the message delay on the wire, the first one goes at once
+    started = time.monotonic()
+    control.areaPresetNow(1, 2, 0)
+    control.setChannel(2, 5, 0, fade=0)
+    control.request_area_preset(2)
+    await wait_for(lambda: events)
+    assert simulator.arrivals[0][0] - started < 0.02
+    gaps = [b[0] - a[0] for a, b in zip(simulator.arrivals, simulator.arrivals[1:])]
+    assert len(gaps) == 2 and min(gaps) >= 0.028
+    assert (events[0].eventType, events[0].get("area"), events[0].get("preset")) == ("PRESET", 2, 4)
+    assert simulator.areas[1].preset == 2
+    assert simulator.areas[2].channels[4].target == 255
+
+    # a dropped gateway connection is re-established by the reconnect timers
+    await asyncio.sleep(0.25)  # past a flapping connection
+    for client in list(simulator.clients):
+        client.transport.close()
+    await wait_for(lambda: dynet.reconnect.recoveries == 1)
+    control.request_area_preset(3)
+    await wait_for(lambda: len(events) == 2)
+    dynet.close()
+    await asyncio.sleep(0.01)
+    await simulator.close()
+    return [event.get("area") for event in events]
+
+
+@pytest.mark.parametrize("kind", LOOPS)
+def test_bus_round_trip(kind):
+    loop = newEventLoop(kind == "uvloop")
+    assert loopName(loop) == kind
+    try:
+        assert loop.run_until_complete(bus_round_trip(loop)) == [2, 3]
+    finally:
+        loop.close()
+
+
+def test_fall_back_without_uvloop():
+    with patch("dynalite_lib.eventloop.uvloop", None):
+        assert not uvloopAvailable()
+        loop = newEventLoop(True)
+        assert loopName(loop) == "asyncio"
+        loop.close()
+
+
+@pytest.mark.parametrize("kind", LOOPS)
+def test_threaded_client_loop(kind):
+    client = ThreadedDynalite(config={"port": 1, "uvloop": kind == "uvloop"})
+    client.start()
+    assert loopName(client.loop) == kind
+    assert client.call(lambda: 7, timeout=2) == 7
+    client.stop()
@@ -0,0 +1,79 @@
+import pytest
+import asyncio
+import random
+from unittest.mock import Mock
+
+from dynalite_lib.dynalite import Dynalite
+from dynalite_lib.dynet import Dynet, DynetControl, DynetPacket
+from dynalite_lib.event import DynetEvent
+from dynalite_lib.tasks import TaskTracker
+
+
+def test_checksum():
+    rng = random.Random(4)
+    for _ in range(200):
+        msg = [rng.randint(0, 255) for _ in range(7)]
+        assert DynetPacket().calcsum(msg) == -(sum(msg) % 256) & 0xFF
+        assert (sum(msg) + DynetPacket().calcsum(msg)) % 256 == 0
+
+
+@pytest.mark.asyncio
+async def test_direct_commands_need_no_task():
+    loop = asyncio.get_event_loop()
+    tasks = TaskTracker(loop)
+    dynet = Mock()
+    control = DynetControl(dynet, loop, "on", tasks=tasks)
+    control.areaPresetNow(3, 14, 11.0)
+    control.setChannelNow(3, 14, 1.0, 10.0)
+    control.requestChannelLevelNow(3, 5)
+    control.stopChannelFadeNow(3, 5)
+    control.areaOffNow(3, 2)
+    control.requestAreaPresetNow(3)
+    assert tasks.started == 0
+    packets = [call[1][0] for call in dynet.writeNow.mock_calls]
+    assert [(packet.command, packet.data) for packet in packets] == [
+        (11, [38, 2, 1]),
+        (129, [1, 2, 255]),
+        (97, [4, 0, 0]),
+        (118, [4, 0, 0]),
+        (104, [255, 0, 20]),
+        (99, [0, 0, 0]),
+    ]
+    # the queue methods build the same frames
+    await control.areaPreset(3, 14, 11.0)
+    assert dynet.write.mock_calls[0][1][0].data == [38, 2, 1]
+    control.direct = True
+    assert control.setChannel(3, 14, 1.0, 10.0) is None
+    assert dynet.writeNow.call_count == 7
+
+
+@pytest.mark.asyncio
+async def test_write_now_sends_and_paces():
+    loop = asyncio.get_event_loop()
+    dynet = Dynet(host="localhost", port=12345, loop=loop, broadcaster=lambda event: None, messageDelay=20)
+    dynet._transport = Mock()
+    first, second = DynetPacket(), DynetPacket()
+    first.toMsg(area=1)
+    second.toMsg(area=2)
+    dynet.writeNow(first)
+    dynet.writeNow(second)
+    assert dynet._transport.write.call_count == 1  # sent before writeNow returned
+    assert dynet.queueLength() == 1
+    await asyncio.sleep(0.05)
+    assert dynet._transport.write.call_count == 2
+    assert dynet._transport.write.mock_calls[1][1][0][1] == 2
+
+
+@pytest.mark.asyncio
+async def test_dynalite_fast_path_is_inline():
+    loop = asyncio.get_event_loop()
+    dynalite = Dynalite(config={"fast_path": True, "area": {"1": {"name": "Room", "preset": {"1": {}, "4": {}}}}}, loop=loop)
+    dynalite.control = Mock(active="off")
+    await dynalite._configure()
+    received = []
+    dynalite.addListener(listenerFunction=lambda event, dynalite: received.append(event), mode="inline").monitorEvent("PRESET")
+    dynalite.processTrafficNow(DynetEvent(eventType="PRESET", data={"area": 1, "preset": 4}))
+    assert dynalite.getAreaPreset(1) == 4  # state and listeners are done before the call returns
+    assert [event.get("preset") for event in received][-1] == 4
+    dynet = dynalite._newDynet("localhost", 12345)
+    assert dynet.broadcast == dynalite.processTrafficNow
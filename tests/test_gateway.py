@@ -0,0 +1,93 @@
+import pytest
+from unittest.mock import patch, Mock
+
+from dynalite_lib.gateway import (
+    DynetGateways,
+    GatewayError,
+    parseAreas,
+    parseGateways,
+)
+from dynalite_lib.dynalite import Dynalite
+
+
+def test_parse_areas():
+    assert parseAreas([1, "3", "10-12"]) == {1, 3, 10, 11, 12}
+    with pytest.raises(GatewayError):
+        parseAreas(["12-10"])
+    with pytest.raises(GatewayError) as err:
+        parseAreas(["a-b"])
+    assert isinstance(err.value.__cause__, ValueError)
+    with pytest.raises(GatewayError) as err:
+        parseAreas(["x"])
+    assert isinstance(err.value.__cause__, ValueError)
+
+
+def test_parse_gateways():
+    gateways = parseGateways(
+        [
+            {"host": "a", "port": 1, "area": ["1-2"]},
+            {"host": "b", "port": 2},
+        ]
+    )
+    assert gateways == [("a", 1, {1, 2}), ("b", 2, None)]
+    with pytest.raises(GatewayError):
+        parseGateways([{"host": "a", "area": [1]}])
+    with pytest.raises(GatewayError):
+        parseGateways([{"host": "a", "port": 1}, {"host": "b", "port": 2}])
+    with pytest.raises(GatewayError):
+        parseGateways(
+            [{"host": "a", "port": 1, "area": [1]}, {"host": "b", "port": 2, "area": ["1-3"]}]
+        )
+
+
+def test_gateways_route_writes():
+    bus_a, bus_b, default = Mock(), Mock(), Mock()
+    gateways = DynetGateways([(bus_a, {1, 2}), (bus_b, {3}), (default, None)])
+    for area, dynet in [(1, bus_a), (3, bus_b), (9, default)]:
+        packet = Mock()
+        packet.area = area
+        gateways.write(packet)
+        dynet.write.assert_called_once_with(packet)
+        dynet.reset_mock()
+    gateways.connect()
+    gateways.pauseReading()
+    for dynet in [bus_a, bus_b, default]:
+        dynet.connect.assert_called_once_with()
+        dynet.pauseReading.assert_called_once_with()
+
+
+def test_gateways_without_default():
+    bus_a = Mock()
+    gateways = DynetGateways([(bus_a, {1})])
+    packet = Mock()
+    packet.area = 2
+    gateways.write(packet)
+    bus_a.write.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_dynalite_starts_one_dynet_per_gateway():
+    loop = Mock()
+    dynalite = Dynalite(
+        config={
+            "host": "main",
+            "port": 10,
+            "gateways": [{"host": "a", "port": 1, "area": [1]}],
+        },
+        loop=loop,
+    )
+    with patch("dynalite_lib.dynalite.Dynet") as dynet:
+        await dynalite._start()
+        assert [call[2]["host"] for call in dynet.mock_calls if call[0] == ""] == ["a", "main"]
+    assert isinstance(dynalite._dynet, DynetGateways)
+    assert dynalite.control._dynet is dynalite._dynet
+    for call in loop.create_task.call_args_list:  # the coroutines, not calls on the returned tasks
+        call[0][0].close()
+
+
+def test_gateway_event_data():
+    dynalite = Dynalite(config={"gateways": [{"host": "a", "port": 1, "area": [1]}]}, loop=Mock())
+    dynet = dynalite._newDynet("a", 1, areas=[1])
+    assert dynet.address == ("a", 1)
+    assert dynalite._gatewayData(dynet) == {"host": "a", "port": 1}
+    assert Dynalite(config={}, loop=Mock())._gatewayData(dynet) == {}  # only named with several gateways
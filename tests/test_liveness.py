@@ -0,0 +1,139 @@
+import pytest
+import asyncio
+import socket
+from unittest.mock import Mock
+
+from dynalite_lib.const import CONF_ACTIVE_ON, CONF_ACTIVE_OFF, OpcodeType
+from dynalite_lib.dynalite import Dynalite
+from dynalite_lib.dynet import Dynet, DynetPacket, configureSocket
+
+
+def test_configure_socket():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        configureSocket(sock, nodelay=True, keepalive=6, sendBuffer=8192, receiveBuffer=8192)
+        assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+        assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE) == 6
+            assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL) == 2
+        assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF) >= 8192
+    finally:
+        sock.close()
+
+
+def test_liveness_needs_active():
+    dynet = Dynet(host="localhost", port=12345, loop=Mock(), active=CONF_ACTIVE_OFF, liveness=5)
+    assert dynet._liveness is None
+
+
+def test_liveness_is_opt_in_and_needs_a_probe_area():
+    loop = Mock()
+    dynalite = Dynalite(config={"active": CONF_ACTIVE_ON}, loop=loop)
+    assert dynalite._newDynet("localhost", 12345)._liveness is None
+    dynalite = Dynalite(config={"active": CONF_ACTIVE_ON, "liveness": 5, "autodiscover": True}, loop=loop)
+    assert dynalite._newDynet("localhost", 12345)._liveness is None  # no configured area to probe
+    dynalite = Dynalite(config={"active": CONF_ACTIVE_ON, "liveness": 5, "area": {"3": {}, "2": {}}}, loop=loop)
+    dynet = dynalite._newDynet("localhost", 12345)
+    assert dynet._liveness == 5
+    assert dynet._probeArea == 2
+
+
+
+def test_probe_goes_first_and_times_out_from_the_wire():
+    loop = Mock()
+    loop.time.return_value = 100.0
+    dynet = Dynet(
+        host="localhost",
+        port=12345,
+        loop=loop,
+        active=CONF_ACTIVE_ON,
+        messageDelay=0,
+        liveness=5,
+        livenessTimeout=1,
+        probeArea=7,
+    )
+    dynet._transport = Mock()
+    dynet._lastReceived = 90.0
+    dynet.write = dynet._outBuffer.append
+    dynet._outBuffer.append(DynetPacket())
+    dynet._checkLiveness()
+    assert dynet.probes == 0  # frames still queued
+    dynet._outBuffer.clear()
+    dynet._checkLiveness()
+    assert dynet.probes == 1 and dynet._outBuffer == [dynet._probe]
+    loop.time.return_value = 105.0  # past the timeout but still queued behind the pacing
+    dynet._checkLiveness()
+    dynet._transport.abort.assert_not_called()
+    dynet._send()
+    assert dynet._probeSent == 105.0
+    loop.time.return_value = 105.5
+    dynet._checkLiveness()
+    dynet._transport.abort.assert_not_called()
+    loop.time.return_value = 106.5
+    dynet._checkLiveness()
+    dynet._transport.abort.assert_called_once_with()
+    assert dynet.deadLinks == 1
+
+async def run_gateway(answer):
+    """Return a loopback gateway that optionally answers preset requests, and the frames it got."""
+    frames = []
+
+    async def gateway(reader, writer):
+        while True:
+            data = await reader.read(8)
+            if not data:
+                break
+            frames.append(data)
+            if answer and data[3] == OpcodeType.REQUEST_PRESET.value:
+                writer.write(bytes([28, data[1], 0, OpcodeType.REPORT_PRESET.value, 0, 0, 255, 0]))
+
+    server = await asyncio.start_server(gateway, "127.0.0.1", 0)
+    return server, frames
+
+
+async def connect(server, liveness):
+    loop = asyncio.get_event_loop()
+    lost = asyncio.Event()
+
+    async def onDisconnect(dynet=None):
+        lost.set()
+
+    dynet = Dynet(
+        host="127.0.0.1",
+        port=server.sockets[0].getsockname()[1],
+        loop=loop,
+        active=CONF_ACTIVE_ON,
+        broadcaster=lambda event: None,
+        onDisconnect=onDisconnect,
+        messageDelay=0,
+        liveness=liveness,
+        livenessTimeout=0.1,
+        probeArea=7,
+    )
+    dynet.connect()
+    return dynet, lost
+
+
+@pytest.mark.asyncio
+async def test_dead_link_is_dropped():
+    server, frames = await run_gateway(answer=False)
+    dynet, lost = await connect(server, liveness=0.05)
+    await asyncio.wait_for(lost.wait(), 2)
+    assert dynet.probes == 1
+    assert dynet.deadLinks == 1
+    assert frames[0][1] == 7
+    assert frames[0][3] == OpcodeType.REQUEST_PRESET.value
+    server.close()
+
+
+@pytest.mark.asyncio
+async def test_answered_probe_keeps_link():
+    server, frames = await run_gateway(answer=True)
+    dynet, lost = await connect(server, liveness=0.05)
+    await asyncio.sleep(0.4)
+    assert not lost.is_set()
+    assert dynet.probes >= 2
+    assert dynet.deadLinks == 0
+    dynet.close()
+    server.close()
@@ -0,0 +1,85 @@
+import pytest
+import asyncio
+from unittest.mock import Mock
+
+from dynalite_lib.dynalite import Dynalite
+from dynalite_lib.dynet import Dynet, DynetControl
+from dynalite_lib.event import DynetEvent
+from dynalite_lib.metrics import MetricsError, MetricsRegistry, MetricsServer
+
+
+def test_registry_snapshot_and_render():
+    registry = MetricsRegistry()
+    registry.counter("frames", "Frames", gateway="a").inc(3)
+    assert registry.counter("frames", gateway="a").value == 3  # same labels, same counter
+    registry.gauge("depth", "Depth", function=lambda: 7)
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in [0.05, 0.1, 0.5, 2.0]:
+        histogram.observe(value)
+    with pytest.raises(MetricsError):
+        registry.gauge("frames")
+    snapshot = registry.snapshot()
+    assert snapshot['dynalite_frames{gateway="a"}'] == 3
+    assert snapshot["dynalite_depth"] == 7
+    assert snapshot["dynalite_latency_seconds"]["buckets"] == {0.1: 2, 1.0: 3}
+    text = registry.render()
+    assert '# TYPE dynalite_frames counter\n# HELP dynalite_frames Frames\ndynalite_frames_total{gateway="a"} 3\n' in text
+    assert 'dynalite_latency_seconds_bucket{le="0.1"} 2\n' in text
+    assert 'dynalite_latency_seconds_bucket{le="+Inf"} 4\n' in text
+    assert "dynalite_latency_seconds_count 4\ndynalite_latency_seconds_sum 2.65\n" in text
+    assert text.endswith("# EOF\n")
+
+
+@pytest.mark.asyncio
+async def test_dynet_and_control_metrics():
+    loop = asyncio.get_event_loop()
+    registry = MetricsRegistry()
+    dynet = Dynet(host="localhost", port=12345, loop=loop, broadcaster=lambda event: None, metrics=registry, messageDelay=0)
+    frame = [28, 1, 0, 0, 0, 0, 255, 228]
+    await dynet._receive(bytes([1, 2] + frame))
+    control = DynetControl(dynet, loop, "on", metrics=registry)
+    await control.areaPreset(1, 1)
+    await asyncio.sleep(0.01)
+    dynet._transport = Mock()
+    await dynet._write()
+    snapshot = registry.snapshot()
+    assert snapshot['dynalite_dynet_frames_in{gateway="localhost:12345"}'] == 1
+    assert snapshot['dynalite_dynet_skipped_bytes{gateway="localhost:12345"}'] == 2
+    assert snapshot['dynalite_dynet_frames_out{gateway="localhost:12345"}'] == 1
+    assert snapshot['dynalite_dynet_queue_depth{gateway="localhost:12345"}'] == 0
+    assert snapshot['dynalite_dynet_send_latency_seconds{gateway="localhost:12345"}']["count"] == 1
+    assert snapshot['dynalite_dynet_commands{kind="preset"}'] == 1
+
+
+@pytest.mark.asyncio
+async def test_dynalite_metrics_endpoint():
+    loop = asyncio.get_event_loop()
+    dynalite = Dynalite(config={"metrics": True, "area": {"1": {"name": "Room"}}}, loop=loop)
+    dynalite.control = Mock(active="off")
+    await dynalite._configure()
+    dynalite.addListener(listenerFunction=lambda event, dynalite: None).monitorEvent("*")
+    await dynalite._processTraffic(DynetEvent(eventType="PRESET", data={"area": 1, "preset": 1}))
+    await asyncio.sleep(0.01)
+    snapshot = dynalite.metrics.snapshot()
+    assert snapshot['dynalite_events{type="PRESET"}'] == 1
+    assert snapshot["dynalite_process_seconds"]["count"] == 1
+    assert snapshot['dynalite_listener_seconds{mode="inline"}']["count"] >= 1
+
+    server = MetricsServer(dynalite.metrics, port=0, loop=loop)
+    await server.start()
+    reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+    writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    response = await reader.read()
+    writer.close()
+    assert response.startswith(b"HTTP/1.0 200 OK\r\n")
+    assert b'dynalite_events_total{type="PRESET"} 1\n' in response
+    reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+    writer.write(b"GET / HTTP/1.1\r\n\r\n")
+    assert (await reader.read()).startswith(b"HTTP/1.0 404")
+    writer.close()
+    server.close()
+
+
+def test_disabled_by_default():
+    dynalite = Dynalite(config={}, loop=Mock())
+    assert dynalite.metrics is None
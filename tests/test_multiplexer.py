@@ -0,0 +1,87 @@
+import pytest
+import asyncio
+from unittest.mock import Mock
+
+from dynalite_lib.multiplexer import DynetMultiplexer, MultiplexerClient
+from dynalite_lib.simulator import makeFrame
+
+
+async def read_frames(reader, count):
+    return [await asyncio.wait_for(reader.readexactly(8), 2) for _ in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_multiplexer_fan_out_and_fairness():
+    loop = asyncio.get_event_loop()
+    upstream = asyncio.Queue()
+    gateway_writers = []
+
+    async def gateway(reader, writer):
+        gateway_writers.append(writer)
+        while True:
+            data = await reader.read(100)
+            if not data:
+                break
+            for index in range(0, len(data), 8):
+                await upstream.put(data[index : index + 8])
+
+    server = await asyncio.start_server(gateway, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    multiplexer = DynetMultiplexer("127.0.0.1", port, listenPort=0, loop=loop, messageDelay=5)
+    await multiplexer.start()
+    reader_a, writer_a = await asyncio.open_connection("127.0.0.1", multiplexer.listenPort)
+    reader_b, writer_b = await asyncio.open_connection("127.0.0.1", multiplexer.listenPort)
+    for _ in range(100):
+        if gateway_writers and len(multiplexer._clients) == 2:
+            break
+        await asyncio.sleep(0.01)
+
+    # bus traffic goes to every client
+    preset = makeFrame(1, 0, [0, 0, 0])
+    gateway_writers[0].write(preset)
+    assert await read_frames(reader_a, 1) == [preset]
+    assert await read_frames(reader_b, 1) == [preset]
+
+    # a burst from client A does not starve client B
+    burst = [makeFrame(2, 0, [0, 0, level]) for level in range(3)]
+    writer_a.write(b"".join(burst))
+    await asyncio.sleep(0.001)
+    single = makeFrame(3, 1, [0, 0, 0])
+    writer_b.write(b"\xff" + single)  # leading noise is skipped
+    sent = [await asyncio.wait_for(upstream.get(), 2) for _ in range(4)]
+    assert sorted(sent) == sorted(burst + [single])
+    assert sent.index(single) <= 1
+    # frames sent for one client are seen by the other
+    assert sorted(await read_frames(reader_b, 3)) == sorted(burst)
+    assert await read_frames(reader_a, 1) == [single]
+
+    stats = multiplexer.stats()
+    assert stats["frames_from_bus"] == 1
+    assert stats["frames_to_bus"] == 4
+    assert sorted(client["frames_sent"] for client in stats["clients"]) == [1, 3]
+
+    writer_a.close()
+    writer_b.close()
+    await multiplexer.close()
+    server.close()
+    await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_multiplexer_echoes_only_frames_on_the_bus():
+    loop = asyncio.get_event_loop()
+    multiplexer = DynetMultiplexer("127.0.0.1", 1, listenPort=0, loop=loop, messageDelay=0)
+    sender, other = MultiplexerClient(multiplexer), MultiplexerClient(multiplexer)
+    for client in [sender, other]:
+        client.connection_made(Mock())
+    frame = makeFrame(2, 0, [0, 0, 0])
+    sender.data_received(frame)
+    await asyncio.sleep(0.01)
+    assert multiplexer.stats()["bus_queue"] == 1  # no gateway yet
+    other.transport.write.assert_not_called()
+    multiplexer._dynet._transport = Mock()
+    multiplexer._dynet._send()
+    other.transport.write.assert_called_once_with(frame)
+    sender.transport.write.assert_not_called()
+    assert multiplexer.stats()["frames_to_bus"] == 1
+    await multiplexer.close()
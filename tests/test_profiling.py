@@ -0,0 +1,54 @@
+import pytest
+import asyncio
+from unittest.mock import Mock
+
+from dynalite_lib.dynalite import Dynalite
+from dynalite_lib.dynet import Dynet
+from dynalite_lib.event import DynetEvent
+from dynalite_lib.profiling import PipelineProfiler
+
+
+def test_sampling_and_report():
+    profiler = PipelineProfiler(sampleRate=4)
+    assert [profiler.sample("framing") for _ in range(8)] == [False, False, False, True] * 2
+    assert profiler.sample("process") is False  # stages are sampled independently
+    profiler.record("handler", profiler.now() - 3000000, "PRESET")
+    profiler.record("handler", profiler.now() - 1000000, "REPORT_CHANNEL_LEVEL")
+    profiler.record("framing", profiler.now() - 1000000)
+    stages = profiler.report()
+    assert [entry["name"] for entry in stages] == ["handler", "framing"]
+    assert stages[0]["estimated_calls"] == 8
+    assert 0.6 < stages[0]["share"] < 1
+    opcodes = profiler.report(stage="handler")
+    assert [entry["name"] for entry in opcodes] == ["PRESET", "REPORT_CHANNEL_LEVEL"]
+    assert len(profiler.report(top=1)) == 1
+    profiler.reset()
+    assert profiler.report() == []
+
+
+@pytest.mark.asyncio
+async def test_pipeline_stages():
+    loop = asyncio.get_event_loop()
+    profiler = PipelineProfiler(sampleRate=1)
+    dynet = Dynet(host="localhost", port=12345, loop=loop, broadcaster=lambda event: None, profiler=profiler)
+    await dynet._receive(bytes([28, 1, 0, 0, 0, 0, 255, 228]))
+    assert {entry["name"] for entry in profiler.report()} == {"framing", "handler"}
+    assert profiler.report(stage="handler")[0]["name"] == "PRESET_1"
+
+    # a pass that produces no packet is not a framing call
+    profiler = PipelineProfiler(sampleRate=2)
+    dynet = Dynet(host="localhost", port=12345, loop=loop, broadcaster=lambda event: None, profiler=profiler)
+    await dynet._receive(bytes([28, 1, 0, 0, 0, 0, 255, 228]))
+    await dynet._receive(bytes(8))  # skips a byte, leaving too few for a frame
+    await dynet._receive(bytes([28, 1, 0, 0, 0, 0, 255, 228]))
+    assert profiler.report()[0]["name"] == "framing"
+    assert profiler.report()[0]["sampled_calls"] == 1
+
+    dynalite = Dynalite(config={"profile": 1, "area": {"1": {"name": "Room"}}}, loop=loop)
+    dynalite.control = Mock(active="off")
+    await dynalite._configure()
+    dynalite.addListener(listenerFunction=lambda event, dynalite: None).monitorEvent("*")
+    await dynalite._processTraffic(DynetEvent(eventType="PRESET", data={"area": 1, "preset": 1}))
+    await asyncio.sleep(0.01)
+    assert {entry["name"] for entry in dynalite.profiler.report()} == {"process", "dispatch"}
+    assert dynalite.profiler.report(stage="process")[0]["name"] == "PRESET"
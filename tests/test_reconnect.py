@@ -0,0 +1,150 @@
+import pytest
+import asyncio
+from unittest.mock import Mock
+
+import dynalite_lib.reconnect as reconnect
+from dynalite_lib.const import REPLAY_EXPIRE, REPLAY_LATEST, REPLAY_DROP_POLLS
+from dynalite_lib.dynet import Dynet, DynetControl
+from dynalite_lib.reconnect import ReconnectError, ReconnectManager, replayQueue
+
+
+def queued(control):
+    packets = []
+    control._dynet = Mock()
+    control._dynet.write.side_effect = packets.append
+    return packets
+
+
+@pytest.mark.asyncio
+async def test_replay_policies():
+    loop = asyncio.get_event_loop()
+    control = DynetControl(None, loop, "on")
+    packets = queued(control)
+    await control._setChannel(area=1, channel=5, level=0.2, fade=0)
+    await control._request_channel_level(area=1, channel=5, shouldRun=None)
+    await control._areaPreset(area=2, preset=1, fade=0)
+    await control._setChannel(area=1, channel=5, level=0.8, fade=0)
+    await control._setChannel(area=1, channel=6, level=0.8, fade=0)
+    await control._areaPreset(area=2, preset=4, fade=0)
+    await control._request_area_preset(area=2, shouldRun=None)
+    for age, packet in zip([100, 100, 100, 1, 1, 1, 1], packets):
+        packet.queued = 1000 - age
+
+    assert replayQueue(packets, []) == packets
+    assert replayQueue(packets, [REPLAY_EXPIRE], maxAge=10, now=1000) == packets[3:]
+    assert replayQueue(packets, [REPLAY_DROP_POLLS]) == [packets[index] for index in [0, 2, 3, 4, 5]]
+    assert replayQueue(packets, [REPLAY_LATEST]) == [packets[index] for index in [1, 3, 4, 5, 6]]
+    assert replayQueue(packets, [REPLAY_LATEST, REPLAY_DROP_POLLS]) == packets[3:6]
+
+
+def test_decorrelated_jitter():
+    manager = ReconnectManager(Mock(), Mock(), [("a", 1)], base=1, cap=20)
+    previous = 1
+    for _ in range(100):
+        delay = manager.nextDelay()
+        assert 1 <= delay <= min(20, previous * 3)
+        previous = delay
+    with pytest.raises(ReconnectError):
+        ReconnectManager(Mock(), Mock(), [])
+
+
+def test_failover_then_backoff():
+    loop = Mock()
+    connect = Mock()
+    manager = ReconnectManager(loop, connect, [("a", 1), ("b", 2)])
+    manager.start()
+    connect.assert_called_once_with(("a", 1))
+    assert manager.start() is None  # attempt already running
+    manager.failed()
+    loop.call_soon.assert_called_once()  # next address at once
+    loop.call_soon.call_args[0][0]()
+    connect.assert_called_with(("b", 2))
+    manager.failed()
+    loop.call_later.assert_called_once()  # whole round failed - wait
+    assert manager.address == ("a", 1)
+    assert manager.stats()["failovers"] == 2
+
+
+@pytest.mark.asyncio
+async def test_unexpected_attempt_errors_are_retried():
+    loop = asyncio.get_event_loop()
+
+    async def broken():
+        raise RuntimeError("protocol factory")
+
+    attempts = []
+
+    def connect(address):
+        attempts.append(loop.create_task(broken()) if not attempts else loop.create_future())
+        return attempts[-1]
+
+    manager = ReconnectManager(loop, connect, [("a", 1)], base=0.01, cap=0.01)
+    manager.start()
+    for _ in range(100):
+        if len(attempts) == 2:
+            break
+        await asyncio.sleep(0.01)
+    assert manager.failures == 1 and len(attempts) == 2
+
+    attempts[1].cancel()  # a cancelled attempt fails too
+    await asyncio.sleep(0)
+    assert manager.failures == 2
+    manager.close()
+
+
+@pytest.mark.asyncio
+async def test_dynet_failover_and_recovery(monkeypatch):
+    monkeypatch.setattr(reconnect, "STABLE_CONNECTION", 0)
+    loop = asyncio.get_event_loop()
+    accepted = []
+
+    async def gateway(reader, writer):
+        accepted.append(writer)
+        await reader.read(100)
+
+    server = await asyncio.start_server(gateway, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    unused = await asyncio.start_server(gateway, "127.0.0.1", 0)
+    deadPort = unused.sockets[0].getsockname()[1]
+    unused.close()
+    await unused.wait_closed()
+    disconnects = []
+
+    async def onDisconnect(dynet=None):
+        disconnects.append(dynet)
+
+    dynet = Dynet(
+        host="127.0.0.1",
+        port=deadPort,
+        failover=[("127.0.0.1", port)],
+        loop=loop,
+        broadcaster=lambda event: None,
+        onDisconnect=onDisconnect,
+        messageDelay=0,
+    )
+    dynet.connect()
+    for _ in range(100):
+        if accepted and dynet._transport is not None:
+            break
+        await asyncio.sleep(0.01)
+    assert dynet.address == ("127.0.0.1", port)
+    assert dynet.reconnect.stats()["failovers"] == 1
+
+    # the gateway drops us - one reconnect, not one per listener
+    accepted[0].close()
+    for _ in range(100):
+        if len(accepted) == 2 and dynet._transport is not None:
+            break
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)
+    assert len(accepted) == 2
+    assert len(disconnects) == 1
+    stats = dynet.reconnect.stats()
+    assert stats["recoveries"] == 2  # the failover at start and the drop
+    assert 0 < stats["last_recovery"] < 1
+
+    # close stops reconnecting
+    dynet.close()
+    await asyncio.sleep(0.05)
+    assert len(accepted) == 2
+    server.close()
@@ -0,0 +1,84 @@
+import pytest
+import asyncio
+from unittest.mock import Mock
+
+from dynalite_lib.dynalite import Dynalite
+from dynalite_lib.event import DynetEvent
+from dynalite_lib.resync import ResyncPass, StalenessTracker
+
+
+def test_stalest_first():
+    tracker = StalenessTracker()
+    tracker.confirm(1, None, when=5.0)
+    tracker.confirm(1, 2, when=3.0)
+    tracker.confirm(2, None, when=20.0)
+    entities = [(1, None), (1, 2), (1, 3), (2, None)]
+    assert tracker.stalest(entities, since=10.0) == [(1, 3), (1, 2), (1, None)]
+    assert tracker.lastConfirmed(1, 2) == 3.0
+    assert tracker.lastConfirmed(1, 3) is None
+
+
+@pytest.mark.asyncio
+async def test_resync_pass_budget_and_coverage():
+    loop = asyncio.get_event_loop()
+    tracker = StalenessTracker()
+    since = loop.time()
+    entities = [(1, None), (1, 1), (1, 2), (2, None), (2, 1)]
+    tracker.confirm(2, 1, when=since + 1)  # already confirmed after the outage
+    polled = []
+
+    def poll(area, channel):
+        polled.append((area, channel))
+        if (area, channel) != (1, 2):  # one entity never answers
+            tracker.confirm(area, channel, when=loop.time() + 1)
+
+    done = asyncio.Event()
+    resync = ResyncPass(loop, tracker, entities, poll, since, onComplete=lambda resync: done.set(), budget=3, interval=0.001, timeout=0.05)
+    assert resync.skipped == 1
+    resync.start()
+    await asyncio.wait_for(done.wait(), 2)
+    assert polled == [(1, None), (1, 1), (1, 2)]
+    assert resync.result["polled"] == 3
+    assert resync.result["confirmed"] == 3  # (1, None), (1, 1) and (2, 1)
+    assert resync.result["coverage"] == 60.0
+
+
+@pytest.mark.asyncio
+async def test_dynalite_resync_after_reconnect():
+    loop = asyncio.get_event_loop()
+    dynalite = Dynalite(
+        config={"active": "on", "message_delay": 1, "area": {"1": {"name": "Room", "channel": {"1": {}, "2": {}}}}},
+        loop=loop,
+    )
+    dynalite.control = Mock(active="on")
+    await dynalite._configure()
+    dynalite.control.reset_mock()
+
+    def answer(area, channel):
+        loop.create_task(
+            dynalite._processTraffic(
+                DynetEvent(
+                    eventType="CHANNEL",
+                    data={"area": area, "channel": channel, "action": "report", "target_level": 1, "actual_level": 1},
+                )
+            )
+        )
+
+    dynalite.control.request_channel_level.side_effect = answer
+    dynalite.control.request_area_preset.side_effect = lambda area: loop.create_task(
+        dynalite._processTraffic(DynetEvent(eventType="PRESET", data={"area": area, "preset": 1}))
+    )
+    events = []
+    dynalite.addListener(listenerFunction=lambda event, dynalite: events.append(event)).monitorEvent("RESYNC")
+    dynet = Mock()
+    await dynalite._connected(dynet=dynet)
+    assert not dynalite._resyncs  # first connection - nothing to re-validate
+    await dynalite._disconnection(dynet=dynet)
+    await dynalite._connected(dynet=dynet)
+    for _ in range(300):
+        if events:
+            break
+        await asyncio.sleep(0.01)
+    assert events[0].get("polled") == 3
+    assert events[0].get("coverage") == 100.0
+    dynalite.control.request_area_preset.assert_called_once_with(1)
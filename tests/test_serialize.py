@@ -0,0 +1,80 @@
+import pytest
+import json
+
+from dynalite_lib.dynet import DynetPacket
+from dynalite_lib.event import DynetEvent
+from dynalite_lib.inbound import DynetInbound
+from dynalite_lib.serialize import (
+    NdjsonEncoder,
+    SerializeError,
+    encodeEventsBinary,
+    decodeEventsBinary,
+    EVENT_RECORD,
+)
+
+
+def sample_events():
+    report = DynetPacket()
+    report.toMsg(sync=28, area=5, command=96, data=[2, 10, 20])
+    stop = DynetPacket()
+    stop.toMsg(sync=28, area=6, command=118, data=[255, 0, 0])
+    preset = DynetPacket()
+    preset.toMsg(sync=28, area=7, command=1, data=[50, 0, 0])
+    inbound = DynetInbound()
+    return [
+        inbound.report_channel_level(report),
+        inbound.stop_fading(stop),
+        inbound.preset_2(preset),
+        DynetEvent(eventType="CONNECTED", data={}),
+    ]
+
+
+@pytest.mark.parametrize("backend", [None, "json"])
+def test_ndjson_events(backend):
+    events = sample_events()
+    encoded = NdjsonEncoder(backend).encodeEvents(events)
+    lines = encoded.split(b"\n")
+    assert lines[-1] == b""
+    assert [json.loads(line) for line in lines[:-1]] == [
+        event.toDict() for event in events
+    ]
+
+
+def test_ndjson_state():
+    snapshot = {"seq": 3, "area": {1: {"preset": 2, "channel": {1: 0.5}}}}
+    encoded = NdjsonEncoder("json").encodeState(snapshot)
+    assert encoded == b'{"area":1,"preset":2,"channel":{"1":0.5}}\n'
+
+
+def test_ndjson_bad_backend():
+    with pytest.raises(SerializeError):
+        NdjsonEncoder("yaml")
+
+
+def test_binary_round_trip():
+    events = sample_events()
+    encoded = encodeEventsBinary(events, timestamp=12.5)
+    assert len(encoded) == EVENT_RECORD.size * len(events)
+    decoded = decodeEventsBinary(encoded)
+    assert [timestamp for timestamp, _ in decoded] == [12.5] * len(events)
+    for original, (_, event) in zip(events, decoded):
+        assert event.eventType == original.eventType
+        assert event.direction == original.direction
+        for key, value in event.data.items():
+            assert original.data[key] == pytest.approx(value)
+    assert decoded[1][1].get("channel") == "ALL"
+    assert decoded[3][1].data == {}
+    with pytest.raises(SerializeError):
+        decodeEventsBinary(encoded[:-1])
+    with pytest.raises(SerializeError):
+        encodeEventsBinary([DynetEvent(eventType="CUSTOM")])
+
+
+def test_packet_repr():
+    packet = DynetPacket(shouldRun=lambda: True)
+    packet.toMsg(sync=28, area=5, command=96, data=[2, 10, 20])
+    assert repr(packet) == (
+        "DynetPacket(REPORT_CHANNEL_LEVEL area=5 command=96 data=[2, 10, 20] join=255 sync=28 chk=%d)"
+        % packet.chk
+    )
+    assert json.loads(packet.toJson())["opcodeType"] == "REPORT_CHANNEL_LEVEL"
@@ -0,0 +1,120 @@
+import pytest
+import asyncio
+import os
+import tty
+from unittest.mock import Mock
+
+from dynalite_lib.const import TRANSPORT_SERIAL
+from dynalite_lib.dynet import Dynet, DynetError, DynetPacket
+from dynalite_lib.serialport import SerialError, configurePort, frameTime
+from dynalite_lib.simulator import makeFrame
+
+
+
+@pytest.fixture
+def pty_pair():
+    master, slave = os.openpty()
+    tty.setraw(master)
+    yield master, os.ttyname(slave)
+    os.close(master)
+    os.close(slave)
+
+
+async def read_master(master, count):
+    loop = asyncio.get_event_loop()
+    data = b""
+    for _ in range(200):
+        data += await loop.run_in_executor(None, os.read, master, count - len(data))
+        if len(data) >= count:
+            return data
+    return data
+
+
+def test_frame_time():
+    assert frameTime(9600) == pytest.approx(80 / 9600)
+
+
+def test_serial_needs_device():
+    with pytest.raises(DynetError):
+        Dynet(transport=TRANSPORT_SERIAL, loop=Mock())
+    with pytest.raises(DynetError):
+        Dynet(host="localhost", port=12345, transport="carrier pigeon", loop=Mock())
+
+
+def test_serial_pacing_follows_baud_rate():
+    dynet = Dynet(transport=TRANSPORT_SERIAL, device="/dev/null", baudrate=1200, loop=Mock(), messageDelay=0)
+    assert dynet._messageDelay == pytest.approx(1000 * 80 / 1200)
+
+
+def test_unsupported_baud_rate(pty_pair):
+    _, device = pty_pair
+    fd = os.open(device, os.O_RDWR | os.O_NOCTTY)
+    try:
+        with pytest.raises(SerialError):
+            configurePort(fd, 12345)
+    finally:
+        os.close(fd)
+
+
+@pytest.mark.asyncio
+async def test_serial_round_trip(pty_pair):
+    master, device = pty_pair
+    loop = asyncio.get_event_loop()
+    connected = asyncio.Event()
+    events = []
+
+    async def onConnect(dynet=None, transport=None):
+        connected.set()
+
+    dynet = Dynet(
+        transport=TRANSPORT_SERIAL,
+        device=device,
+        loop=loop,
+        broadcaster=events.append,
+        onConnect=onConnect,
+        messageDelay=0,
+    )
+    dynet.connect()
+    await asyncio.wait_for(connected.wait(), 2)
+
+    # frames from the adapter are decoded
+    os.write(master, makeFrame(1, 0, [0, 0, 0]))
+    for _ in range(100):
+        if events:
+            break
+        await asyncio.sleep(0.01)
+    assert events[0].eventType == "PRESET"
+    assert events[0].get("area") == 1
+
+    # frames written by Dynet reach the adapter
+    sent = makeFrame(2, 0, [0, 0, 0])
+    dynet.write(DynetPacket(msg=list(sent)))
+    assert await read_master(master, 8) == sent
+    dynet.close()
+    await asyncio.sleep(0.01)
+    assert dynet._transport is None
+
+
+@pytest.mark.asyncio
+async def test_non_tty_schedules_a_retry():
+    loop = asyncio.get_event_loop()
+    dynet = Dynet(
+        transport=TRANSPORT_SERIAL,
+        device="/dev/null",
+        loop=loop,
+        broadcaster=lambda event: None,
+        reconnectBase=5,
+        reconnectCap=10,
+    )
+    with pytest.raises(SerialError) as err:
+        fd = os.open("/dev/null", os.O_RDWR)
+        try:
+            configurePort(fd, 9600)
+        finally:
+            os.close(fd)
+    assert err.value.__cause__ is not None  # the termios error
+    await dynet.connect()
+    assert dynet.reconnect.failures == 1
+    assert not dynet.reconnect._attempting
+    assert dynet.reconnect._timer is not None  # a retry is scheduled
+    dynet.close()
@@ -0,0 +1,104 @@
+import pytest
+from unittest.mock import Mock
+
+from dynalite_lib.sharedstate import (
+    SharedStateReader,
+    SharedStateWriter,
+    SharedStateError,
+)
+from dynalite_lib.dynalite import Dynalite
+
+
+def test_shared_state_round_trip(tmp_path):
+    path = str(tmp_path / "state")
+    writer = SharedStateWriter(path)
+    reader = SharedStateReader(path)
+    assert reader.sequence == 0
+    assert reader.getAreaPreset(3) is None
+    assert reader.getChannelLevel(3, 5) is None
+    writer.setAreaPreset(3, 4)
+    writer.setChannelLevel(3, 5, 0.5)
+    writer.setChannelLevel(3, 255, 1.0)
+    assert reader.sequence == 6
+    assert reader.getAreaPreset(3) == 4
+    assert reader.getChannelLevel(3, 5) == 0.5
+    assert reader.getAreaLevels(3) == {5: 0.5, 255: 1.0}
+    writer.setAreaPreset(3, None)
+    assert reader.getAreaPreset(3) is None
+    reader.close()
+    writer.close()
+
+
+def test_shared_state_range(tmp_path):
+    writer = SharedStateWriter(str(tmp_path / "state"))
+    with pytest.raises(SharedStateError):
+        writer.setAreaPreset(256, 1)
+    with pytest.raises(SharedStateError):
+        writer.setChannelLevel(1, 0, 1.0)
+    with pytest.raises(SharedStateError):
+        writer.setAreaPreset(1, 70000)
+    writer.close()
+
+
+def test_shared_state_bad_file(tmp_path):
+    path = tmp_path / "state"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(SharedStateError):
+        SharedStateReader(str(path))
+
+
+def test_dynalite_publishes_state(tmp_path):
+    path = str(tmp_path / "state")
+    dynalite = Dynalite(config={"shared_state": path}, loop=Mock())
+    area = Mock()
+    area.value = 2
+    area.activePreset = 3
+    channel = Mock()
+    channel.value = 7
+    channel.level = 0.25
+    dynalite._stateChanged(area=area)
+    dynalite._stateChanged(area=area, channel=channel)
+    reader = SharedStateReader(path)
+    assert reader.getAreaPreset(2) == 3
+    assert reader.getChannelLevel(2, 7) == 0.25
+
+
+def test_dynalite_skips_entities_out_of_range(tmp_path):
+    path = str(tmp_path / "state")
+    dynalite = Dynalite(config={"shared_state": path}, loop=Mock())
+    calls = []
+
+    def failing(area, channel):
+        calls.append(channel)
+        raise ValueError("listener bug")
+
+    dynalite.addStateListener(failing)
+    area = Mock()
+    area.value = 2
+    channel = Mock()
+    channel.value = 300  # an autodiscovered channel the table has no room for
+    channel.level = 0.5
+    dynalite._stateChanged(area=area, channel=channel)
+    dynalite._stateChanged(area=area, channel=channel)
+    assert calls == [channel, channel]
+    assert dynalite.sequence == 1
+    dynalite.close()
+    assert dynalite._sharedState is None
+
+
+@pytest.mark.asyncio
+async def test_reader_area_levels_match_dynalite(tmp_path):
+    path = str(tmp_path / "state")
+    config = {
+        "shared_state": path,
+        "area": {"1": {"name": "Room", "channel": {"1": {}, "2": {}}}},
+    }
+    dynalite = Dynalite(config=config, loop=Mock())
+    dynalite.control = Mock(active="off")
+    await dynalite._configure()
+    reader = SharedStateReader(path)
+    assert reader.getAreaLevels(1) == dynalite.getAreaLevels(1) == {1: 0, 2: 0}  # not yet reported
+    dynalite.devices["area"][1].setChannelLevel(2, 0.5)
+    assert reader.getAreaLevels(1) == dynalite.getAreaLevels(1) == {1: 0, 2: 0.5}
+    reader.close()
+    dynalite.close()
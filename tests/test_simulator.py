@@ -0,0 +1,84 @@
+import pytest
+import asyncio
+
+from dynalite_lib.const import CONF_ACTIVE_ON
+from dynalite_lib.dynet import Dynet, DynetControl
+from dynalite_lib.simulator import DynetSimulator
+from tests.helpers import wait_for
+
+
+async def connect(simulator, events):
+    loop = asyncio.get_event_loop()
+    dynet = Dynet(
+        host="127.0.0.1",
+        port=simulator.port,
+        loop=loop,
+        active=CONF_ACTIVE_ON,
+        broadcaster=events.append,
+        messageDelay=0,
+    )
+    dynet.connect()
+    await wait_for(lambda: simulator.clients and dynet._transport is not None)
+    return dynet, DynetControl(dynet, loop, CONF_ACTIVE_ON)
+
+
+@pytest.mark.asyncio
+async def test_requests_and_fades():
+    simulator = DynetSimulator(areas=3, channels=6, port=0, baudrate=None, seed=1)
+    await simulator.start()
+    events = []
+    dynet, control = await connect(simulator, events)
+
+    control.request_area_preset(2)
+    await wait_for(lambda: events)
+    assert (events[0].eventType, events[0].get("area"), events[0].get("preset")) == ("PRESET", 2, 4)
+
+    # preset 1 is full on - fade over half a second, then ask for channel 6 mid fade and after
+    control.areaPreset(2, 1, fade=0.5)
+    await asyncio.sleep(0.1)
+    control.request_channel_level(2, 6)
+    await wait_for(lambda: len(events) == 2)
+    assert events[1].get("channel") == 6
+    assert events[1].get("target_level") == 1
+    assert 1 < events[1].get("actual_level") < 255
+    await asyncio.sleep(0.5)
+    control.request_channel_level(2, 6)
+    await wait_for(lambda: len(events) == 3)
+    assert events[2].get("actual_level") == 1
+
+    # a channel command moves one channel only
+    control.setChannel(2, 5, 0, fade=0)
+    await asyncio.sleep(0.05)
+    assert simulator.areas[2].channels[4].level(0) == 255
+    assert simulator.areas[2].channels[5].target == 1
+    assert simulator.stats()["answers"] == 3
+    dynet.close()
+    await simulator.close()
+
+
+@pytest.mark.asyncio
+async def test_panels_bandwidth_and_loss():
+    simulator = DynetSimulator(areas=5, port=0, panelRate=200, seed=2)  # 9600 baud
+    await simulator.start()
+    events = []
+    dynet, control = await connect(simulator, events)
+    await asyncio.sleep(0.3)
+    stats = simulator.stats()
+    assert stats["panel_presets"] > 10
+    # at 9600 baud the bus carries at most 120 frames a second
+    assert stats["frames_on_bus"] <= 0.3 * 120 + 2
+    assert stats["max_bus_queue"] > 1
+    assert events and all(event.eventType == "PRESET" for event in events)
+    dynet.close()
+    await simulator.close()
+
+    simulator = DynetSimulator(areas=1, port=0, baudrate=None, loss=1.0)
+    await simulator.start()
+    events = []
+    dynet, control = await connect(simulator, events)
+    control.request_area_preset(1)
+    await asyncio.sleep(0.1)
+    assert not events
+    assert simulator.stats()["frames_lost"] == 1
+    dynet.close()
+    await simulator.close()
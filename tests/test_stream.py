@@ -0,0 +1,130 @@
+import pytest
+import asyncio
+from unittest.mock import Mock
+
+from dynalite_lib.dynalite import Dynalite
+from dynalite_lib.event import DynetEvent
+from dynalite_lib.simulator import makeFrame
+from dynalite_lib.stream import EventStream, StreamError
+
+
+def channel_event(area, channel, level):
+    return DynetEvent(
+        eventType="CHANNEL", data={"area": area, "channel": channel, "level": level}
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream_drop_oldest():
+    stream = EventStream(asyncio.get_event_loop(), maxsize=2)
+    for level in range(4):
+        stream.deliver(channel_event(1, 1, level))
+    stream.close()
+    levels = [event.data["level"] async for event in stream]
+    assert levels == [2, 3]
+    assert stream.dropped == 2
+    assert stream.delivered == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_coalesce():
+    stream = EventStream(asyncio.get_event_loop(), maxsize=2, overflow="coalesce")
+    for level in range(3):
+        stream.deliver(channel_event(1, 1, level))
+        stream.deliver(channel_event(1, 2, level))
+    stream.deliver(channel_event(1, 3, 0))
+    for _ in range(3):
+        stream.deliver(DynetEvent(eventType="CONNECTED", data={}))
+    stream.close()
+    events = [event async for event in stream]
+    # every entity keeps its latest event, maxsize only bounds the events of no entity
+    assert [event.eventType for event in events] == ["CHANNEL"] * 3 + ["CONNECTED"] * 2
+    assert [(event.data["channel"], event.data["level"]) for event in events[:3]] == [
+        (1, 2),
+        (2, 2),
+        (3, 0),
+    ]
+    assert stream.coalesced == 4
+    assert stream.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_block():
+    pause, resume = Mock(), Mock()
+    stream = EventStream(
+        asyncio.get_event_loop(),
+        maxsize=2,
+        overflow="block",
+        pauseFunction=pause,
+        resumeFunction=resume,
+    )
+    for level in range(4):
+        stream.deliver(channel_event(1, 1, level))
+    pause.assert_called_once_with()
+    assert len(stream) == 2
+    assert stream.dropped == 2  # read before the reader was paused
+    assert (await stream.__anext__()).data["level"] == 0
+    resume.assert_called_once_with()
+    stream.deliver(channel_event(1, 1, 4))
+    assert pause.call_count == 2
+    assert [(await stream.__anext__()).data["level"] for _ in range(2)] == [1, 4]
+
+
+@pytest.mark.asyncio
+async def test_stream_waits_for_events():
+    loop = asyncio.get_event_loop()
+    stream = EventStream(loop)
+    loop.call_soon(stream.deliver, channel_event(1, 1, 5))
+    event = await asyncio.wait_for(stream.__anext__(), 1)
+    assert event.data["level"] == 5
+
+
+def test_stream_bad_args():
+    with pytest.raises(StreamError):
+        EventStream(Mock(), overflow="bogus")
+    with pytest.raises(StreamError):
+        EventStream(Mock(), maxsize=0)
+
+
+@pytest.mark.asyncio
+async def test_dynalite_events():
+    dynalite = Dynalite(config={}, loop=asyncio.get_event_loop())
+    dynalite._dynet = Mock()
+    async with dynalite.events(filter="CHANNEL", maxsize=1, overflow="block") as stream:
+        filtered = dynalite.events(filter=lambda event: event.data.get("area") == 2)
+        await dynalite._broadcast(DynetEvent(eventType="PRESET", data={"area": 1}))
+        await dynalite._broadcast(channel_event(1, 1, 1))
+        await dynalite._broadcast(channel_event(1, 1, 2))  # held while the stream is full
+        await dynalite._broadcast(channel_event(2, 1, 3))
+        dynalite._dynet.pauseReading.assert_called_once_with()
+        assert len(stream) == 1 and stream.dropped == 0
+        assert len(filtered) == 0
+        assert [(await stream.__anext__()).data["level"] for _ in range(3)] == [1, 2, 3]
+        assert len(filtered) == 1
+        dynalite._dynet.pauseReading.assert_called_once_with()  # not while the held events refill it
+        dynalite._dynet.resumeReading.assert_called_once_with()
+        filtered.close()
+    assert not dynalite._subscriptions.wants("CHANNEL")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fastPath", [False, True])
+async def test_blocking_stream_loses_nothing(fastPath):
+    loop = asyncio.get_event_loop()
+    areas = {str(area): {"name": "Area %d" % area} for area in range(1, 11)}
+    dynalite = Dynalite(config={"fast_path": fastPath, "area": areas}, loop=loop)
+    dynalite.control = Mock(active="off")
+    await dynalite._configure()
+    dynalite._dynet = dynalite._newDynet("localhost", 12345)
+    dynalite._dynet._transport = Mock()
+    stream = dynalite.events(filter="PRESET", maxsize=2, overflow="block")
+    dynalite._dynet._received(b"".join(makeFrame(area, 98, [1, 0, 0]) for area in range(1, 11)))
+    received = []
+    while len(received) < 10:
+        event = await asyncio.wait_for(stream.__anext__(), 1)
+        received.append(event.get("area"))
+        assert len(stream) <= 2
+    assert received == list(range(1, 11))
+    assert stream.dropped == 0
+    assert not dynalite._dynet._readPaused
+    stream.close()
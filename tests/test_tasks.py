@@ -0,0 +1,102 @@
+import pytest
+import asyncio
+
+from dynalite_lib.dynalite import Dynalite
+from dynalite_lib.dynet import Dynet, DynetControl
+from dynalite_lib.event import DynetEvent
+from dynalite_lib.tasks import TaskTracker
+
+
+async def work(done, name, gate=None):
+    if gate is not None:
+        await gate.wait()
+    done.append(name)
+
+
+@pytest.mark.asyncio
+async def test_unbounded_counts_tasks():
+    loop = asyncio.get_event_loop()
+    tracker = TaskTracker(loop)
+    done = []
+    tasks = [tracker.spawn(work(done, index)) for index in range(5)]
+    assert tracker.inFlight == 5
+    await asyncio.gather(*tasks)
+    await asyncio.sleep(0)
+    assert tracker.stats()["in_flight"] == 0
+    assert tracker.peak == 5
+    assert done == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_bounded_queues_coalesces_and_drops():
+    loop = asyncio.get_event_loop()
+    tracker = TaskTracker(loop, limit=2, queueSize=3)
+    done = []
+    gate = asyncio.Event()
+    assert tracker.spawn(work(done, "a", gate)) is not None
+    assert tracker.spawn(work(done, "b", gate)) is not None
+    assert tracker.spawn(work(done, "c")) is None  # held back
+    assert tracker.spawn(work(done, "trigger 1"), key="trigger") is None
+    assert tracker.spawn(work(done, "trigger 2"), key="trigger") is None  # replaces trigger 1
+    assert tracker.spawn(work(done, "d")) is None
+    assert tracker.spawn(work(done, "e")) is None  # the ring is full - c is dropped
+    assert tracker.stats()["queued"] == 3
+    assert tracker.coalesced == 1
+    assert tracker.dropped == 1
+    assert tracker.track(work(done, "connect")) is not None  # never held back
+    await asyncio.sleep(0.01)
+    assert done == ["connect"]
+    gate.set()
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert done == ["connect", "a", "b", "trigger 2", "d", "e"]
+    assert tracker.peak == 3
+    assert tracker.inFlight == 0
+
+
+@pytest.mark.asyncio
+async def test_dynalite_event_storm_is_bounded():
+    loop = asyncio.get_event_loop()
+    dynalite = Dynalite(config={"task_limit": 50, "task_queue": 100000}, loop=loop)
+    received = []
+    dynalite.addListener(listenerFunction=lambda event, dynalite: received.append(event), mode="task").monitorEvent("*")
+    for index in range(2000):
+        dynalite.broadcast(DynetEvent(eventType="PRESET", data={"area": 1, "preset": index}))
+    assert dynalite.taskStats()["in_flight"] == 50
+    for _ in range(200):
+        if len(received) == 2000:
+            break
+        await asyncio.sleep(0)
+    assert [event.get("preset") for event in received] == list(range(2000))
+    assert dynalite.tasks.peak == 50
+    assert dynalite.taskStats()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_bounded_dynet_keeps_bytes_and_commands():
+    loop = asyncio.get_event_loop()
+    tasks = TaskTracker(loop, limit=1, queueSize=2)
+    events = []
+    dynet = Dynet(host="localhost", port=12345, loop=loop, broadcaster=events.append, tasks=tasks)
+    control = DynetControl(dynet, loop, "on", tasks=tasks)
+    blocker = asyncio.Event()
+    tasks.spawn(blocker.wait())  # hold the only slot
+    connection = dynet._conn()
+    frame = bytes([28, 1, 0, 0, 0, 0, 255, 228])
+    for _ in range(20):  # frames split over reads
+        connection.data_received(frame[:3])
+        connection.data_received(frame[3:])
+    for area in range(1, 21):
+        dynet.write(control._presetPacket(area, 1, 0))
+        control.setChannel(area, 1, 0.5, 0)
+    assert len(dynet._inBuffer) == 160
+    assert len(dynet._outBuffer) == 20
+    assert tasks.dropped == 0
+    blocker.set()
+    for _ in range(100):
+        if len(events) == 20 and len(dynet._outBuffer) == 40:
+            break
+        await asyncio.sleep(0)
+    assert len(events) == 20
+    assert len(dynet._outBuffer) == 40  # never connected, so everything stays queued
+    assert tasks.dropped == 0
@@ -0,0 +1,110 @@
+import pytest
+import asyncio
+import threading
+
+from dynalite_lib.const import CONF_ACTIVE_OFF, CONF_ACTIVE_ON
+from dynalite_lib.event import DynetEvent
+from dynalite_lib.simulator import DynetSimulator
+from dynalite_lib.threaded import ThreadedDynalite, ThreadedDynaliteError
+from tests.helpers import wait_for_thread
+
+
+def config(**extra):
+    config = {
+        "active": CONF_ACTIVE_OFF,
+        "port": 1,
+        "area": {"1": {"name": "Kitchen", "channel": {"1": {"name": "Lights"}}}},
+    }
+    config.update(extra)
+    return config
+
+
+def test_calls_are_batched_and_ordered():
+    client = ThreadedDynalite(config=config())
+    client.start()
+    assert threading.current_thread() is not client._thread
+    release = threading.Event()
+    client.post(release.wait)  # hold the loop until everything below is queued
+    results = []
+    for index in range(100):
+        client.post(results.append, index)
+    future = client.submit(lambda: threading.current_thread().name)
+    release.set()
+    assert future.result(2) == "dynalite-loop"
+    assert results == list(range(100))
+    assert client.stats()["posted"] == 102
+    assert client.stats()["wakeups"] <= 2
+
+    async def double(value):
+        await asyncio.sleep(0)
+        return value * 2
+
+    assert client.call(double, 21, timeout=2) == 42
+    with pytest.raises(ZeroDivisionError):
+        client.call(lambda: 1 / 0, timeout=2)
+    client.stop()
+    assert client._thread is None
+    with pytest.raises(ThreadedDynaliteError):
+        client.post(results.append, 0)
+
+
+def test_start_timeout_stops_the_loop_thread():
+    client = ThreadedDynalite(config=config())
+    client._onConfigured = lambda *args, **kwargs: None  # never configured
+    with pytest.raises(ThreadedDynaliteError):
+        client.start(timeout=0.1)
+    assert client._thread is None and not client._running
+    with pytest.raises(ThreadedDynaliteError):
+        client.post(print)
+
+
+def test_snapshot_follows_state_without_the_loop():
+    client = ThreadedDynalite(config=config(autodiscover=True))
+    client.start()
+    snapshot = client.snapshot()
+    assert snapshot["area"][1] == {"preset": None, "channel": {1: 0}}
+    client.call(
+        client.dynalite.processTrafficNow,
+        DynetEvent(eventType="PRESET", data={"area": 1, "preset": 3}),
+        timeout=2,
+    )
+    wait_for_thread(lambda: client.getAreaPreset(1) == 3)
+    assert client.sequence > snapshot["seq"]
+    assert snapshot["area"][1]["preset"] is None  # published snapshots never change
+    assert client.getAreaPreset(2) is None
+    assert client.getChannelLevel(1, 2) is None
+    assert client.getAreaLevels(2) == {}
+    client.stop()
+
+
+def test_commands_and_listeners_on_a_simulated_bus():
+    loop = asyncio.new_event_loop()
+    simulator = DynetSimulator(areas=3, channels=6, port=0, baudrate=None, seed=1, loop=loop)
+    loop.run_until_complete(simulator.start())
+    thread = threading.Thread(target=loop.run_forever)
+    thread.start()
+    client = ThreadedDynalite(
+        config=config(
+            host="127.0.0.1",
+            port=simulator.port,
+            active=CONF_ACTIVE_ON,
+            autodiscover=True,
+            message_delay=0,
+        )
+    )
+    try:
+        client.start()
+        events = []
+        client.addListener(lambda event, dynalite: events.append(event)).monitorEvent("PRESET")
+        wait_for_thread(lambda: simulator.clients)
+        client.requestAreaPreset(2)
+        wait_for_thread(lambda: client.getAreaPreset(2) == 4)
+        wait_for_thread(lambda: any(event.get("area") == 2 for event in events))
+        client.setChannel(2, 5, 0, fade=0)
+        wait_for_thread(lambda: simulator.areas[2].channels[4].target == 255)
+        client.stop()
+    finally:
+        asyncio.run_coroutine_threadsafe(simulator.close(), loop).result(2)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
@@ -0,0 +1,80 @@
+import pytest
+import asyncio
+import logging
+from unittest.mock import Mock, patch
+
+from dynalite_lib.dynet import Dynet, DynetPacket
+from dynalite_lib.trace import FrameTracer, HexFrame
+
+FRAME = bytes([28, 1, 0, 0, 0, 0, 255, 228])
+
+
+def test_level_sampling_and_rate_limit():
+    logger = logging.getLogger("test_trace.frames")
+    logger.setLevel(logging.INFO)
+    tracer = FrameTracer(logger=logger, sampleRate=3)
+    assert not any(tracer.begin() for _ in range(10))  # nothing is counted below debug
+    logger.setLevel(logging.DEBUG)
+    assert [tracer.begin() for _ in range(6)] == [False, False, True] * 2
+
+    tracer = FrameTracer(logger=logger, rateLimit=2)
+    with patch("dynalite_lib.trace.time.monotonic", return_value=100.0):
+        assert [tracer.begin() for _ in range(5)] == [True, True, False, False, False]
+    assert tracer.suppressed == 3
+    with patch("dynalite_lib.trace.time.monotonic", return_value=101.5), patch.object(logger, "debug") as debug:
+        assert tracer.begin()
+    debug.assert_called_once_with("%d frame traces suppressed by the limit of %s a second", 3, 2)
+    assert str(HexFrame([28, 1, 255])) == "1c:01:ff"
+
+
+@pytest.mark.asyncio
+async def test_dynet_formats_nothing_when_disabled():
+    loop = asyncio.get_event_loop()
+    dynet = Dynet(host="localhost", port=12345, loop=loop, broadcaster=lambda event: None)
+    logger = logging.getLogger("dynalite_lib.frames")
+    with patch.object(DynetPacket, "__repr__", autospec=True, return_value="packet") as packetRepr, patch.object(HexFrame, "__str__", autospec=True) as hexStr:
+        await dynet._receive(bytes([1, 2]) + FRAME)
+    packetRepr.assert_not_called()
+    hexStr.assert_not_called()
+
+    logger.setLevel(logging.DEBUG)
+    try:
+        with patch.object(logger, "debug") as debug:
+            await dynet._receive(bytes([1]) + FRAME)
+        messages = [call[0][0] for call in debug.call_args_list]
+        assert messages == ["Unable to process packet %s - moving one byte forward", "Have packet: %s"]
+    finally:
+        logger.setLevel(logging.NOTSET)
+
+
+@pytest.mark.asyncio
+async def test_partial_frame_trace_keeps_its_bytes():
+    loop = asyncio.get_event_loop()
+    dynet = Dynet(host="localhost", port=12345, loop=loop, broadcaster=lambda event: None)
+    logger = logging.getLogger("dynalite_lib.frames")
+    logger.setLevel(logging.DEBUG)
+    try:
+        with patch.object(logger, "debug") as debug:
+            await dynet._receive(FRAME[:3])
+            await dynet._receive(FRAME[3:])  # the buffer changes before a handler formats the record
+        partial = debug.call_args_list[0][0]
+        assert partial[0].startswith("Received %d bytes")
+        assert str(partial[3]) == "1c:01:00"
+    finally:
+        logger.setLevel(logging.NOTSET)
+
+
+def test_sent_frames_do_not_tick_the_sampling():
+    loop = Mock()
+    dynet = Dynet(host="localhost", port=12345, loop=loop, messageDelay=0, traceSample=2)
+    dynet._transport = Mock()
+    logger = logging.getLogger("dynalite_lib.frames")
+    logger.setLevel(logging.DEBUG)
+    try:
+        with patch.object(logger, "debug") as debug:
+            for _ in range(3):
+                dynet._send(DynetPacket(msg=list(FRAME)))
+        assert [call[0][0] for call in debug.call_args_list] == ["Dynet Sent on %s: %s"] * 3
+        assert dynet._tracer._tick == 0
+    finally:
+        logger.setLevel(logging.NOTSET)
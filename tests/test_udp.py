@@ -0,0 +1,99 @@
+import pytest
+import asyncio
+
+from dynalite_lib.const import TRANSPORT_UDP
+from dynalite_lib.dynet import Dynet, DynetPacket
+from dynalite_lib.simulator import makeFrame
+from tests.helpers import wait_for
+
+
+class UdpGateway(asyncio.DatagramProtocol):
+    """Loopback stand-in for a RS485-UDP bridge."""
+
+    def __init__(self):
+        self.transport = None
+        self.client = None
+        self.received = asyncio.Queue()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.client = addr
+        self.received.put_nowait(data)
+
+    def send(self, data):
+        self.transport.sendto(data, self.client)
+
+
+@pytest.mark.asyncio
+async def test_udp_round_trip():
+    loop = asyncio.get_event_loop()
+    _, gateway = await loop.create_datagram_endpoint(UdpGateway, local_addr=("127.0.0.1", 0))
+    events = []
+    connected = asyncio.Event()
+
+    async def onConnect(dynet=None, transport=None):
+        connected.set()
+
+    port = gateway.transport.get_extra_info("sockname")[1]
+    dynet = Dynet(
+        host="127.0.0.1",
+        port=port,
+        transport=TRANSPORT_UDP,
+        loop=loop,
+        broadcaster=events.append,
+        onConnect=onConnect,
+        messageDelay=0,
+    )
+    dynet.connect()
+    await asyncio.wait_for(connected.wait(), 2)
+
+    # each packet goes out as one datagram
+    sent = makeFrame(2, 0, [0, 0, 0])
+    dynet.write(DynetPacket(msg=list(sent)))
+    assert await asyncio.wait_for(gateway.received.get(), 2) == sent
+
+    # two frames packed into one datagram
+    gateway.send(makeFrame(1, 0, [0, 0, 0]) + makeFrame(3, 1, [0, 0, 0]))
+    await wait_for(lambda: len(events) == 2)
+    assert [event.get("area") for event in events] == [1, 3]
+
+    # one frame split across two datagrams
+    split = makeFrame(4, 0, [0, 0, 0])
+    gateway.send(split[:3])
+    await asyncio.sleep(0.01)
+    assert len(events) == 2
+    gateway.send(split[3:])
+    await wait_for(lambda: len(events) == 3)
+    assert events[2].get("area") == 4
+    dynet.close()
+    gateway.transport.close()
+
+
+@pytest.mark.asyncio
+async def test_udp_unreachable_drops_endpoint():
+    loop = asyncio.get_event_loop()
+    lost = asyncio.Event()
+
+    async def onDisconnect(dynet=None):
+        lost.set()
+
+    # bind then release a port so nothing listens on it
+    transport, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol, local_addr=("127.0.0.1", 0))
+    port = transport.get_extra_info("sockname")[1]
+    transport.close()
+    dynet = Dynet(
+        host="127.0.0.1",
+        port=port,
+        transport=TRANSPORT_UDP,
+        loop=loop,
+        broadcaster=lambda event: None,
+        onDisconnect=onDisconnect,
+        messageDelay=0,
+    )
+    dynet.connect()
+    await wait_for(lambda: dynet._transport is not None)
+    dynet.write(DynetPacket(msg=list(makeFrame(1, 0, [0, 0, 0]))))
+    await asyncio.wait_for(lost.wait(), 2)
+    assert dynet._transport is None